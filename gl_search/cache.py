@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+from .config import CACHE_DIR_PATH, settings
+from .models import Inventory, InventoryParams, Repo, SearchEntryResult, SearchRepoParams
+
+_search_results_lock = threading.Lock()
+_search_results_size: dict[str, int] = {}
+
+
+def _inventory_file_path(params: InventoryParams) -> str:
+    key = json.dumps([settings.GITLAB_URL, params.groups, sorted(params.visibility), params.include_archived])
+    return os.path.join(CACHE_DIR_PATH, f"inventory-{hashlib.sha256(key.encode()).hexdigest()[:16]}.json")
+
+
+def _write_atomically(file_path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_file_path, "w") as file:
+        file.write(content)
+    os.replace(tmp_file_path, file_path)
+
+
+def load_inventory(params: InventoryParams) -> Optional[Inventory]:
+    try:
+        return Inventory.parse_file(_inventory_file_path(params))
+    except (OSError, ValueError):
+        return None
+
+
+def save_inventory(params: InventoryParams, inventory: Inventory) -> None:
+    _write_atomically(_inventory_file_path(params), inventory.json())
+
+
+def remove_from_inventory(params: InventoryParams, repos_ids: set[int]) -> None:
+    inventory = load_inventory(params)
+    if inventory is None:
+        return
+
+    inventory.repos = [repo for repo in inventory.repos if repo.id not in repos_ids]
+    save_inventory(params, inventory)
+
+
+def _hits_file_path() -> str:
+    return os.path.join(CACHE_DIR_PATH, "hits.json")
+
+
+def load_hits() -> dict[str, int]:
+    """Number of searches that found something in each repository, by web url."""
+    try:
+        with open(_hits_file_path()) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_hits(web_urls: set[str]) -> None:
+    hits = load_hits()
+    for web_url in web_urls:
+        hits[web_url] = hits.get(web_url, 0) + 1
+    _write_atomically(_hits_file_path(), json.dumps(hits))
+
+
+def _search_results_dir_path() -> str:
+    return os.path.join(CACHE_DIR_PATH, "search")
+
+
+def _search_results_file_path(search_params: SearchRepoParams, repo: Repo) -> Optional[str]:
+    if repo.last_activity_at is None:
+        return None
+
+    key = json.dumps(
+        [settings.GITLAB_URL, repo.id, search_params.search_with_params, repo.last_activity_at.isoformat()]
+    )
+    return os.path.join(_search_results_dir_path(), f"{hashlib.sha256(key.encode()).hexdigest()}.json")
+
+
+def load_search_results(search_params: SearchRepoParams, repo: Repo) -> Optional[list[SearchEntryResult]]:
+    file_path = _search_results_file_path(search_params, repo)
+    if file_path is None:
+        return None
+
+    try:
+        with open(file_path) as file:
+            data = json.load(file)
+        os.utime(file_path)
+    except (OSError, ValueError):
+        return None
+
+    return [SearchEntryResult.from_api(value) for value in data]
+
+
+def _current_search_results_size(dir_path: str) -> int:
+    if dir_path not in _search_results_size:
+        try:
+            with os.scandir(dir_path) as entries:
+                size = sum(entry.stat().st_size for entry in entries if entry.is_file())
+        except FileNotFoundError:
+            size = 0
+        _search_results_size[dir_path] = size
+
+    return _search_results_size[dir_path]
+
+
+def _evict_search_results(dir_path: str, max_size: int) -> None:
+    with os.scandir(dir_path) as entries:
+        files = sorted(
+            (
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in entries
+                if entry.is_file()
+            ),
+        )
+
+    size = sum(file_size for _, file_size, _ in files)
+    for _, file_size, file_path in files:
+        if size <= max_size:
+            break
+        try:
+            os.remove(file_path)
+        except OSError:
+            continue
+        size -= file_size
+
+    _search_results_size[dir_path] = size
+
+
+def save_search_results(search_params: SearchRepoParams, repo: Repo, data: list[SearchEntryResult]) -> None:
+    file_path = _search_results_file_path(search_params, repo)
+    if file_path is None:
+        return
+
+    content = json.dumps([entry.dict(by_alias=True) for entry in data])
+    dir_path = _search_results_dir_path()
+
+    with _search_results_lock:
+        size = _current_search_results_size(dir_path) + len(content)
+        _write_atomically(file_path, content)
+        _search_results_size[dir_path] = size
+        if size > settings.SEARCH_CACHE_MAX_SIZE:
+            _evict_search_results(dir_path, settings.SEARCH_CACHE_MAX_SIZE)
+
+
+def _instance_dir_path(name: str) -> str:
+    return os.path.join(CACHE_DIR_PATH, name, hashlib.sha256(settings.GITLAB_URL.encode()).hexdigest()[:16])
+
+
+def mirror_dir_path(repo: Repo) -> str:
+    return os.path.join(_instance_dir_path("mirrors"), f"{repo.id}.git")
+
+
+def index_file_path(repo: Repo) -> str:
+    return os.path.join(_instance_dir_path("index"), f"{repo.id}.idx")
@@ -1,9 +1,7 @@
 import click
 from click import CommandCollection
-from dynaconf.validator import ValidationError
 
-from .clis import config_cli, search_cli
-from .config import settings
+from .clis import config_cli, mirror_cli, search_cli
 
 
 class CustomCommandCollection(CommandCollection):
@@ -11,9 +9,16 @@ class CustomCommandCollection(CommandCollection):
         args = [*ctx.protected_args, *ctx.args]
         cmd_name, cmd, args = self.resolve_command(ctx, args)
 
-        COMMANDS_THAT_NEED_THE_LIBRARY_CONFIGURED = ["search"]
+        COMMANDS_THAT_NEED_THE_LIBRARY_CONFIGURED = ["search", "mirror", "index"]
+
+        # Showing the help of a command does not need the settings.
+        asks_for_help = bool(set(args) & set(ctx.help_option_names))
+
+        if cmd_name in COMMANDS_THAT_NEED_THE_LIBRARY_CONFIGURED and not asks_for_help:
+            from dynaconf.validator import ValidationError
+
+            from .config import settings
 
-        if cmd_name in COMMANDS_THAT_NEED_THE_LIBRARY_CONFIGURED:
             try:
                 settings.validators.validate_all()
             except ValidationError as error:
@@ -22,4 +27,4 @@ class CustomCommandCollection(CommandCollection):
         return super().invoke(ctx)
 
 
-cli = CustomCommandCollection(name="gl-search", sources=[search_cli, config_cli])
+cli = CustomCommandCollection(name="gl-search", sources=[search_cli, mirror_cli, config_cli])
@@ -1,2 +1,3 @@
 from .config import config_cli  # noqa: F401
+from .mirror import mirror_cli  # noqa: F401
 from .search import search_cli  # noqa: F401
@@ -0,0 +1,119 @@
+import logging
+from typing import TYPE_CHECKING, Callable, Optional
+
+import click
+
+if TYPE_CHECKING:
+    from gl_search.models import InventoryParams
+
+
+@click.group()
+def mirror_cli() -> None:
+    ...
+
+
+def _inventory_options(function: Callable) -> Callable:
+    options = [
+        click.option("-g", "--groups", default=None, help="only the repositories of these gitlab groups"),
+        click.option("-mw", "--max-workers", default=5, type=int, help="number of parallel processes"),
+        click.option(
+            "-v",
+            "--visibility",
+            type=click.Choice(["internal", "public", "private"], case_sensitive=False),
+            multiple=True,
+            default=["internal", "public", "private"],
+            help="repositories visibility",
+        ),
+        click.option(
+            "--include-archived",
+            is_flag=True,
+            default=False,
+            help="archived repositories too",
+        ),
+        click.option(
+            "--refresh-inventory",
+            is_flag=True,
+            default=False,
+            help="rebuild the cached groups and repositories inventory",
+        ),
+        click.option(
+            "-d", "--debug", is_flag=True, show_default=True, default=False, help="Debug :: show urls called."
+        ),
+    ]
+    for option in reversed(options):
+        function = option(function)
+    return function
+
+
+def _build_inventory_params(
+    groups: Optional[str],
+    max_workers: int,
+    visibility: list[str],
+    include_archived: bool,
+    refresh_inventory: bool,
+    debug: bool,
+) -> "InventoryParams":
+    from gl_search.models import InventoryParams
+
+    if debug:
+        logger = logging.getLogger("gl_search")
+        logger.setLevel(logging.DEBUG)
+
+    return InventoryParams(
+        groups=groups,
+        max_workers=max_workers,
+        visibility=visibility,
+        refresh_inventory=refresh_inventory,
+        include_archived=include_archived,
+    )
+
+
+@mirror_cli.group(name="mirror")
+def mirror_group() -> None:
+    """Bare git mirrors searched by search --engine local."""
+
+
+@mirror_group.command(name="sync")
+@_inventory_options
+def sync_command(**kwargs) -> None:
+    """Clone or update the default branch of every repository of the inventory."""
+    from gl_search.display import process_user_feedback
+    from gl_search.search import sync_mirrors
+
+    with process_user_feedback.progress:
+        synced_repos, failed_repos = sync_mirrors(_build_inventory_params(**kwargs))
+
+    click.secho(f"{len(synced_repos)} repositories synced.", fg="green")
+    if failed_repos:
+        click.secho(f"{len(failed_repos)} repositories failed to sync.", fg="red")
+
+
+@mirror_cli.group(name="index")
+def index_group() -> None:
+    """Trigram indexes of the mirrors, used by search --engine local."""
+
+
+def _index(rebuild: bool, **kwargs) -> None:
+    from gl_search.display import process_user_feedback
+    from gl_search.search import index_mirrors
+
+    with process_user_feedback.progress:
+        indexed_repos, failed_repos = index_mirrors(_build_inventory_params(**kwargs), rebuild=rebuild)
+
+    click.secho(f"{len(indexed_repos)} repositories indexed.", fg="green")
+    if failed_repos:
+        click.secho(f"{len(failed_repos)} repositories failed to index.", fg="red")
+
+
+@index_group.command(name="build")
+@_inventory_options
+def build_command(**kwargs) -> None:
+    """Index every mirror of the inventory from scratch."""
+    _index(rebuild=True, **kwargs)
+
+
+@index_group.command(name="update")
+@_inventory_options
+def update_command(**kwargs) -> None:
+    """Index only the mirrors whose default branch changed since they were indexed."""
+    _index(rebuild=False, **kwargs)
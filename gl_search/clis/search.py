@@ -1,11 +1,14 @@
 import logging
-from typing import Optional
+import re
+import sys
+from typing import Optional, TextIO
 
 import click
 
-from gl_search.display import print_results, process_user_feedback
-from gl_search.models import SearchParams
-from gl_search.search import search
+from gl_search.stats import format_summary, request_stats
+
+OUTPUT_PLAIN = "plain"
+OUTPUT_JSONL = "jsonl"
 
 
 @click.group()
@@ -27,39 +30,222 @@ def search_cli() -> None:
     default=["internal", "public", "private"],
     help="repositories visibility",
 )
-@click.option("-xdr", "--max-delay-request", default=5, type=int, help="max delay request")
+@click.option(
+    "-xdr",
+    "--max-delay-request",
+    default=None,
+    type=float,
+    help="max seconds to wait for the rate limit before each request",
+)
+@click.option(
+    "-e",
+    "--engine",
+    type=click.Choice(["project", "group", "local"], case_sensitive=False),
+    default="project",
+    show_default=True,
+    help="search each project, each top-level group with one request or the mirrors from mirror sync",
+)
+@click.option(
+    "--include-archived",
+    is_flag=True,
+    default=False,
+    help="search archived repositories too",
+)
+@click.option(
+    "--refresh-inventory",
+    is_flag=True,
+    default=False,
+    help="rebuild the cached groups and repositories inventory",
+)
+@click.option(
+    "--no-cache",
+    "use_cache",
+    is_flag=True,
+    default=True,
+    flag_value=False,
+    help="search every repository again instead of reusing cached results",
+)
+@click.option(
+    "-qf",
+    "--queries-file",
+    type=click.File(),
+    default=None,
+    help="file with one search per line, searched with the SEARCH_CODE_INPUTS",
+)
+@click.option(
+    "-o",
+    "--output",
+    "--format",
+    "output",
+    type=click.Choice(["rich", "plain", "jsonl"], case_sensitive=False),
+    default="rich",
+    show_default=True,
+    help='highlighted code blocks, grep like "project/path:line:text" lines or one JSON object per result',
+)
+@click.option(
+    "--regex",
+    is_flag=True,
+    default=False,
+    help="highlight the SEARCH_CODE_INPUTS as case insensitive regular expressions instead of literals",
+)
+@click.option(
+    "--priority",
+    type=click.Choice(["activity", "pinned", "hits"], case_sensitive=False),
+    default="activity",
+    show_default=True,
+    help="search first the most recently active repositories, the PINNED_GROUPS or the past hits",
+)
+@click.option(
+    "-mr",
+    "--max-results",
+    type=click.IntRange(min=1),
+    default=None,
+    help="stop the search once this many results were found",
+)
+@click.option(
+    "--first",
+    is_flag=True,
+    default=False,
+    help="stop the search at the first result, same as --max-results 1",
+)
+@click.option(
+    "--resume",
+    metavar="RUN_ID",
+    default=None,
+    help="finish an interrupted run with its searches and filters, searching only the repositories left",
+)
+@click.option(
+    "--stats",
+    "show_stats",
+    is_flag=True,
+    default=False,
+    help="show the requests count, time and latency percentiles per phase",
+)
+@click.option(
+    "--trace",
+    "trace_file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="write every request to a Chrome trace JSON file, open it in chrome://tracing or Perfetto",
+)
 @click.option(
     "-d", "--debug", is_flag=True, show_default=True, default=False, help="Debug :: show urls called."
 )
-@click.argument("search_code_input")
+@click.argument("search_code_inputs", nargs=-1)
 def search_command(
     groups: Optional[str],
-    search_code_input: str,
+    search_code_inputs: tuple[str, ...],
     max_workers: int,
     visibility: list[str],
     extension: Optional[str],
     filename: Optional[str],
     path: Optional[str],
-    max_delay_request: int,
+    max_delay_request: Optional[float],
+    engine: str,
+    include_archived: bool,
+    refresh_inventory: bool,
+    use_cache: bool,
+    queries_file: Optional[TextIO],
+    output: str,
+    regex: bool,
+    priority: str,
+    max_results: Optional[int],
+    first: bool,
+    resume: Optional[str],
+    show_stats: bool,
+    trace_file: Optional[str],
     debug: bool,
 ) -> None:
-    """Search command."""
+    """Search command, several SEARCH_CODE_INPUTS are searched at once and shown per search."""
+    # Imported here, so the other commands and the shell completion skip rich, pydantic and requests.
+    from gl_search.display import (
+        print_results,
+        print_results_by_query,
+        print_results_jsonl,
+        print_results_plain,
+        process_user_feedback,
+    )
+    from gl_search.journal import load_run_params, new_run_id
+    from gl_search.models import SearchParams
+    from gl_search.search import search
+
+    search_code_inputs = list(search_code_inputs)
+    if queries_file:
+        search_code_inputs.extend(line.strip() for line in queries_file if line.strip())
+    search_code_inputs = list(dict.fromkeys(search_code_inputs))
+    run_params = {
+        "groups": groups,
+        "search_code_inputs": search_code_inputs,
+        "visibility": visibility,
+        "extension": extension,
+        "filename": filename,
+        "path": path,
+        "engine": engine,
+        "include_archived": include_archived,
+    }
+    if resume:
+        if search_code_inputs:
+            raise click.UsageError("--resume searches the SEARCH_CODE_INPUTS of the run, do not pass any.")
+        run_params = load_run_params(resume)
+        if run_params is None:
+            raise click.BadParameter(f"no run {resume!r} to resume", param_hint="'--resume'")
+        search_code_inputs = run_params["search_code_inputs"]
+    if not search_code_inputs:
+        raise click.UsageError("Missing argument 'SEARCH_CODE_INPUTS...' or option '--queries-file'.")
+    if regex:
+        for search_code_input in search_code_inputs:
+            try:
+                re.compile(search_code_input)
+            except re.error as error:
+                raise click.BadParameter(f"{search_code_input!r} is not a regular expression: {error}")
+
     if debug:
         logger = logging.getLogger("gl_search")
         logger.setLevel(logging.DEBUG)
 
-    with process_user_feedback.progress:
-        results: list[dict[str, str]] = search(
-            SearchParams(
-                groups=groups,
-                search_code_input=search_code_input,
-                max_workers=max_workers,
-                visibility=visibility,
-                extension=extension,
-                filename=filename,
-                path=path,
-                max_random_time_for_sleep=max_delay_request,
+    if show_stats or trace_file:
+        request_stats.enable()
+
+    if output in (OUTPUT_PLAIN, OUTPUT_JSONL):
+        process_user_feedback.use_stderr()
+
+    max_results = 1 if first else max_results
+    # A run stopped by --max-results is finished, only the runs searching everything are journaled.
+    run_id = resume or (new_run_id() if max_results is None else None)
+    try:
+        with process_user_feedback.progress:
+            results = search(
+                SearchParams(
+                    **run_params,
+                    search_code_input=search_code_inputs[0],
+                    max_workers=max_workers,
+                    max_delay_request=max_delay_request,
+                    refresh_inventory=refresh_inventory,
+                    use_cache=use_cache,
+                    max_results=max_results,
+                    priority=priority,
+                    run_id=run_id,
+                )
             )
-        )
 
-    print_results(results, search_code_input)
+            console = process_user_feedback.progress.console
+            if output == OUTPUT_PLAIN:
+                print_results_plain(results, search_code_inputs[0], color=sys.stdout.isatty(), regex=regex)
+            elif output == OUTPUT_JSONL:
+                print_results_jsonl(results, search_code_inputs[0])
+            elif len(search_code_inputs) == 1:
+                print_results(results, search_code_inputs[0], console=console, regex=regex)
+            else:
+                print_results_by_query(results, search_code_inputs, console=console, regex=regex)
+
+            if show_stats:
+                summary = format_summary(request_stats.summary())
+                console.print(summary or "No requests", highlight=False)
+            if trace_file:
+                request_stats.write_trace(trace_file)
+    finally:
+        # The journal of the run is removed once every search succeeded.
+        if run_id and load_run_params(run_id) is not None:
+            click.echo(
+                f"The search is incomplete, finish it with: gl-search search --resume {run_id}", err=True
+            )
@@ -1,30 +1,63 @@
 import os
-from typing import Final
+import threading
+from typing import TYPE_CHECKING, Any, Final, Optional
 
-from dynaconf import Dynaconf, Validator
+if TYPE_CHECKING:
+    from dynaconf import Dynaconf
 
 BLOCK_SETTINGS_NAME: Final[str] = "gl-settings"
 
 SETTINGS_FILE_PATH: Final[str] = f"{os.path.expanduser('~')}/.gl-settings.toml"
-settings = Dynaconf(
-    envvar_prefix=False,
-    load_dotenv=True,
-    settings_files=[SETTINGS_FILE_PATH],
-    environments=[BLOCK_SETTINGS_NAME],
-    default_env=BLOCK_SETTINGS_NAME,
-    validators=[
-        Validator("GITLAB_URL", default="https://gitlab.com"),
-        Validator("MAX_DEEP_SEARCH", default=1000),
-    ],
-)
-
-settings.validators.register(
-    Validator(
-        "GITLAB_PRIVATE_TOKEN",
-        must_exist=True,
-        messages={
-            "must_exist_true": "You must register your token.",
-            "operations": "You must register your token.",
-        },
+CACHE_DIR_PATH: Final[str] = f"{os.path.expanduser('~')}/.gl-search"
+
+_settings: Optional["Dynaconf"] = None
+_settings_lock = threading.Lock()
+
+
+def _build_settings() -> "Dynaconf":
+    from dynaconf import Dynaconf, Validator
+
+    settings = Dynaconf(
+        envvar_prefix=False,
+        load_dotenv=True,
+        settings_files=[SETTINGS_FILE_PATH],
+        environments=[BLOCK_SETTINGS_NAME],
+        default_env=BLOCK_SETTINGS_NAME,
+        validators=[
+            Validator("GITLAB_URL", default="https://gitlab.com"),
+            Validator("MAX_DEEP_SEARCH", default=1000),
+            Validator("MAX_PARALLEL_PAGES", default=4),
+            Validator("INVENTORY_CACHE_TTL", default=3600),
+            Validator("RATE_LIMITED_RETRIES", default=3),
+            Validator("SEARCH_CACHE_MAX_SIZE", default=100 * 1024 * 1024),
+            Validator("REQUEST_TIMEOUT", default=10),
+            Validator("PINNED_GROUPS", default=[]),
+        ],
+    )
+
+    settings.validators.register(
+        Validator(
+            "GITLAB_PRIVATE_TOKEN",
+            must_exist=True,
+            messages={
+                "must_exist_true": "You must register your token.",
+                "operations": "You must register your token.",
+            },
+        )
     )
-)
+
+    return settings
+
+
+def __getattr__(name: str) -> Any:
+    # settings is built on first use, the commands that do not need it skip importing dynaconf.
+    global _settings
+
+    if name != "settings":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    with _settings_lock:
+        if _settings is None:
+            _settings = _build_settings()
+
+    return _settings
@@ -1,6 +1,17 @@
+import bisect
+import functools
+import itertools
+import json
 import re
-from typing import Iterator
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, Optional, TextIO, Union
 
+from pygments.lexer import Lexer
+from pygments.lexers import TextLexer, get_lexer_by_name
+from pygments.util import ClassNotFound
 from rich.console import Console
 from rich.progress import (
     BarColumn,
@@ -14,50 +25,92 @@ from rich.progress import (
 from rich.style import Style
 from rich.syntax import Syntax
 
-from gl_search.models import RepoResult
+from gl_search.models import RepoResult, SearchEntryResult
+from gl_search.stats import PHASE_RENDER, request_stats
 
 
-class MatchFinder:
-    match_position: list[tuple[int, int]]
+@functools.lru_cache(maxsize=64)
+def compile_search(search_code_input: str, regex: bool = False) -> re.Pattern:
+    """Case insensitive pattern of a search, a literal unless regex is set."""
+    return re.compile(search_code_input if regex else re.escape(search_code_input), flags=re.IGNORECASE)
 
-    def __init__(self, text: str, search_code_input: str) -> None:
-        self.match_position = []
-        self._process(text, search_code_input)
 
-    def _process(self, text: str, search_code_input: str) -> None:
-        splitted_lines = text.split("\n")
+# Same options rich uses when it looks the lexer up by name.
+_LEXER_OPTIONS = {"stripnl": False, "ensurenl": True, "tabsize": 4}
 
-        accumulator = 0
+# Like grep --color, bold red matches.
+_ANSI_MATCH = "\033[01;31m"
+_ANSI_RESET = "\033[0m"
 
-        for line, splitted_line in enumerate(splitted_lines, start=1):
-            accumulator += len(splitted_line)
 
-            regex_findall_result: Iterator[re.Match[str]] = re.finditer(
-                rf"{search_code_input}", splitted_line, flags=re.IGNORECASE
-            )
+@functools.lru_cache(maxsize=None)
+def get_lexer(extension: str) -> Lexer:
+    """Lexer of a file extension, looked up once instead of once per result."""
+    try:
+        return get_lexer_by_name(extension, **_LEXER_OPTIONS)
+    except ClassNotFound:
+        return TextLexer(**_LEXER_OPTIONS)
+
 
-            for match in regex_findall_result:
-                self.match_position.append(((line, match.start()), (line, match.end())))
+class MatchFinder:
+    match_position: list[tuple[tuple[int, int], tuple[int, int]]]
+
+    def __init__(self, text: str, search: Union[str, re.Pattern]) -> None:
+        self.match_position = []
+        self._process(text, compile_search(search) if isinstance(search, str) else search)
+
+    def _process(self, text: str, pattern: re.Pattern) -> None:
+        # One scan of the whole text, the matches are mapped to (line, column) with the offsets of the lines.
+        spans = [match.span() for match in pattern.finditer(text) if match.end() > match.start()]
+        if not spans:
+            return
+
+        line_starts = list(itertools.accumulate((len(line) + 1 for line in text.split("\n")), initial=0))
+        for start, end in spans:
+            line = bisect.bisect_right(line_starts, start)
+            end_line = bisect.bisect_left(line_starts, end, lo=line)
+            self.match_position.append(
+                ((line, start - line_starts[line - 1]), (end_line, end - line_starts[end_line - 1]))
+            )
 
 
 class ProcessUserFeedback:
     SEARCHING_GROUPS = "Searching groups"
     SEARCHING_REPOS = "Searching repos"
     SEARCHING_CODE = "Searching code"
-    progress: Progress
+    SEARCHING_CODE_BY_REPO = "Searching code by repo"
+    SYNCING_MIRRORS = "Syncing mirrors"
+    INDEXING_MIRRORS = "Indexing mirrors"
+    _progress: Optional[Progress]
     _tasks: dict[str, TaskID]
 
     def __init__(self):
-        self.progress = Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            MofNCompleteColumn(),
-        )
-
+        # The progress and its tasks are built on first use, importing the module stays cheap.
+        self._progress = None
+        self._console: Optional[Console] = None
+        self._progress_lock = threading.Lock()
         self._tasks = dict()
-        self._add_tasks()
+
+    @property
+    def progress(self) -> Progress:
+        with self._progress_lock:
+            if self._progress is None:
+                self._progress = Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    TaskProgressColumn(),
+                    MofNCompleteColumn(),
+                    console=self._console,
+                    redirect_stdout=self._console is None,
+                )
+                self._add_tasks()
+
+        return self._progress
+
+    def use_stderr(self) -> None:
+        """Show the progress on stderr and leave stdout to the results, before the progress is first used."""
+        self._console = Console(stderr=True)
 
     def _get_task(self, task_name: str) -> TaskID:
         return self._tasks[task_name]
@@ -75,32 +128,56 @@ class ProcessUserFeedback:
         self.progress.update(self._get_task(task_name), visible=True)
 
     def _add_tasks(self) -> None:
-        self._tasks[self.SEARCHING_GROUPS] = self.progress.add_task(self.SEARCHING_GROUPS, total=1)
-        self._tasks[self.SEARCHING_REPOS] = self.progress.add_task(
+        self._tasks[self.SEARCHING_GROUPS] = self._progress.add_task(self.SEARCHING_GROUPS, total=1)
+        self._tasks[self.SEARCHING_REPOS] = self._progress.add_task(
             self.SEARCHING_REPOS, total=100, visible=False
         )
-        self._tasks[self.SEARCHING_CODE] = self.progress.add_task(
+        self._tasks[self.SEARCHING_CODE] = self._progress.add_task(
             self.SEARCHING_CODE, total=100, visible=False
         )
+        self._tasks[self.SEARCHING_CODE_BY_REPO] = self._progress.add_task(
+            self.SEARCHING_CODE_BY_REPO, total=100, visible=False
+        )
+        self._tasks[self.SYNCING_MIRRORS] = self._progress.add_task(
+            self.SYNCING_MIRRORS, total=100, visible=False
+        )
+        self._tasks[self.INDEXING_MIRRORS] = self._progress.add_task(
+            self.INDEXING_MIRRORS, total=100, visible=False
+        )
 
 
 process_user_feedback = ProcessUserFeedback()
 
 
-def print_results(results: list[RepoResult], search_code_input: str) -> None:
-    console = Console()
+def print_results(
+    results: Iterable[RepoResult],
+    search_code_input: str,
+    console: Optional[Console] = None,
+    regex: bool = False,
+) -> None:
+    console = console or Console()
+    failed_repos = 0
 
     for entry in results:
+        if entry.failed:
+            failed_repos += 1
+            continue
+
         if not entry.results:
             continue
 
+        started_at = time.perf_counter()
         console.print(f"Proj : {entry.name}\n")
+        pattern = compile_search(entry.search_code_input or search_code_input, regex)
 
         for content in entry.results:
-            match_finder = MatchFinder(content.data, search_code_input)
+            match_finder = MatchFinder(content.data, pattern)
 
             text = Syntax(
-                content.data, content.path.split(".")[-1], start_line=content.start_line, line_numbers=True
+                content.data,
+                get_lexer(content.path.split(".")[-1]),
+                start_line=content.start_line,
+                line_numbers=True,
             )
 
             for match_position in match_finder.match_position:
@@ -109,3 +186,125 @@ def print_results(results: list[RepoResult], search_code_input: str) -> None:
             console.print(f"{content.filename} - {entry.web_url}/-/blob/{content.ref}/{content.path}\n")
             console.print(text)
             console.print("-----------\n")
+
+        if request_stats.enabled:
+            request_stats.add_phase_time(PHASE_RENDER, time.perf_counter() - started_at)
+
+    if failed_repos:
+        console.print(f"{failed_repos} repositories failed after retries", style="red")
+
+
+def print_results_by_query(
+    results: Iterable[RepoResult],
+    search_code_inputs: list[str],
+    console: Optional[Console] = None,
+    regex: bool = False,
+) -> None:
+    console = console or Console()
+    results_by_query: dict[str, list[RepoResult]] = defaultdict(list)
+    for entry in results:
+        results_by_query[entry.search_code_input].append(entry)
+
+    for search_code_input in search_code_inputs:
+        console.rule(f"Search : {search_code_input}")
+        print_results(results_by_query[search_code_input], search_code_input, console=console, regex=regex)
+
+
+def _highlight(text: str, spans: list[tuple[int, int]]) -> str:
+    parts: list[str] = []
+    position = 0
+    for start, end in spans:
+        parts.extend((text[position:start], _ANSI_MATCH, text[start:end], _ANSI_RESET))
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def print_results_plain(
+    results: Iterable[RepoResult],
+    search_code_input: str,
+    output: Optional[TextIO] = None,
+    color: bool = False,
+    regex: bool = False,
+) -> None:
+    """Write grep like "name/path:line:text" lines, with "-" separators on the lines around the matches."""
+    output = output or sys.stdout
+    failed_repos = 0
+
+    for entry in results:
+        if entry.failed:
+            failed_repos += 1
+            continue
+
+        if not entry.results:
+            continue
+
+        started_at = time.perf_counter()
+        pattern = compile_search(entry.search_code_input or search_code_input, regex)
+        lines: list[str] = []
+
+        for content in entry.results:
+            file_path = f"{entry.name}/{content.path}"
+            spans: dict[int, list[tuple[int, int]]] = defaultdict(list)
+            for (line, start), (end_line, end) in MatchFinder(content.data, pattern).match_position:
+                # A match over several lines is only shown on its first one.
+                spans[line].append((start, end if end_line == line else len(content.data)))
+
+            for line, text in enumerate(content.data.removesuffix("\n").split("\n"), start=1):
+                separator = ":" if line in spans else "-"
+                if color and line in spans:
+                    text = _highlight(text, spans[line])
+                lines.append(f"{file_path}{separator}{content.start_line + line - 1}{separator}{text}\n")
+
+        output.write("".join(lines))
+
+        if request_stats.enabled:
+            request_stats.add_phase_time(PHASE_RENDER, time.perf_counter() - started_at)
+
+    output.flush()
+    if failed_repos:
+        print(f"{failed_repos} repositories failed after retries", file=sys.stderr)
+
+
+def _result_json(entry: RepoResult, content: SearchEntryResult, search_code_input: str) -> str:
+    blob_url = f"{entry.web_url}/-/blob/{content.ref}/{content.path}#L{content.start_line}"
+    return json.dumps(
+        {
+            "search": entry.search_code_input or search_code_input,
+            "project": entry.name,
+            "web_url": entry.web_url,
+            "path": content.path,
+            "ref": content.ref,
+            "start_line": content.start_line,
+            "data": content.data,
+            "blob_url": blob_url,
+        }
+    )
+
+
+def print_results_jsonl(
+    results: Iterable[RepoResult], search_code_input: str, output: Optional[TextIO] = None
+) -> None:
+    """Write one JSON object per result, each repository flushed as soon as its search finishes."""
+    output = output or sys.stdout
+    failed_repos = 0
+
+    for entry in results:
+        if entry.failed:
+            failed_repos += 1
+            continue
+
+        if not entry.results:
+            continue
+
+        started_at = time.perf_counter()
+        output.write(
+            "".join(f"{_result_json(entry, content, search_code_input)}\n" for content in entry.results)
+        )
+        output.flush()
+
+        if request_stats.enabled:
+            request_stats.add_phase_time(PHASE_RENDER, time.perf_counter() - started_at)
+
+    if failed_repos:
+        print(f"{failed_repos} repositories failed after retries", file=sys.stderr)
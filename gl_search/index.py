@@ -0,0 +1,230 @@
+import mmap
+import os
+import struct
+import subprocess  # nosec
+import threading
+from array import array
+from collections import defaultdict
+from typing import IO, Iterator, Optional
+
+from .mirror import GitCommandError, build_results, git, grep_mirror, matches_scope
+from .models import Repo, SearchEntryResult, SearchScopeParams
+
+# magic, indexed commit, files count, trigrams count and files offset, followed by the trigrams table
+# (trigram, postings offset, postings count), the postings (file positions) and the files ("sha path\0").
+# The integers are in the native byte order, the index is a local cache like the mirrors.
+_HEADER = struct.Struct("=8s40sIIQ")
+_HEADER_SIZE = _HEADER.size
+_MAGIC = b"GLTRI001"
+_TABLE_COLUMNS = 3
+
+# Like git, a blob with a NUL byte in its first 8000 bytes is binary and is not searched.
+_BINARY_CHECK_SIZE = 8000
+
+
+def _trigrams(data: bytes) -> set[int]:
+    data = data.lower()
+    return {first << 16 | second << 8 | third for first, second, third in zip(data, data[1:], data[2:])}
+
+
+def _query_trigrams(search: str) -> set[int]:
+    data = search.lower().encode()
+    # Only ASCII trigrams, the blobs are lowered byte by byte so non ASCII letters keep their case.
+    return {trigram for trigram in _trigrams(data) if not trigram & 0x808080}
+
+
+def _head_commit(mirror_path: str) -> str:
+    return git("--git-dir", mirror_path, "rev-parse", "HEAD").strip()
+
+
+def _list_blobs(mirror_path: str) -> list[tuple[str, str]]:
+    output = git("--git-dir", mirror_path, "ls-tree", "-r", "-z", "HEAD")
+    blobs: list[tuple[str, str]] = []
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        _, object_type, sha = info.split(" ")
+        if object_type == "blob":
+            blobs.append((sha, path))
+
+    return blobs
+
+
+def _write_shas(stream: IO[bytes], shas: list[str]) -> None:
+    try:
+        with stream:
+            stream.write("".join(f"{sha}\n" for sha in shas).encode())
+    except BrokenPipeError:
+        # The reader stopped before reading every blob.
+        pass
+
+
+def _read_blobs(mirror_path: str, shas: list[str]) -> Iterator[bytes]:
+    with subprocess.Popen(
+        ["git", "--git-dir", mirror_path, "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ) as process:  # nosec
+        # Written by another thread, so git never waits on a round trip nor blocks on a full stdout.
+        writer = threading.Thread(target=_write_shas, args=(process.stdin, shas), daemon=True)
+        writer.start()
+        for _ in shas:
+            size = int(process.stdout.readline().split()[2])
+            data = process.stdout.read(size)
+            process.stdout.read(1)
+            yield data
+        writer.join()
+
+
+def _is_binary(data: bytes) -> bool:
+    return b"\0" in data[:_BINARY_CHECK_SIZE]
+
+
+def build_index(mirror_path: str, index_path: str) -> None:
+    commit = _head_commit(mirror_path)
+    blobs = _list_blobs(mirror_path)
+
+    files: list[tuple[str, str]] = []
+    postings: dict[int, array] = defaultdict(lambda: array("I"))
+    for (sha, path), data in zip(blobs, _read_blobs(mirror_path, [sha for sha, _ in blobs])):
+        if _is_binary(data):
+            continue
+        for trigram in _trigrams(data):
+            postings[trigram].append(len(files))
+        files.append((sha, path))
+
+    table = array("I")
+    postings_data = array("I")
+    for trigram in sorted(postings):
+        table.extend((trigram, len(postings_data), len(postings[trigram])))
+        postings_data.extend(postings[trigram])
+    files_offset = _HEADER_SIZE + (len(table) + len(postings_data)) * table.itemsize
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_index_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_index_path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, commit.encode(), len(files), len(postings), files_offset))
+        table.tofile(file)
+        postings_data.tofile(file)
+        file.write(b"".join(f"{sha} {path}\0".encode() for sha, path in files))
+    os.replace(tmp_index_path, index_path)
+
+
+class TrigramIndex:
+    def __init__(self, index_path: str) -> None:
+        with open(index_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, commit, self._files_count, trigrams_count, files_offset = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{index_path} is not a trigram index")
+
+        self.commit = commit.decode()
+        self._view = memoryview(self._mmap)
+        table_size = trigrams_count * _TABLE_COLUMNS
+        ints = self._view[_HEADER_SIZE:files_offset].cast("I")
+        self._table = ints[:table_size]
+        self._postings = ints[table_size:]
+        self._files_offset = files_offset
+
+    def __enter__(self) -> "TrigramIndex":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if hasattr(self, "_view"):
+            self._table.release()
+            self._postings.release()
+            self._view.release()
+        self._mmap.close()
+
+    def _posting(self, trigram: int) -> set[int]:
+        low, high = 0, len(self._table) // _TABLE_COLUMNS
+        while low < high:
+            middle = (low + high) // 2
+            if self._table[middle * _TABLE_COLUMNS] < trigram:
+                low = middle + 1
+            else:
+                high = middle
+
+        row = low * _TABLE_COLUMNS
+        if row >= len(self._table) or self._table[row] != trigram:
+            return set()
+
+        offset, end = self._table[row + 1], self._table[row + 1] + self._table[row + 2]
+        return set(self._postings[offset:end])
+
+    def _files(self) -> list[tuple[str, str]]:
+        files_offset, files_count = self._files_offset, self._files_count
+        files = bytes(self._view[files_offset:]).decode().split("\0")[:files_count]
+        return [tuple(file.split(" ", 1)) for file in files]
+
+    def candidates(self, search: str) -> list[tuple[str, str]]:
+        positions: Optional[set[int]] = None
+        # The rarest trigrams first, so the intersection shrinks as fast as possible.
+        for posting in sorted(map(self._posting, _query_trigrams(search)), key=len):
+            positions = posting if positions is None else positions & posting
+            if not positions:
+                return []
+
+        files = self._files()
+        if positions is None:
+            return files
+
+        return [files[position] for position in sorted(positions)]
+
+
+def _scan_blob(path: str, data: bytes, search: str) -> Iterator[tuple[str, int, str]]:
+    # Lowering the bytes is enough to discard the candidates without the text when the search is ASCII.
+    if search.isascii() and search.encode() not in data.lower():
+        return
+
+    lines = data.decode("utf-8", errors="replace").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+
+    matches = [position for position, line in enumerate(lines) if search in line.lower()]
+    context = sorted(
+        {line for match in matches for line in range(match - 1, match + 2) if 0 <= line < len(lines)}
+    )
+    for line in context:
+        yield path, line + 1, lines[line]
+
+
+def search_mirror(
+    repo: Repo, mirror_path: str, index_path: str, scope: SearchScopeParams
+) -> Optional[list[SearchEntryResult]]:
+    if not os.path.isdir(mirror_path):
+        return None
+
+    try:
+        index = TrigramIndex(index_path)
+    except (OSError, ValueError):
+        return grep_mirror(repo, mirror_path, scope)
+
+    with index:
+        if index.commit != _head_commit(mirror_path):
+            return grep_mirror(repo, mirror_path, scope)
+        candidates = [
+            (sha, path) for sha, path in index.candidates(scope.search) if matches_scope(path, scope)
+        ]
+
+    search = scope.search.lower()
+    lines = (
+        line
+        for (_, path), data in zip(candidates, _read_blobs(mirror_path, [sha for sha, _ in candidates]))
+        for line in _scan_blob(path, data, search)
+    )
+    return build_results(repo, lines, scope)
+
+
+def index_is_stale(mirror_path: str, index_path: str) -> bool:
+    try:
+        with TrigramIndex(index_path) as index:
+            return index.commit != _head_commit(mirror_path)
+    except (OSError, ValueError, GitCommandError):
+        return True
@@ -0,0 +1,93 @@
+import json
+import os
+import secrets
+from datetime import datetime
+from typing import Any, Final, Optional
+
+from .config import CACHE_DIR_PATH
+from .models import Repo, RepoResult, SearchEntryResult, SearchParams
+
+# The searches and filters of a run, a resumed run searches the same repositories for the same searches.
+RUN_FILTERS: Final[set[str]] = {
+    "groups",
+    "search_code_inputs",
+    "visibility",
+    "extension",
+    "filename",
+    "path",
+    "engine",
+    "include_archived",
+}
+
+
+def new_run_id() -> str:
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(2)}"
+
+
+def _journal_file_path(run_id: str) -> str:
+    return os.path.join(CACHE_DIR_PATH, "runs", f"{os.path.basename(run_id)}.jsonl")
+
+
+def start_run(params: SearchParams) -> None:
+    """Create the journal of the run, a resumed run appends to its journal."""
+    file_path = _journal_file_path(params.run_id)
+    if os.path.exists(file_path):
+        return
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w") as file:
+        file.write(json.dumps({"params": params.dict(include=RUN_FILTERS)}) + "\n")
+
+
+def load_run_params(run_id: str) -> Optional[dict[str, Any]]:
+    try:
+        with open(_journal_file_path(run_id)) as file:
+            return json.loads(file.readline())["params"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def load_run_results(run_id: str) -> dict[tuple[str, int], RepoResult]:
+    """Results of the searches finished by the run, by search and repository id."""
+    results: dict[tuple[str, int], RepoResult] = {}
+    try:
+        with open(_journal_file_path(run_id)) as file:
+            next(file, None)
+            for line in file:
+                try:
+                    value = json.loads(line)
+                except ValueError:
+                    # The last line of an interrupted run can be cut.
+                    continue
+                results[(value["search"], value["repo_id"])] = RepoResult.construct(
+                    name=value["name"],
+                    web_url=value["web_url"],
+                    search_code_input=value["search"],
+                    results=[SearchEntryResult.from_api(entry) for entry in value["results"]],
+                )
+    except OSError:
+        pass
+
+    return results
+
+
+def append_run_result(run_id: str, search_code_input: str, repo: Repo, data: list[SearchEntryResult]) -> None:
+    line = json.dumps(
+        {
+            "search": search_code_input,
+            "repo_id": repo.id,
+            "name": repo.name,
+            "web_url": repo.web_url,
+            "results": [entry.dict(by_alias=True) for entry in data],
+        }
+    )
+    # One write per line, flushed at once, an interrupted run loses at most the line being written.
+    with open(_journal_file_path(run_id), "a") as file:
+        file.write(line + "\n")
+
+
+def remove_run(run_id: str) -> None:
+    try:
+        os.remove(_journal_file_path(run_id))
+    except FileNotFoundError:
+        pass
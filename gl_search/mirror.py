@@ -0,0 +1,155 @@
+import base64
+import fnmatch
+import os
+import posixpath
+import shutil
+import subprocess  # nosec
+from typing import Iterable, Iterator, Optional
+
+from .config import settings
+from .models import Repo, SearchEntryResult, SearchScopeParams
+
+
+class GitCommandError(Exception):
+    def __init__(self, returncode: int, stderr: str) -> None:
+        super().__init__(f"git exited with {returncode}: {stderr}")
+        self.returncode = returncode
+
+
+def git(*args: str) -> str:
+    credentials = base64.b64encode(f"oauth2:{settings.GITLAB_PRIVATE_TOKEN}".encode()).decode()
+    env = {
+        **os.environ,
+        "GIT_TERMINAL_PROMPT": "0",
+        # Through the environment, so the token is not in the process list nor in the mirror config.
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+    }
+    result = subprocess.run(["git", *args], env=env, capture_output=True)  # nosec
+    if result.returncode:
+        raise GitCommandError(result.returncode, result.stderr.decode(errors="replace").strip())
+
+    # Decoded by hand, text mode would also split the lines on a lone carriage return.
+    return result.stdout.decode(errors="replace")
+
+
+def sync_mirror(repo: Repo, mirror_path: str) -> bool:
+    # Empty repositories have no default branch to mirror.
+    if not repo.http_url_to_repo or not repo.default_branch:
+        return False
+
+    branch_ref = f"refs/heads/{repo.default_branch}"
+    git_dir = mirror_path if os.path.isdir(mirror_path) else f"{mirror_path}.{os.getpid()}.tmp"
+
+    try:
+        if git_dir != mirror_path:
+            git("init", "--quiet", "--bare", git_dir)
+        git(
+            "--git-dir",
+            git_dir,
+            "fetch",
+            "--quiet",
+            "--no-tags",
+            "--depth=1",
+            repo.http_url_to_repo,
+            f"+{branch_ref}:{branch_ref}",
+        )
+        git("--git-dir", git_dir, "symbolic-ref", "HEAD", branch_ref)
+    except GitCommandError:
+        if git_dir != mirror_path:
+            shutil.rmtree(git_dir, ignore_errors=True)
+        raise
+
+    if git_dir != mirror_path:
+        os.replace(git_dir, mirror_path)
+
+    return True
+
+
+def _pathspec(scope: SearchScopeParams) -> str:
+    pathspec = f"**/{scope.path.strip('/')}/**/" if scope.path else "**/"
+    if scope.filename:
+        return f":(glob){pathspec}{scope.filename}"
+    if scope.extension:
+        return f":(glob){pathspec}*.{scope.extension}"
+    return f":(glob){pathspec}*"
+
+
+def matches_scope(path: str, scope: SearchScopeParams) -> bool:
+    if scope.path and f"/{scope.path.strip('/')}/" not in f"/{path}":
+        return False
+
+    filename = posixpath.basename(path)
+    if scope.filename and not fnmatch.fnmatchcase(filename, scope.filename):
+        return False
+
+    return not scope.extension or filename.endswith(f".{scope.extension}")
+
+
+def build_results(
+    repo: Repo, lines: Iterable[tuple[str, int, str]], scope: SearchScopeParams
+) -> list[SearchEntryResult]:
+    """Group the consecutive lines of each file in one entry, like the data returned by the search API."""
+    data_list: list[SearchEntryResult] = []
+    previous_path, previous_line = None, 0
+
+    for path, line, text in lines:
+        if path == previous_path and line == previous_line + 1:
+            data_list[-1].data += f"\n{text}"
+        elif matches_scope(path, scope):
+            data_list.append(
+                SearchEntryResult(
+                    path=path,
+                    filename=path,
+                    project_id=repo.id,
+                    data=text,
+                    startline=line,
+                    ref=repo.default_branch,
+                )
+            )
+        else:
+            continue
+        previous_path, previous_line = path, line
+
+    return data_list
+
+
+def _parse_grep_output(output: str) -> Iterator[tuple[str, int, str]]:
+    for line in output.split("\n"):
+        # git grep splits the context of distant matches with "--".
+        if not line or line == "--":
+            continue
+
+        path, line_number, text = line.split("\0", 2)
+        yield path.removeprefix("HEAD:"), int(line_number), text
+
+
+def grep_mirror(repo: Repo, mirror_path: str, scope: SearchScopeParams) -> Optional[list[SearchEntryResult]]:
+    if not os.path.isdir(mirror_path):
+        return None
+
+    try:
+        output = git(
+            "--git-dir",
+            mirror_path,
+            "grep",
+            "--null",
+            "--line-number",
+            "--context=1",
+            "--ignore-case",
+            "--fixed-strings",
+            "-I",
+            "-e",
+            scope.search,
+            "HEAD",
+            "--",
+            _pathspec(scope),
+        )
+    except GitCommandError as error:
+        # git grep exits with 1 when nothing matches.
+        if error.returncode != 1:
+            raise
+        return []
+
+    return build_results(repo, _parse_grep_output(output), scope)
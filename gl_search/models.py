@@ -1,23 +1,41 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Optional
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, validator
 
 
-class SearchParams(BaseModel):
+class InventoryParams(BaseModel):
     groups: Optional[str]
-    search_code_input: str
     max_workers: int
     visibility: list[str]
+    max_delay_request: Optional[float] = None
+    refresh_inventory: bool = False
+    include_archived: bool = False
+
+
+class SearchParams(InventoryParams):
+    search_code_input: str
+    search_code_inputs: list[str] = list()
     extension: Optional[str]
     filename: Optional[str]
     path: Optional[str]
-    max_random_time_for_sleep: int
+    engine: str = "project"
+    use_cache: bool = True
+    max_results: Optional[int] = None
+    priority: str = "activity"
+    run_id: Optional[str] = None
 
+    @validator("search_code_inputs", always=True)
+    def _default_search_code_inputs(cls, value: list[str], values: dict[str, Any]) -> list[str]:
+        if value or "search_code_input" not in values:
+            return value
 
-class SearchRepoParams(BaseModel):
-    repo_id: int
+        return [values["search_code_input"]]
+
+
+class SearchScopeParams(BaseModel):
     search: str = Field(alias="search_code_input")
-    max_random_time_for_sleep: int
+    max_delay_request: Optional[float] = None
     extension: Optional[str] = None
     filename: Optional[str] = None
     path: Optional[str] = None
@@ -37,11 +55,24 @@ class SearchRepoParams(BaseModel):
         return search
 
 
+class SearchRepoParams(SearchScopeParams):
+    repo_id: int
+
+
+class SearchGroupParams(SearchScopeParams):
+    group_id: int
+
+
 class RequestDescribe(BaseModel):
     url: HttpUrl
     params: dict[str, str] = dict()
 
 
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    # fromisoformat only takes the "Z" suffix since python 3.11.
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
 class SearchEntryResult(BaseModel):
     path: str
     filename: str
@@ -50,18 +81,65 @@ class SearchEntryResult(BaseModel):
     start_line: int = Field(alias="startline")
     ref: str
 
+    @classmethod
+    def from_api(cls, value: dict[str, Any]) -> "SearchEntryResult":
+        """Build the entry from a trusted GitLab blob without validating it, unless a field is missing."""
+        try:
+            return cls.construct(
+                path=value["path"],
+                filename=value["filename"],
+                project_id=value["project_id"],
+                data=value["data"],
+                start_line=value["startline"],
+                ref=value["ref"],
+            )
+        except KeyError:
+            return cls(**value)
+
+
+class Group(BaseModel):
+    id: int
+    parent_id: Optional[int] = None
+
 
 class Repo(BaseModel):
     id: int
     name: str
-    visibility: str
+    visibility: Optional[str] = None
     web_url: str
+    http_url_to_repo: Optional[str] = None
+    default_branch: Optional[str] = None
+    last_activity_at: Optional[datetime] = None
 
     class Config:
         frozen = True
 
+    @classmethod
+    def from_api(cls, value: dict[str, Any]) -> "Repo":
+        """Build the repo from a trusted GitLab project without validating it, unless a field is off."""
+        try:
+            return cls.construct(
+                id=value["id"],
+                name=value["name"],
+                visibility=value.get("visibility"),
+                web_url=value["web_url"],
+                http_url_to_repo=value.get("http_url_to_repo"),
+                default_branch=value.get("default_branch"),
+                last_activity_at=_parse_datetime(value.get("last_activity_at")),
+            )
+        except (KeyError, ValueError):
+            return cls(**value)
+
+
+class Inventory(BaseModel):
+    groups_ids: list[int]
+    repos: list[Repo]
+    updated_at: datetime
+
 
 class RepoResult(BaseModel):
     name: str
     web_url: str
+    search_code_input: Optional[str] = None
     results: list[SearchEntryResult] = list()
+    failed: bool = False
@@ -0,0 +1,53 @@
+import math
+from typing import Any, Callable, Final
+from urllib.parse import urlparse
+
+from .cache import load_hits
+from .config import settings
+from .models import Repo, SearchParams
+
+PRIORITY_ACTIVITY: Final[str] = "activity"
+PRIORITY_PINNED: Final[str] = "pinned"
+PRIORITY_HITS: Final[str] = "hits"
+
+RepoKey = Callable[[Repo], Any]
+
+
+def _by_activity(params: SearchParams) -> RepoKey:
+    def key(repo: Repo) -> float:
+        return -repo.last_activity_at.timestamp() if repo.last_activity_at else math.inf
+
+    return key
+
+
+def _by_pinned_groups(params: SearchParams) -> RepoKey:
+    # The paths of the repositories under the pinned groups and their subgroups start with the group path.
+    prefixes = tuple(f"/{group_path.strip('/')}/" for group_path in settings.PINNED_GROUPS)
+    by_activity = _by_activity(params)
+
+    def key(repo: Repo) -> tuple[bool, float]:
+        return not urlparse(repo.web_url).path.startswith(prefixes), by_activity(repo)
+
+    return key
+
+
+def _by_hits(params: SearchParams) -> RepoKey:
+    hits = load_hits()
+    by_activity = _by_activity(params)
+
+    def key(repo: Repo) -> tuple[int, float]:
+        return -hits.get(repo.web_url, 0), by_activity(repo)
+
+    return key
+
+
+# Each priority builds the sort key of the repositories of a search, the lowest are searched first.
+PRIORITIES: Final[dict[str, Callable[[SearchParams], RepoKey]]] = {
+    PRIORITY_ACTIVITY: _by_activity,
+    PRIORITY_PINNED: _by_pinned_groups,
+    PRIORITY_HITS: _by_hits,
+}
+
+
+def repo_priority(params: SearchParams) -> RepoKey:
+    return PRIORITIES[params.priority](params)
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Mapping, Optional
+
+# RateLimit-Reset is an epoch timestamp on GitLab, values below this are taken as seconds to wait.
+_EPOCH_THRESHOLD = 1_000_000_000
+
+
+class RateLimiter:
+    """Token bucket shared by every worker thread, sized from the GitLab rate limit headers."""
+
+    _rate: Optional[float]
+    _tokens: float
+    _capacity: float
+    _updated_at: float
+    _blocked_until: float
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._rate = None
+            self._tokens = 0.0
+            self._capacity = 0.0
+            self._updated_at = time.monotonic()
+            self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self._rate is not None:
+            self._tokens = min(self._tokens + (now - self._updated_at) * self._rate, self._capacity)
+        self._updated_at = now
+
+    def acquire(self, max_wait: Optional[float] = None) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            wait = max(self._blocked_until - now, 0.0)
+            if self._rate is not None:
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self._rate)
+
+        if max_wait is not None:
+            wait = min(wait, max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        remaining = _parse_number(headers.get("RateLimit-Remaining"))
+        reset = _parse_number(headers.get("RateLimit-Reset"))
+        limit = _parse_number(headers.get("RateLimit-Limit"))
+        retry_after = _parse_number(headers.get("Retry-After"))
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if remaining is not None and reset is not None:
+                seconds_to_reset = reset - time.time() if reset > _EPOCH_THRESHOLD else reset
+                seconds_to_reset = max(seconds_to_reset, 1.0)
+
+                # Responses arrive out of order and requests already acquired are still in flight,
+                # so the server count may only lower the bucket, never refill it.
+                self._tokens = remaining if self._rate is None else min(self._tokens, remaining)
+                self._capacity = max(limit or 0.0, remaining, 1.0)
+                self._rate = max(remaining, 1.0) / seconds_to_reset
+                if remaining <= 0:
+                    self._blocked_until = max(self._blocked_until, now + seconds_to_reset)
+
+            if retry_after is not None:
+                self._tokens = min(self._tokens, 0.0)
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    if value is None or not value.strip().isdigit():
+        return None
+
+    return float(value)
+
+
+rate_limiter = RateLimiter()
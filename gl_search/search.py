@@ -1,13 +1,79 @@
 import concurrent.futures
-from asyncio import Future
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import queue
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from typing import Any, Callable, Final, Generic, Hashable, Iterable, Iterator, Optional, TypeVar, Union
 
+from .cache import (
+    index_file_path,
+    load_inventory,
+    load_search_results,
+    mirror_dir_path,
+    record_hits,
+    remove_from_inventory,
+    save_inventory,
+    save_search_results,
+)
 from .config import settings
 from .display import process_user_feedback
-from .models import Repo, RepoResult, RequestDescribe, SearchEntryResult, SearchParams, SearchRepoParams
-from .utils import retrieve_data
+from .index import build_index, index_is_stale, search_mirror
+from .journal import append_run_result, load_run_results, remove_run, start_run
+from .mirror import GitCommandError, sync_mirror
+from .models import (
+    Group,
+    Inventory,
+    InventoryParams,
+    Repo,
+    RepoResult,
+    RequestDescribe,
+    SearchEntryResult,
+    SearchGroupParams,
+    SearchParams,
+    SearchRepoParams,
+    SearchScopeParams,
+)
+from .priority import repo_priority
+from .utils import (
+    InvalidStatusCodeError,
+    RateLimitedError,
+    cancel_requests,
+    configure_session,
+    iter_data,
+    resume_requests,
+    retrieve_data,
+)
 
+logger = logging.getLogger(__name__)
 
-def _retrieve_groups_ids(params: SearchParams) -> list[int]:
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+ENGINE_PROJECT: Final[str] = "project"
+ENGINE_GROUP: Final[str] = "group"
+ENGINE_LOCAL: Final[str] = "local"
+
+VISIBILITIES: Final[frozenset[str]] = frozenset({"internal", "public", "private"})
+
+# Advanced search does not paginate past this many results, so reaching it means the
+# group search was truncated and its projects must be searched one by one.
+GROUP_SEARCH_RESULT_WINDOW: Final[int] = 10_000
+
+
+def _root_groups_ids(groups: list[Group]) -> list[int]:
+    groups_ids = {group.id for group in groups}
+
+    return [group.id for group in groups if group.parent_id not in groups_ids]
+
+
+def _retrieve_groups_ids(params: InventoryParams) -> list[int]:
     request = RequestDescribe(
         url=f"{settings.GITLAB_URL}/api/v4/groups",
         params={
@@ -18,47 +84,175 @@ def _retrieve_groups_ids(params: SearchParams) -> list[int]:
         },
     )
 
-    data_list: list[int] = retrieve_data(
-        request, lambda value: value["id"], max_random_time_for_sleep=params.max_random_time_for_sleep
+    groups: list[Group] = retrieve_data(
+        request, lambda value: Group(**value), max_delay_request=params.max_delay_request
     )
 
-    return data_list
+    return _root_groups_ids(groups)
 
 
-def _retrieve_repositories_by(group_id: int, params: SearchParams) -> set[Repo]:
-    request = RequestDescribe(
-        url=f"{settings.GITLAB_URL}/api/v4/groups/{group_id}/projects",
-        params={
-            "per_page": "100",
-            "include_subgroups": "true",
-        },
-    )
-    repos = set(
-        retrieve_data(
-            request, lambda value: Repo(**value), max_random_time_for_sleep=params.max_random_time_for_sleep
+def _retrieve_repositories_by(
+    group_id: int,
+    params: InventoryParams,
+    last_activity_after: Optional[datetime] = None,
+    on_repo: Optional[Callable[[Repo], None]] = None,
+) -> set[Repo]:
+    repos: set[Repo] = set()
+
+    # The simple payload has no visibility, so only split the listing when filtering by it.
+    visibilities: list[Optional[str]] = [None]
+    if not VISIBILITIES.issubset(params.visibility):
+        visibilities = list(params.visibility)
+
+    for visibility in visibilities:
+        request = RequestDescribe(
+            url=f"{settings.GITLAB_URL}/api/v4/groups/{group_id}/projects",
+            params={
+                "per_page": "100",
+                "include_subgroups": "true",
+                "simple": "true",
+            },
         )
-    )
+        if visibility:
+            request.params["visibility"] = visibility
+        if not params.include_archived:
+            request.params["archived"] = "false"
+        if last_activity_after:
+            request.params.update(
+                {
+                    "last_activity_after": last_activity_after.astimezone(timezone.utc).strftime(
+                        "%Y-%m-%dT%H:%M:%SZ"
+                    ),
+                    "order_by": "last_activity_at",
+                }
+            )
+
+        for repo in iter_data(
+            request,
+            lambda value, visibility=visibility: Repo.from_api(
+                {**value, "visibility": visibility or value.get("visibility")}
+            ),
+            max_delay_request=params.max_delay_request,
+        ):
+            repos.add(repo)
+            if on_repo:
+                on_repo(repo)
+
+    return repos
 
-    return {repo for repo in repos if repo.visibility in params.visibility}
+
+class _Scheduler(Generic[K]):
+    """Tasks of an executor read as they finish, new tasks can be submitted while reading.
+
+    Rate limited tasks are submitted again when due. The running tasks can hand items to the
+    reader with put, those are read with a None key.
+    """
+
+    def __init__(self, executor: concurrent.futures.Executor) -> None:
+        self._executor = executor
+        self._tasks: dict[K, tuple[Callable, tuple]] = {}
+        self._events: queue.SimpleQueue[tuple[Optional[K], Optional[int], Any]] = queue.SimpleQueue()
+        self._running = 0
+        self._deferred: list[tuple[float, int, K, int]] = []
+        self._sequence = itertools.count()
+
+    def submit(self, key: K, function: Callable, *arguments: Any) -> None:
+        self._tasks[key] = (function, arguments)
+        self._dispatch(key, 0)
+
+    def put(self, item: Any) -> None:
+        self._events.put((None, None, item))
+
+    def _dispatch(self, key: K, retries: int) -> None:
+        function, arguments = self._tasks[key]
+        self._running += 1
+        future = self._executor.submit(function, *arguments)
+        future.add_done_callback(lambda future: self._events.put((key, retries, future)))
+
+    def __iter__(self) -> Iterator[tuple[Optional[K], Any, bool]]:
+        # The items put by a task are queued before its completion, so none is left once nothing runs.
+        while self._running or self._deferred:
+            now = time.monotonic()
+            while self._deferred and self._deferred[0][0] <= now:
+                _, _, key, retries = heapq.heappop(self._deferred)
+                self._dispatch(key, retries)
+
+            timeout = self._deferred[0][0] - now if self._deferred else None
+            if not self._running:
+                time.sleep(timeout)
+                continue
+
+            try:
+                key, retries, event = self._events.get(timeout=timeout)
+            except queue.Empty:
+                continue
+
+            if retries is None:
+                yield None, event, False
+                continue
+
+            self._running -= 1
+            future: Future = event
+            failed = False
+            try:
+                result = future.result()
+            except InvalidStatusCodeError:
+                result, failed = None, True
+            except RateLimitedError as error:
+                if retries < settings.RATE_LIMITED_RETRIES:
+                    retry_after = 2**retries if error.retry_after is None else error.retry_after
+                    ready_at = time.monotonic() + retry_after
+                    heapq.heappush(self._deferred, (ready_at, next(self._sequence), key, retries + 1))
+                    continue
+                result, failed = None, True
+
+            del self._tasks[key]
+            yield key, result, failed
+
+
+@contextlib.contextmanager
+def _cancel_on_close(
+    executor: Union[concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor]
+) -> Iterator[concurrent.futures.Executor]:
+    """Run the executor, dropping its tasks not started yet when the generator reading it is closed."""
+    with executor:
+        try:
+            yield executor
+        except GeneratorExit:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def _as_completed_with_retries(
+    executor: concurrent.futures.Executor, function: Callable[..., T], tasks: dict[K, tuple]
+) -> Iterator[tuple[K, Optional[T], bool]]:
+    """Yield (key, result, failed) as tasks finish, dispatching rate limited tasks again when due."""
+    scheduler: _Scheduler[K] = _Scheduler(executor)
+    for key, arguments in tasks.items():
+        scheduler.submit(key, function, *arguments)
+
+    yield from scheduler
 
 
 def _retrieve_information_from_repositories_of_each_group(
-    groups_id: list[int], params: SearchParams
-) -> set[Repo]:
+    groups_id: list[int], params: InventoryParams, last_activity_after: Optional[datetime] = None
+) -> tuple[set[Repo], set[int]]:
     process_user_feedback.set_total(process_user_feedback.SEARCHING_REPOS, len(groups_id))
     process_user_feedback.set_visible(process_user_feedback.SEARCHING_REPOS)
     repos: set[Repo] = set()
+    failed_groups_ids: set[int] = set()
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=params.max_workers) as executor:
-        futures: dict[Future[Repo], int] = {
-            executor.submit(_retrieve_repositories_by, group_id, params): group_id for group_id in groups_id
-        }
-        for future in concurrent.futures.as_completed(futures):
-            data: set[Repo] = future.result()
-            repos.update(data)
+        tasks = {group_id: (group_id, params, last_activity_after) for group_id in groups_id}
+        for group_id, data, failed in _as_completed_with_retries(executor, _retrieve_repositories_by, tasks):
+            if failed:
+                process_user_feedback.progress.print(f"Group {group_id} HttpStatus Code 429 SKIP this group")
+                failed_groups_ids.add(group_id)
+            else:
+                repos.update(data)
             process_user_feedback.set_advance(process_user_feedback.SEARCHING_REPOS)
 
-    return repos
+    return repos, failed_groups_ids
 
 
 def _search_in_repo(search_params: SearchRepoParams) -> list[SearchEntryResult]:
@@ -70,58 +264,546 @@ def _search_in_repo(search_params: SearchRepoParams) -> list[SearchEntryResult]:
     )
     data_list: list[SearchEntryResult] = retrieve_data(
         request,
-        lambda value: SearchEntryResult(**value),
-        max_random_time_for_sleep=search_params.max_random_time_for_sleep,
+        SearchEntryResult.from_api,
+        max_delay_request=search_params.max_delay_request,
     )
 
     return data_list
 
 
+def _search_in_group(search_params: SearchGroupParams) -> Optional[list[SearchEntryResult]]:
+    params = {"scope": "blobs", "search": search_params.search_with_params, "per_page": 100}
+
+    request = RequestDescribe(
+        url=f"{settings.GITLAB_URL}/api/v4/groups/{search_params.group_id}/search",
+        params=params,
+    )
+    data_list: list[SearchEntryResult] = []
+    try:
+        for entry in iter_data(
+            request, SearchEntryResult.from_api, max_delay_request=search_params.max_delay_request
+        ):
+            data_list.append(entry)
+            # Truncated, the remaining pages are not requested since the projects are searched one by one.
+            if len(data_list) >= GROUP_SEARCH_RESULT_WINDOW:
+                return None
+    except InvalidStatusCodeError:
+        return None
+
+    return data_list
+
+
+def _search_group(
+    group_id: int, params: SearchParams
+) -> tuple[set[Repo], dict[str, Optional[list[SearchEntryResult]]]]:
+    repos = _retrieve_repositories_by(group_id, params)
+
+    return repos, {
+        search_code_input: _search_in_group(
+            SearchGroupParams(group_id=group_id, **{**params.dict(), "search_code_input": search_code_input})
+        )
+        for search_code_input in params.search_code_inputs
+    }
+
+
+def _group_by_repo(
+    repos: Iterable[Repo], data: list[SearchEntryResult], search_code_input: str
+) -> Iterator[RepoResult]:
+    results_by_repo: dict[int, list[SearchEntryResult]] = defaultdict(list)
+    for entry in data:
+        results_by_repo[entry.project_id].append(entry)
+
+    for repo in repos:
+        yield RepoResult.construct(
+            name=repo.name,
+            web_url=repo.web_url,
+            search_code_input=search_code_input,
+            results=results_by_repo.get(repo.id, []),
+        )
+
+
+def _search_code_by_group(groups_ids: list[int], params: SearchParams) -> Iterator[RepoResult]:
+    process_user_feedback.set_total(process_user_feedback.SEARCHING_REPOS, len(groups_ids))
+    process_user_feedback.set_visible(process_user_feedback.SEARCHING_REPOS)
+    process_user_feedback.set_total(process_user_feedback.SEARCHING_CODE, len(groups_ids))
+    process_user_feedback.set_visible(process_user_feedback.SEARCHING_CODE)
+    searched_repos: set[Repo] = set()
+    fallback_searches: list[tuple[str, Repo]] = []
+
+    # One task per group lists its repositories once and runs every search on the group.
+    with _cancel_on_close(concurrent.futures.ThreadPoolExecutor(max_workers=params.max_workers)) as executor:
+        tasks = {group_id: (group_id, params) for group_id in groups_ids}
+        for group_id, result, failed in _as_completed_with_retries(executor, _search_group, tasks):
+            process_user_feedback.set_advance(process_user_feedback.SEARCHING_REPOS)
+            process_user_feedback.set_advance(process_user_feedback.SEARCHING_CODE)
+
+            if failed:
+                process_user_feedback.progress.print(f"Group {group_id} HttpStatus Code 429 SKIP this group")
+                continue
+
+            repos, data_by_search = result
+            repos -= searched_repos
+            searched_repos.update(repos)
+
+            for search_code_input, data in data_by_search.items():
+                if data is None:
+                    fallback_searches.extend((search_code_input, repo) for repo in repos)
+                else:
+                    yield from _group_by_repo(repos, data, search_code_input)
+
+    if fallback_searches:
+        priority = repo_priority(params)
+        fallback_searches.sort(key=lambda search: priority(search[1]))
+        yield from _search_code_in_repos(
+            fallback_searches, params, process_user_feedback.SEARCHING_CODE_BY_REPO
+        )
+
+
+def _search_in_existing_repo(search_params: SearchRepoParams) -> Optional[list[SearchEntryResult]]:
+    try:
+        return _search_in_repo(search_params)
+    except InvalidStatusCodeError as error:
+        if error.status_code in (HTTPStatus.NOT_FOUND, HTTPStatus.FORBIDDEN):
+            return None
+        raise
+
+
+class _RepoSearches:
+    """The searches of the repositories submitted to a scheduler, each search of a repository once.
+
+    With a run id, the finished searches are appended to the journal of the run and the searches
+    already in it are not submitted again.
+    """
+
+    def __init__(self, scheduler: _Scheduler, params: SearchParams, task_name: str) -> None:
+        self._scheduler = scheduler
+        self._params = params
+        self._params_dict = params.dict()
+        self._task_name = task_name
+        self._search_params: dict[tuple[str, Repo], SearchRepoParams] = {}
+        self._searched: set[tuple[str, int]] = set()
+        self._missing_repos_ids: set[int] = set()
+        self._journaled = load_run_results(params.run_id) if params.run_id else {}
+
+    @property
+    def total(self) -> int:
+        return len(self._searched)
+
+    def add(self, search_code_input: str, repo: Repo) -> Optional[RepoResult]:
+        """Submit the search of a repository, or return its journaled or cached results."""
+        if (search_code_input, repo.id) in self._searched:
+            return None
+        self._searched.add((search_code_input, repo.id))
+
+        journaled = self._journaled.pop((search_code_input, repo.id), None)
+        if journaled is not None:
+            process_user_feedback.set_advance(self._task_name)
+            return journaled
+
+        search_params = SearchRepoParams(
+            repo_id=repo.id, **{**self._params_dict, "search_code_input": search_code_input}
+        )
+        cached_data = load_search_results(search_params, repo) if self._params.use_cache else None
+        if cached_data is None:
+            self._search_params[(search_code_input, repo)] = search_params
+            self._scheduler.submit((search_code_input, repo), _search_in_existing_repo, search_params)
+            return None
+
+        process_user_feedback.set_advance(self._task_name)
+        if self._params.run_id:
+            append_run_result(self._params.run_id, search_code_input, repo, cached_data)
+        return RepoResult.construct(
+            name=repo.name, web_url=repo.web_url, search_code_input=search_code_input, results=cached_data
+        )
+
+    def result(
+        self, key: tuple[str, Repo], data: Optional[list[SearchEntryResult]], failed: bool
+    ) -> Optional[RepoResult]:
+        """Result of a finished search, None when the repository no longer exists."""
+        search_code_input, repo = key
+        search_params = self._search_params.pop(key)
+        process_user_feedback.set_advance(self._task_name)
+
+        if failed:
+            return RepoResult.construct(
+                name=repo.name, web_url=repo.web_url, search_code_input=search_code_input, failed=True
+            )
+        if data is None:
+            self._missing_repos_ids.add(repo.id)
+            return None
+
+        if self._params.use_cache:
+            save_search_results(search_params, repo, data)
+        if self._params.run_id:
+            append_run_result(self._params.run_id, search_code_input, repo, data)
+        return RepoResult.construct(
+            name=repo.name, web_url=repo.web_url, search_code_input=search_code_input, results=data
+        )
+
+    def remove_missing_repos(self) -> None:
+        if self._missing_repos_ids:
+            remove_from_inventory(self._params, self._missing_repos_ids)
+
+
+def _search_code_in_repos(
+    searches: list[tuple[str, Repo]],
+    params: SearchParams,
+    task_name: str = process_user_feedback.SEARCHING_CODE,
+) -> Iterator[RepoResult]:
+    process_user_feedback.set_visible(task_name)
+
+    with _cancel_on_close(concurrent.futures.ThreadPoolExecutor(max_workers=params.max_workers)) as executor:
+        scheduler: _Scheduler[tuple[str, Repo]] = _Scheduler(executor)
+        repo_searches = _RepoSearches(scheduler, params, task_name)
+
+        process_user_feedback.set_total(task_name, len(searches))
+        for search_code_input, repo in searches:
+            cached_result = repo_searches.add(search_code_input, repo)
+            if cached_result:
+                yield cached_result
+        # A repeated search is only run once.
+        process_user_feedback.set_total(task_name, repo_searches.total)
+
+        for key, data, failed in scheduler:
+            result = repo_searches.result(key, data, failed)
+            if result:
+                yield result
+
+    repo_searches.remove_missing_repos()
+
+
 def _search_code(
-    repos: list[Repo],
+    repos: Iterable[Repo],
     params: SearchParams,
-) -> list[RepoResult]:
-    process_user_feedback.set_total(process_user_feedback.SEARCHING_CODE, len(repos))
+    task_name: str = process_user_feedback.SEARCHING_CODE,
+) -> Iterator[RepoResult]:
+    # Every (search, repository) pair shares the same executor, so a batch of searches costs one fan-out.
+    searches = [
+        (search_code_input, repo)
+        for repo in sorted(repos, key=repo_priority(params))
+        for search_code_input in params.search_code_inputs
+    ]
+    yield from _search_code_in_repos(searches, params, task_name)
+
+
+def _retrieve_groups(params: InventoryParams) -> list[int]:
+    if params.groups:
+        groups_ids = list(dict.fromkeys(map(int, params.groups.split(","))))
+    else:
+        groups_ids = _retrieve_groups_ids(params)
+
+    process_user_feedback.set_completed(process_user_feedback.SEARCHING_GROUPS)
+    return groups_ids
+
+
+def _refresh_inventory(
+    inventory: Inventory, params: InventoryParams
+) -> tuple[list[int], set[Repo], set[int]]:
+    groups_ids = _retrieve_groups(params)
+    new_groups_ids = [group_id for group_id in groups_ids if group_id not in inventory.groups_ids]
+    known_groups_ids = [group_id for group_id in groups_ids if group_id in inventory.groups_ids]
+
+    repos: dict[int, Repo] = {repo.id: repo for repo in inventory.repos}
+    updated_repos, failed_groups_ids = _retrieve_information_from_repositories_of_each_group(
+        known_groups_ids, params, last_activity_after=inventory.updated_at
+    )
+    if new_groups_ids:
+        new_repos, new_failed_groups_ids = _retrieve_information_from_repositories_of_each_group(
+            new_groups_ids, params
+        )
+        updated_repos |= new_repos
+        failed_groups_ids |= new_failed_groups_ids
+    repos.update({repo.id: repo for repo in updated_repos})
+
+    return groups_ids, set(repos.values()), failed_groups_ids
+
+
+def _is_fresh(inventory: Inventory, now: datetime) -> bool:
+    return now - inventory.updated_at < timedelta(seconds=settings.INVENTORY_CACHE_TTL)
+
+
+def _retrieve_inventory(params: InventoryParams) -> set[Repo]:
+    started_at = datetime.now(timezone.utc)
+    inventory = None if params.refresh_inventory else load_inventory(params)
+
+    if inventory and _is_fresh(inventory, started_at):
+        process_user_feedback.set_completed(process_user_feedback.SEARCHING_GROUPS)
+        return set(inventory.repos)
+
+    if inventory:
+        groups_ids, repos, failed_groups_ids = _refresh_inventory(inventory, params)
+    else:
+        groups_ids = _retrieve_groups(params)
+        repos, failed_groups_ids = _retrieve_information_from_repositories_of_each_group(groups_ids, params)
+
+    if not failed_groups_ids:
+        save_inventory(params, Inventory(groups_ids=groups_ids, repos=list(repos), updated_at=started_at))
+
+    return repos
+
+
+def _search_code_while_listing(
+    params: SearchParams, inventory: Optional[Inventory], started_at: datetime
+) -> Iterator[RepoResult]:
+    """List the repositories of each group and search each one as soon as it is listed.
+
+    The listings and the searches share one executor. With an expired inventory only the repositories
+    active since it was saved are listed, the others are searched once every listing finished.
+    """
+    groups_ids = _retrieve_groups(params)
+    known_repos: dict[int, Repo] = {repo.id: repo for repo in inventory.repos} if inventory else {}
+    listings = iter(
+        [
+            (group_id, inventory.updated_at if inventory and group_id in inventory.groups_ids else None)
+            for group_id in groups_ids
+        ]
+    )
+    listed_repos: dict[int, Repo] = {}
+    failed_groups_ids: set[int] = set()
+    listed_groups = 0
+
+    process_user_feedback.set_total(process_user_feedback.SEARCHING_REPOS, len(groups_ids))
+    process_user_feedback.set_visible(process_user_feedback.SEARCHING_REPOS)
+    process_user_feedback.set_total(process_user_feedback.SEARCHING_CODE, 0)
     process_user_feedback.set_visible(process_user_feedback.SEARCHING_CODE)
-    results: list[RepoResult] = []
+
+    with _cancel_on_close(concurrent.futures.ThreadPoolExecutor(max_workers=params.max_workers)) as executor:
+        scheduler: _Scheduler[Hashable] = _Scheduler(executor)
+        repo_searches = _RepoSearches(scheduler, params, process_user_feedback.SEARCHING_CODE)
+
+        def submit_listing() -> None:
+            for group_id, last_activity_after in itertools.islice(listings, 1):
+                scheduler.submit(
+                    group_id, _retrieve_repositories_by, group_id, params, last_activity_after, scheduler.put
+                )
+
+        def search_repos(repos: Iterable[Repo]) -> Iterator[RepoResult]:
+            for repo in repos:
+                for search_code_input in params.search_code_inputs:
+                    cached_result = repo_searches.add(search_code_input, repo)
+                    if cached_result:
+                        yield cached_result
+            process_user_feedback.set_total(process_user_feedback.SEARCHING_CODE, repo_searches.total)
+
+        # The executor runs its tasks in order, so only half of the workers list and the searches
+        # of the listed repositories do not wait for every listing.
+        for _ in range(max(1, params.max_workers // 2)):
+            submit_listing()
+        if not groups_ids:
+            yield from search_repos(known_repos.values())
+
+        for key, result, failed in scheduler:
+            if key is None:
+                listed_repos[result.id] = result
+                yield from search_repos([result])
+            elif isinstance(key, int):
+                process_user_feedback.set_advance(process_user_feedback.SEARCHING_REPOS)
+                if failed:
+                    process_user_feedback.progress.print(f"Group {key} HttpStatus Code 429 SKIP this group")
+                    failed_groups_ids.add(key)
+                submit_listing()
+
+                listed_groups += 1
+                if listed_groups == len(groups_ids):
+                    yield from search_repos(
+                        sorted(
+                            (repo for repo_id, repo in known_repos.items() if repo_id not in listed_repos),
+                            key=repo_priority(params),
+                        )
+                    )
+            else:
+                repo_result = repo_searches.result(key, result, failed)
+                if repo_result:
+                    yield repo_result
+
+    if not failed_groups_ids:
+        repos = list({**known_repos, **listed_repos}.values())
+        save_inventory(params, Inventory(groups_ids=groups_ids, repos=repos, updated_at=started_at))
+    repo_searches.remove_missing_repos()
+
+
+def sync_mirrors(params: InventoryParams) -> tuple[list[Repo], list[Repo]]:
+    configure_session(params.max_workers)
+    repos = _retrieve_inventory(params)
+    process_user_feedback.set_total(process_user_feedback.SYNCING_MIRRORS, len(repos))
+    process_user_feedback.set_visible(process_user_feedback.SYNCING_MIRRORS)
+    synced_repos: list[Repo] = []
+    failed_repos: list[Repo] = []
+
     with concurrent.futures.ThreadPoolExecutor(max_workers=params.max_workers) as executor:
-        futures: dict[Future[list[SearchEntryResult]], Repo] = {
+        futures = {executor.submit(sync_mirror, repo, mirror_dir_path(repo)): repo for repo in repos}
+        for future in concurrent.futures.as_completed(futures):
+            repo = futures[future]
+            process_user_feedback.set_advance(process_user_feedback.SYNCING_MIRRORS)
+            try:
+                if future.result():
+                    synced_repos.append(repo)
+            except GitCommandError as error:
+                logger.debug("Failed to sync %s: %s", repo.web_url, error)
+                failed_repos.append(repo)
+
+    return synced_repos, failed_repos
+
+
+def _retrieve_mirrored_inventory(params: InventoryParams) -> set[Repo]:
+    # The mirrors are only as fresh as the last sync, so its inventory is enough whatever its age.
+    inventory = None if params.refresh_inventory else load_inventory(params)
+    if inventory is None:
+        return _retrieve_inventory(params)
+
+    process_user_feedback.set_completed(process_user_feedback.SEARCHING_GROUPS)
+    return set(inventory.repos)
+
+
+def index_mirrors(params: InventoryParams, rebuild: bool = False) -> tuple[list[Repo], list[Repo]]:
+    repos = [
+        repo
+        for repo in _retrieve_mirrored_inventory(params)
+        if os.path.isdir(mirror_dir_path(repo))
+        and (rebuild or index_is_stale(mirror_dir_path(repo), index_file_path(repo)))
+    ]
+    process_user_feedback.set_total(process_user_feedback.INDEXING_MIRRORS, len(repos))
+    process_user_feedback.set_visible(process_user_feedback.INDEXING_MIRRORS)
+    indexed_repos: list[Repo] = []
+    failed_repos: list[Repo] = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=params.max_workers) as executor:
+        futures = {
+            executor.submit(build_index, mirror_dir_path(repo), index_file_path(repo)): repo for repo in repos
+        }
+        for future in concurrent.futures.as_completed(futures):
+            repo = futures[future]
+            process_user_feedback.set_advance(process_user_feedback.INDEXING_MIRRORS)
+            try:
+                future.result()
+            except (GitCommandError, OSError) as error:
+                logger.debug("Failed to index %s: %s", repo.web_url, error)
+                failed_repos.append(repo)
+            else:
+                indexed_repos.append(repo)
+
+    return indexed_repos, failed_repos
+
+
+def _search_code_in_mirrors(repos: Iterable[Repo], params: SearchParams) -> Iterator[RepoResult]:
+    repos = sorted(repos, key=repo_priority(params))
+    process_user_feedback.set_total(
+        process_user_feedback.SEARCHING_CODE, len(repos) * len(params.search_code_inputs)
+    )
+    process_user_feedback.set_visible(process_user_feedback.SEARCHING_CODE)
+    not_mirrored_repos: set[Repo] = set()
+
+    with _cancel_on_close(concurrent.futures.ProcessPoolExecutor(max_workers=params.max_workers)) as executor:
+        futures = {
             executor.submit(
-                _search_in_repo,
-                SearchRepoParams(
-                    repo_id=repo.id,
-                    **params.dict(),
-                ),
-            ): repo
+                search_mirror,
+                repo,
+                mirror_dir_path(repo),
+                index_file_path(repo),
+                SearchScopeParams(**{**params.dict(), "search_code_input": search_code_input}),
+            ): (search_code_input, repo)
+            for search_code_input in params.search_code_inputs
             for repo in repos
         }
         for future in concurrent.futures.as_completed(futures):
-            repo: Repo = futures[future]
+            search_code_input, repo = futures[future]
+            process_user_feedback.set_advance(process_user_feedback.SEARCHING_CODE)
+            try:
+                data = future.result()
+            except GitCommandError as error:
+                logger.debug("Failed to search %s: %s", repo.web_url, error)
+                yield RepoResult.construct(
+                    name=repo.name, web_url=repo.web_url, search_code_input=search_code_input, failed=True
+                )
+                continue
 
-            data: list[SearchEntryResult] = future.result()
+            if data is None:
+                not_mirrored_repos.add(repo)
+                continue
 
-            results.append(RepoResult(name=repo.name, web_url=repo.web_url, results=data))
+            yield RepoResult.construct(
+                name=repo.name, web_url=repo.web_url, search_code_input=search_code_input, results=data
+            )
 
-            process_user_feedback.set_advance(process_user_feedback.SEARCHING_CODE)
+    if not_mirrored_repos:
+        process_user_feedback.progress.print(
+            f"{len(not_mirrored_repos)} repositories are not mirrored, run gl-search mirror sync"
+        )
 
-    return results
 
+def _limit_results(results: Iterator[RepoResult], max_results: int) -> Iterator[RepoResult]:
+    """Stop the search once max_results blobs were found, the pending tasks are cancelled."""
+    found = 0
+    try:
+        for result in results:
+            found += len(result.results)
+            if found >= max_results:
+                kept = len(result.results) - (found - max_results)
+                yield result.copy(update={"results": result.results[:kept]})
+                return
 
-def _retrieve_groups(params: SearchParams) -> list[int]:
-    if params.groups:
-        groups_ids = list(map(int, params.groups.split(",")))
-    else:
-        groups_ids = _retrieve_groups_ids(params)
+            yield result
+    finally:
+        # The running tasks fail on their next page instead of paginating until the end.
+        cancel_requests()
+        try:
+            results.close()
+        finally:
+            resume_requests()
 
-    process_user_feedback.set_completed(process_user_feedback.SEARCHING_GROUPS)
-    return groups_ids
 
+def _search(params: SearchParams) -> Iterator[RepoResult]:
+    configure_session(params.max_workers)
 
-def search(params: SearchParams) -> list[dict[str, str]]:
-    groups_ids = _retrieve_groups(params)
+    if params.engine == ENGINE_GROUP:
+        yield from _search_code_by_group(_retrieve_groups(params), params)
+        return
+
+    if params.engine == ENGINE_LOCAL:
+        yield from _search_code_in_mirrors(_retrieve_mirrored_inventory(params), params)
+        return
+
+    started_at = datetime.now(timezone.utc)
+    inventory = None if params.refresh_inventory else load_inventory(params)
+    if inventory and _is_fresh(inventory, started_at):
+        process_user_feedback.set_completed(process_user_feedback.SEARCHING_GROUPS)
+        yield from _search_code(inventory.repos, params)
+        return
+
+    yield from _search_code_while_listing(params, inventory, started_at)
+
+
+def _record_hits(results: Iterator[RepoResult]) -> Iterator[RepoResult]:
+    """Count the repositories with results, searched first by the hits priority of the next runs."""
+    web_urls: set[str] = set()
+    try:
+        for result in results:
+            if result.results:
+                web_urls.add(result.web_url)
+            yield result
+    finally:
+        results.close()
+        if web_urls:
+            record_hits(web_urls)
+
+
+def _complete_run(results: Iterator[RepoResult], run_id: str) -> Iterator[RepoResult]:
+    """Remove the journal once every search of the run succeeded, until then the run can be resumed."""
+    failed = False
+    for result in results:
+        failed = failed or result.failed
+        yield result
+
+    if not failed:
+        remove_run(run_id)
 
-    repos = _retrieve_information_from_repositories_of_each_group(groups_ids, params)
 
-    result = _search_code(repos, params)
+def search(params: SearchParams) -> Iterator[RepoResult]:
+    results = _search(params)
+    if params.run_id:
+        start_run(params)
+        results = _complete_run(results, params.run_id)
+    if params.max_results is not None:
+        results = _limit_results(results, params.max_results)
 
-    return result
+    yield from _record_hits(results)
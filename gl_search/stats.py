@@ -0,0 +1,192 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+PHASE_GROUPS = "groups"
+PHASE_REPOSITORIES = "repositories"
+PHASE_SEARCH = "search"
+PHASE_OTHER = "other"
+PHASE_RENDER = "render"
+
+
+class RequestRecord(NamedTuple):
+    endpoint: str
+    phase: str
+    status: int
+    size: int
+    retries: int
+    sleep: float
+    started_at: float
+    duration: float
+    thread_id: int
+
+
+def endpoint_template(url: str) -> str:
+    return _ID_SEGMENT.sub("/:id", urlsplit(url).path)
+
+
+def _phase(endpoint: str) -> str:
+    if endpoint.endswith("/search"):
+        return PHASE_SEARCH
+    if endpoint.endswith("/projects"):
+        return PHASE_REPOSITORIES
+    if endpoint.endswith("/groups"):
+        return PHASE_GROUPS
+    return PHASE_OTHER
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    # Nearest rank on sorted values.
+    return values[max(math.ceil(len(values) * percentile / 100) - 1, 0)]
+
+
+class RequestStats:
+    """Timings of every request, only collected once enabled by --stats or --trace."""
+
+    enabled: bool
+    _records: list[RequestRecord]
+    _phases_time: dict[str, float]
+    _started_at: float
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.enabled = False
+            self._records = []
+            self._phases_time = defaultdict(float)
+            self._started_at = time.perf_counter()
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def record(
+        self,
+        url: str,
+        status: int,
+        size: int,
+        retries: int,
+        sleep: float,
+        started_at: float,
+        duration: float,
+    ) -> None:
+        endpoint = endpoint_template(url)
+        record = RequestRecord(
+            endpoint,
+            _phase(endpoint),
+            status,
+            size,
+            retries,
+            sleep,
+            started_at,
+            duration,
+            threading.get_ident(),
+        )
+        with self._lock:
+            self._records.append(record)
+
+    def add_phase_time(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._phases_time[phase] += seconds
+
+    @property
+    def records(self) -> list[RequestRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> list[dict[str, Any]]:
+        records_by_phase: dict[str, list[RequestRecord]] = defaultdict(list)
+        for record in self.records:
+            records_by_phase[record.phase].append(record)
+
+        rows: list[dict[str, Any]] = []
+        for phase, records in records_by_phase.items():
+            durations = sorted(record.duration for record in records)
+            rows.append(
+                {
+                    "phase": phase,
+                    "requests": len(records),
+                    "errors": sum(1 for record in records if record.status >= 400 or not record.status),
+                    "retries": sum(record.retries for record in records),
+                    "bytes": sum(record.size for record in records),
+                    "time": sum(durations),
+                    "sleep": sum(record.sleep for record in records),
+                    "p50": _percentile(durations, 50),
+                    "p95": _percentile(durations, 95),
+                    "p99": _percentile(durations, 99),
+                }
+            )
+
+        with self._lock:
+            phases_time = dict(self._phases_time)
+        for phase, seconds in phases_time.items():
+            rows.append({"phase": phase, "requests": 0, "time": seconds})
+
+        return rows
+
+    def write_trace(self, file_path: str) -> None:
+        """Write the requests in the Chrome trace event format, readable by chrome://tracing or Perfetto."""
+        events: list[dict[str, Any]] = []
+        for record in self.records:
+            started_at = (record.started_at - self._started_at) * 1_000_000
+            if record.sleep:
+                events.append(
+                    {
+                        "name": "rate limit",
+                        "cat": "sleep",
+                        "ph": "X",
+                        "ts": started_at - record.sleep * 1_000_000,
+                        "dur": record.sleep * 1_000_000,
+                        "pid": 1,
+                        "tid": record.thread_id,
+                    }
+                )
+            events.append(
+                {
+                    "name": record.endpoint,
+                    "cat": record.phase,
+                    "ph": "X",
+                    "ts": started_at,
+                    "dur": record.duration * 1_000_000,
+                    "pid": 1,
+                    "tid": record.thread_id,
+                    "args": {"status": record.status, "bytes": record.size, "retries": record.retries},
+                }
+            )
+
+        with open(file_path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+def format_summary(rows: list[dict[str, Any]]) -> Optional[str]:
+    if not rows:
+        return None
+
+    lines = [
+        f"{'phase':<14}{'requests':>9}{'errors':>7}{'retries':>8}{'KiB':>9}"
+        f"{'time s':>9}{'sleep s':>9}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}"
+    ]
+    for row in rows:
+        if not row["requests"]:
+            lines.append(f"{row['phase']:<14}{'':>9}{'':>7}{'':>8}{'':>9}{row['time']:>9.2f}")
+            continue
+        lines.append(
+            f"{row['phase']:<14}{row['requests']:>9}{row['errors']:>7}{row['retries']:>8}"
+            f"{row['bytes'] / 1024:>9.0f}{row['time']:>9.2f}{row['sleep']:>9.2f}"
+            f"{row['p50'] * 1000:>8.0f}{row['p95'] * 1000:>8.0f}{row['p99'] * 1000:>8.0f}"
+        )
+
+    return "\n".join(lines)
+
+
+request_stats = RequestStats()
@@ -1,8 +1,12 @@
+import concurrent.futures
+import itertools
 import logging
+import math
+import threading
 import time
+from collections import deque
 from http import HTTPStatus
-from random import uniform
-from typing import Callable
+from typing import Any, Callable, Iterator, Optional
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -11,6 +15,8 @@ from urllib3.util import Retry
 from .config import settings
 from .display import process_user_feedback
 from .models import RequestDescribe
+from .rate_limit import rate_limiter
+from .stats import request_stats
 
 logger = logging.getLogger(__name__)
 
@@ -18,53 +24,241 @@ retries = Retry(
     total=3,
     backoff_factor=1,
     status_forcelist=[
-        HTTPStatus.TOO_MANY_REQUESTS,
         HTTPStatus.BAD_GATEWAY,
         HTTPStatus.SERVICE_UNAVAILABLE,
         HTTPStatus.GATEWAY_TIMEOUT,
     ],
     raise_on_status=False,
+    # urllib3 retries any 429 with a Retry-After header, those are retried by the search instead.
+    respect_retry_after_header=False,
 )
 
-request_session = requests.Session()
 
-request_session.mount("http://", HTTPAdapter(max_retries=retries))
-request_session.mount("https://", HTTPAdapter(max_retries=retries))
+class InvalidStatusCodeError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"invalid status code {status_code}")
+        self.status_code = status_code
 
-request_session.headers.update({"PRIVATE-TOKEN": settings.GITLAB_PRIVATE_TOKEN})
 
+class RateLimitedError(Exception):
+    def __init__(self, retry_after: Optional[float]) -> None:
+        super().__init__("rate limited")
+        self.retry_after = retry_after
 
-def retrieve_data(
-    request: RequestDescribe,
-    transform_data: Callable = lambda value: value,
-    max_random_time_for_sleep: float = 0,
+
+class RequestsCancelledError(Exception):
+    def __init__(self) -> None:
+        super().__init__("requests cancelled")
+
+
+# Set while the search stops early, the running tasks then fail on their next request.
+_requests_cancelled = threading.Event()
+
+
+def cancel_requests() -> None:
+    _requests_cancelled.set()
+
+
+def resume_requests() -> None:
+    _requests_cancelled.clear()
+
+
+# Shared by every retrieve_data call, so the extra page requests never exceed MAX_PARALLEL_PAGES
+# on top of the search workers.
+_pages_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_pages_executor_lock = threading.Lock()
+
+# Built on first use, so importing the module neither reads the token nor sets up the connection pools.
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_pool_size: int = requests.adapters.DEFAULT_POOLSIZE
+
+
+def _get_session() -> requests.Session:
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(max_retries=retries, pool_maxsize=_pool_size))
+            session.mount("https://", HTTPAdapter(max_retries=retries, pool_maxsize=_pool_size))
+            session.headers.update(
+                {"PRIVATE-TOKEN": settings.GITLAB_PRIVATE_TOKEN, "Accept-Encoding": "gzip"}
+            )
+            _session = session
+
+    return _session
+
+
+def __getattr__(name: str) -> Any:
+    if name == "request_session":
+        return _get_session()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def configure_session(max_workers: int) -> None:
+    """Size the connection pools for the threads of a run, the search workers and the page requests.
+
+    urllib3 discards the connections returned to a full pool, so a pool smaller than the threads
+    keeps opening new connections (and TLS handshakes) instead of reusing them.
+    """
+    global _pool_size
+
+    pool_size = max_workers + settings.MAX_PARALLEL_PAGES
+    if pool_size == _pool_size:
+        return
+
+    request_session = _get_session()
+    for prefix in ("http://", "https://"):
+        request_session.adapters[prefix].close()
+        request_session.mount(prefix, HTTPAdapter(max_retries=retries, pool_maxsize=pool_size))
+    _pool_size = pool_size
+
+
+def _record_request(
+    request: RequestDescribe, response: Optional[requests.Response], sleep: float, started_at: float
+) -> None:
+    duration = time.perf_counter() - started_at
+    if response is None:
+        request_stats.record(request.url, 0, 0, 0, sleep, started_at, duration)
+        return
+
+    # The retries done by urllib3 are only on its own response, requests keeps it in raw.
+    retry = getattr(response.raw, "retries", None)
+    retries = len(retry.history) if retry is not None else 0
+    request_stats.record(
+        request.url, response.status_code, len(response.content), retries, sleep, started_at, duration
+    )
+
+
+def _request_page(request: RequestDescribe, max_delay_request: Optional[float]) -> requests.Response:
+    if _requests_cancelled.is_set():
+        raise RequestsCancelledError()
+
+    sleep = rate_limiter.acquire(max_wait=max_delay_request)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        process_user_feedback.progress.log("URL: {} PARAMS: {}".format(request.url, request.params))
+
+    started_at = time.perf_counter()
+    try:
+        response: requests.Response = _get_session().get(
+            request.url, params=request.params, timeout=settings.REQUEST_TIMEOUT
+        )
+    except requests.RequestException:
+        if request_stats.enabled:
+            _record_request(request, None, sleep, started_at)
+        raise
+    if request_stats.enabled:
+        _record_request(request, response, sleep, started_at)
+    rate_limiter.update(response.headers)
+
+    if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        retry_after = response.headers.get("Retry-After")
+        raise RateLimitedError(float(retry_after) if retry_after and retry_after.isdigit() else None)
+    elif not response.status_code == HTTPStatus.OK:
+        raise InvalidStatusCodeError(response.status_code)
+
+    return response
+
+
+def _total_pages(request: RequestDescribe, response: requests.Response) -> Optional[int]:
+    if request.params.get("pagination") == "keyset":
+        return None
+
+    total_pages = response.headers.get("X-Total-Pages")
+    if total_pages:
+        return int(total_pages)
+
+    total = response.headers.get("X-Total")
+    per_page = request.params.get("per_page")
+    if total and per_page:
+        return math.ceil(int(total) / int(per_page))
+
+    return None
+
+
+def _retrieve_page(
+    request: RequestDescribe, transform_data: Callable, max_delay_request: Optional[float]
 ) -> list:
-    count: int = 0
-    data_list: list[dict] = []
-    while True or count < settings.MAX_DEEP_SEARCH:
-        count += 1
+    response = _request_page(request, max_delay_request)
+
+    return [transform_data(data) for data in response.json()]
+
 
-        if logger.isEnabledFor(logging.DEBUG):
-            process_user_feedback.progress.log("URL: {} PARAMS: {}".format(request.url, request.params))
+def _get_pages_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _pages_executor
 
-        response: requests.Response = request_session.get(request.url, params=request.params, timeout=10)
+    with _pages_executor_lock:
+        if _pages_executor is None:
+            _pages_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=settings.MAX_PARALLEL_PAGES, thread_name_prefix="gl-search-pages"
+            )
+
+    return _pages_executor
+
+
+def _iter_remaining_pages(
+    request: RequestDescribe, total_pages: int, transform_data: Callable, max_delay_request: Optional[float]
+) -> Iterator:
+    executor = _get_pages_executor()
+    pages = iter(range(2, min(total_pages, settings.MAX_DEEP_SEARCH) + 1))
+    futures: deque[concurrent.futures.Future] = deque()
 
-        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
-            process_user_feedback.progress.print(
-                "URL: {} PARAMS: {} HttpStatus Code 429 SKIP this search".format(request.url, request.params)
+    def submit(page: int) -> None:
+        futures.append(
+            executor.submit(
+                _retrieve_page,
+                RequestDescribe(url=request.url, params={**request.params, "page": str(page)}),
+                transform_data,
+                max_delay_request,
             )
-            break
-        elif not response.status_code == HTTPStatus.OK:
-            raise Exception(f"invalid status code {response.status_code}")
+        )
 
-        data_list.extend([transform_data(data) for data in response.json()])
+    for page in itertools.islice(pages, settings.MAX_PARALLEL_PAGES):
+        submit(page)
+
+    try:
+        while futures:
+            data = futures.popleft().result()
+            # One page requested for each page read, so only MAX_PARALLEL_PAGES pages wait for the reader.
+            page = next(pages, None)
+            if page is not None:
+                submit(page)
+            yield from data
+    finally:
+        # The reader failed or stopped early.
+        for future in futures:
+            future.cancel()
+
+
+def iter_data(
+    request: RequestDescribe,
+    transform_data: Callable = lambda value: value,
+    max_delay_request: Optional[float] = None,
+) -> Iterator:
+    """Yield the items of every page as the pages arrive, holding only the pages in flight."""
+    for count in range(1, settings.MAX_DEEP_SEARCH + 1):
+        response = _request_page(request, max_delay_request)
+
+        yield from (transform_data(data) for data in response.json())
+
+        total_pages = _total_pages(request, response) if count == 1 else None
+        if total_pages and total_pages > 1:
+            yield from _iter_remaining_pages(request, total_pages, transform_data, max_delay_request)
+            return
 
         try:
             request.url: str = response.links["next"]["url"]
             request.params = {}
         except KeyError:
-            break
+            return
 
-        time.sleep(uniform(0, max_random_time_for_sleep))
 
-    return data_list
+def retrieve_data(
+    request: RequestDescribe,
+    transform_data: Callable = lambda value: value,
+    max_delay_request: Optional[float] = None,
+) -> list:
+    return list(iter_data(request, transform_data, max_delay_request))
@@ -0,0 +1,142 @@
+from typing import Any
+
+VISIBILITIES = ("internal", "public", "private")
+
+
+def build_project(project_id: int, group_id: int = 1, simple: bool = False) -> dict[str, Any]:
+    path = f"project-{project_id}"
+    namespace = f"group-{group_id}"
+    web_url = f"https://gitlab.example.com/{namespace}/{path}"
+    project: dict[str, Any] = {
+        "id": project_id,
+        "description": f"Synthetic project {project_id} used by the benchmarks.",
+        "name": path,
+        "name_with_namespace": f"{namespace} / {path}",
+        "path": path,
+        "path_with_namespace": f"{namespace}/{path}",
+        "created_at": "2022-01-01T10:00:00.000Z",
+        "default_branch": "main",
+        "tag_list": [],
+        "topics": [],
+        "ssh_url_to_repo": f"git@gitlab.example.com:{namespace}/{path}.git",
+        "http_url_to_repo": f"{web_url}.git",
+        "web_url": web_url,
+        "readme_url": f"{web_url}/-/blob/main/README.md",
+        "avatar_url": None,
+        "forks_count": 0,
+        "star_count": 0,
+        "last_activity_at": "2022-10-01T10:00:00.000Z",
+        "namespace": {
+            "id": group_id,
+            "name": namespace,
+            "path": namespace,
+            "kind": "group",
+            "full_path": namespace,
+            "parent_id": None,
+            "avatar_url": None,
+            "web_url": f"https://gitlab.example.com/groups/{namespace}",
+        },
+    }
+    if simple:
+        return project
+
+    project.update(
+        {
+            "visibility": VISIBILITIES[project_id % len(VISIBILITIES)],
+            "_links": {
+                name: f"https://gitlab.example.com/api/v4/projects/{project_id}/{name}"
+                for name in ("issues", "merge_requests", "repo_branches", "labels", "events", "members")
+            },
+            "packages_enabled": True,
+            "empty_repo": False,
+            "archived": False,
+            "owner": None,
+            "resolve_outdated_diff_discussions": False,
+            "container_expiration_policy": {
+                "cadence": "1d",
+                "enabled": False,
+                "keep_n": 10,
+                "older_than": "90d",
+                "name_regex": ".*",
+                "name_regex_keep": None,
+                "next_run_at": "2022-10-02T10:00:00.000Z",
+            },
+            "issues_enabled": True,
+            "merge_requests_enabled": True,
+            "wiki_enabled": True,
+            "jobs_enabled": True,
+            "snippets_enabled": True,
+            "container_registry_enabled": True,
+            "service_desk_enabled": False,
+            "can_create_merge_request_in": True,
+            "issues_access_level": "enabled",
+            "repository_access_level": "enabled",
+            "merge_requests_access_level": "enabled",
+            "forking_access_level": "enabled",
+            "wiki_access_level": "enabled",
+            "builds_access_level": "enabled",
+            "snippets_access_level": "enabled",
+            "pages_access_level": "private",
+            "operations_access_level": "enabled",
+            "analytics_access_level": "enabled",
+            "container_registry_access_level": "enabled",
+            "security_and_compliance_access_level": "private",
+            "emails_disabled": None,
+            "shared_runners_enabled": True,
+            "lfs_enabled": True,
+            "creator_id": 1,
+            "import_url": None,
+            "import_type": None,
+            "import_status": "none",
+            "open_issues_count": 0,
+            "ci_default_git_depth": 20,
+            "ci_forward_deployment_enabled": True,
+            "ci_job_token_scope_enabled": False,
+            "ci_separated_caches": True,
+            "public_jobs": True,
+            "build_timeout": 3600,
+            "auto_cancel_pending_pipelines": "enabled",
+            "ci_config_path": "",
+            "shared_with_groups": [],
+            "only_allow_merge_if_pipeline_succeeds": False,
+            "allow_merge_on_skipped_pipeline": None,
+            "restrict_user_defined_variables": False,
+            "request_access_enabled": True,
+            "only_allow_merge_if_all_discussions_are_resolved": False,
+            "remove_source_branch_after_merge": True,
+            "printing_merge_request_link_enabled": True,
+            "merge_method": "merge",
+            "squash_option": "default_off",
+            "enforce_auth_checks_on_uploads": True,
+            "suggestion_commit_message": None,
+            "merge_commit_template": None,
+            "squash_commit_template": None,
+            "auto_devops_enabled": False,
+            "auto_devops_deploy_strategy": "continuous",
+            "autoclose_referenced_issues": True,
+            "keep_latest_artifact": True,
+            "runner_token_expiration_interval": None,
+            "requirements_enabled": False,
+            "requirements_access_level": "enabled",
+            "security_and_compliance_enabled": True,
+            "compliance_frameworks": [],
+            "permissions": {
+                "project_access": None,
+                "group_access": {"access_level": 30, "notification_level": 3},
+            },
+        }
+    )
+    return project
+
+
+def build_blob(project_id: int, startline: int = 1) -> dict[str, Any]:
+    return {
+        "basename": "src/main",
+        "data": f"import os\n\nprint(os.environ['SEARCH_{startline}'])\n",
+        "path": "src/main.py",
+        "filename": "src/main.py",
+        "id": None,
+        "ref": "main",
+        "startline": startline,
+        "project_id": project_id,
+    }
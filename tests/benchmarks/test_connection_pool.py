@@ -0,0 +1,66 @@
+import multiprocessing
+import time
+from multiprocessing.connection import Connection
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+from gl_search import utils
+from gl_search.models import SearchParams
+from gl_search.search import search
+
+from ..fake_gitlab import serve_fake_gitlab
+
+GROUPS = 2
+PROJECTS = 1000
+LATENCY = 0.05
+MAX_WORKERS = 32
+
+
+def _mount_default_adapters(max_workers: int) -> None:
+    for prefix in ("http://", "https://"):
+        utils.request_session.mount(prefix, HTTPAdapter(max_retries=utils.retries))
+
+
+def _run_search(params: SearchParams, pool_size: Optional[int], connection: Connection) -> None:
+    started_at = time.perf_counter()
+    if pool_size == DEFAULT_POOLSIZE:
+        with patch("gl_search.search.configure_session", _mount_default_adapters):
+            results = list(search(params))
+    else:
+        results = list(search(params))
+
+    connection.send((time.perf_counter() - started_at, len(results)))
+    connection.close()
+
+
+@pytest.mark.benchmark
+@pytest.mark.enable_socket
+@pytest.mark.parametrize("pool_size", (DEFAULT_POOLSIZE, None), ids=("default-pool", "max-workers-pool"))
+def test_connections_against_fake_gitlab(pool_size: Optional[int]) -> None:
+    params = SearchParams(
+        groups=None,
+        search_code_input="search",
+        max_workers=MAX_WORKERS,
+        visibility=["internal", "public", "private"],
+        use_cache=False,
+    )
+    # Each run in a fresh process, so the connection pools start empty.
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+
+    with serve_fake_gitlab(groups=GROUPS, projects=PROJECTS, latency=LATENCY) as fake_gitlab:
+        process = context.Process(target=_run_search, args=(params, pool_size, sender))
+        process.start()
+        wall_time, results = receiver.recv()
+        process.join()
+
+    # The fake server is plain http, each connection stands for a TCP and TLS handshake against GitLab.
+    print(
+        f"\npool size {pool_size or MAX_WORKERS + utils.settings.MAX_PARALLEL_PAGES} :: {MAX_WORKERS} workers"
+        f" :: {fake_gitlab.total_requests} requests :: {fake_gitlab.connections} connections"
+        f" :: {wall_time:.2f} s"
+    )
+    assert results == PROJECTS
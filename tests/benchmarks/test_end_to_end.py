@@ -0,0 +1,58 @@
+import multiprocessing
+import resource
+import time
+from multiprocessing.connection import Connection
+
+import pytest
+
+from gl_search.models import SearchParams
+from gl_search.search import search
+
+from ..fake_gitlab import serve_fake_gitlab
+
+GROUPS = 5
+PROJECTS = 500
+LATENCY = 0.01
+MAX_WORKERS = (1, 8, 32)
+
+
+def _run_search(params: SearchParams, connection: Connection) -> None:
+    started_at = time.perf_counter()
+    results = list(search(params))
+    wall_time = time.perf_counter() - started_at
+
+    connection.send((wall_time, len(results), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+    connection.close()
+
+
+@pytest.mark.benchmark
+@pytest.mark.enable_socket
+@pytest.mark.parametrize("engine", ("project", "group"))
+@pytest.mark.parametrize("max_workers", MAX_WORKERS)
+def test_search_against_fake_gitlab(engine: str, max_workers: int) -> None:
+    params = SearchParams(
+        groups=None,
+        search_code_input="search",
+        max_workers=max_workers,
+        visibility=["internal", "public", "private"],
+        engine=engine,
+        use_cache=False,
+    )
+    # Each run in a fresh process, so the peak RSS is its own.
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+
+    with serve_fake_gitlab(
+        groups=GROUPS, projects=PROJECTS, matches_every=10, latency=LATENCY
+    ) as fake_gitlab:
+        process = context.Process(target=_run_search, args=(params, sender))
+        process.start()
+        wall_time, results, peak_rss = receiver.recv()
+        process.join()
+
+    print(
+        f"\n{engine} engine :: {PROJECTS} projects :: {LATENCY * 1000:.0f} ms latency"
+        f" :: {max_workers} workers :: {wall_time:.2f} s :: {fake_gitlab.total_requests} requests"
+        f" :: peak RSS {peak_rss / 1024:.0f} MiB"
+    )
+    assert results == PROJECTS
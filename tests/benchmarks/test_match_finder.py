@@ -0,0 +1,50 @@
+import re
+import time
+
+import pytest
+
+from gl_search.display import MatchFinder, compile_search
+
+from .factories import build_blob
+
+
+def _per_line_match_positions(
+    text: str, search_code_input: str
+) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    # The highlighting before the single pass: one re.finditer per line of each result.
+    match_position = []
+    for line, splitted_line in enumerate(text.split("\n"), start=1):
+        for match in re.finditer(rf"{search_code_input}", splitted_line, flags=re.IGNORECASE):
+            match_position.append(((line, match.start()), (line, match.end())))
+    return match_position
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("results, lines", ((10_000, 3), (100, 3_000)))
+def test_highlighting(results: int, lines: int) -> None:
+    # Each blob data is 3 lines with the search on the last one.
+    blobs = [
+        "\n".join(build_blob(index % 100, line)["data"].strip("\n") for line in range(lines // 3))
+        for index in range(results)
+    ]
+    search = "SEARCH_1"
+    assert [MatchFinder(blob, search).match_position for blob in blobs[:10]] == [
+        _per_line_match_positions(blob, search) for blob in blobs[:10]
+    ]
+
+    started_at = time.perf_counter()
+    for blob in blobs:
+        _per_line_match_positions(blob, search)
+    per_line = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    pattern = compile_search(search)
+    for blob in blobs:
+        MatchFinder(blob, pattern)
+    single_pass = time.perf_counter() - started_at
+
+    print(
+        f"\n{results} results of {lines} lines :: per line {per_line * 1000:.0f} ms"
+        f" :: single pass {single_pass * 1000:.0f} ms :: {per_line / single_pass:.1f}x"
+    )
+    assert single_pass < per_line
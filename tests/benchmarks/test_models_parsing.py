@@ -0,0 +1,59 @@
+import time
+from typing import Any, Callable
+
+import pytest
+
+from gl_search.models import Repo, RepoResult, SearchEntryResult
+
+from .factories import build_blob, build_project
+
+ITEMS = 10_000
+
+
+def _items_per_second(parse: Callable[[dict[str, Any]], Any], values: list[dict[str, Any]]) -> float:
+    started_at = time.perf_counter()
+    for value in values:
+        parse(value)
+    return len(values) / (time.perf_counter() - started_at)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "model, build_value",
+    (
+        (SearchEntryResult, lambda index: build_blob(index % 100, index)),
+        (Repo, lambda index: build_project(index)),
+    ),
+    ids=("blobs", "projects"),
+)
+def test_api_parsing(model: type, build_value: Callable[[int], dict[str, Any]]) -> None:
+    values = [build_value(index) for index in range(ITEMS)]
+    assert [model.from_api(value) for value in values[:100]] == [model(**value) for value in values[:100]]
+
+    validated = _items_per_second(lambda value: model(**value), values)
+    constructed = _items_per_second(model.from_api, values)
+
+    print(
+        f"\n{model.__name__} :: {ITEMS} items :: validated {validated:,.0f}/s"
+        f" :: from_api {constructed:,.0f}/s :: {constructed / validated:.1f}x"
+    )
+    assert constructed > validated
+
+
+@pytest.mark.benchmark
+def test_repo_result_with_many_entries() -> None:
+    entries = [SearchEntryResult.from_api(build_blob(1, index)) for index in range(ITEMS)]
+
+    started_at = time.perf_counter()
+    RepoResult(name="project-1", web_url="https://gitlab.example.com/project-1", results=entries)
+    validated = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    RepoResult.construct(name="project-1", web_url="https://gitlab.example.com/project-1", results=entries)
+    constructed = time.perf_counter() - started_at
+
+    print(
+        f"\nRepoResult :: {ITEMS} entries :: validated {validated * 1000:.1f} ms"
+        f" :: construct {constructed * 1000:.3f} ms"
+    )
+    assert constructed < validated
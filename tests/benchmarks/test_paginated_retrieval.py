@@ -0,0 +1,53 @@
+import multiprocessing
+import resource
+import time
+import tracemalloc
+from multiprocessing.connection import Connection
+
+import pytest
+
+from gl_search.config import settings
+from gl_search.models import RequestDescribe
+from gl_search.utils import iter_data, retrieve_data
+
+from ..fake_gitlab import serve_fake_gitlab
+
+PROJECTS = 10_000
+
+
+def _retrieve(url: str, streamed: bool, connection: Connection) -> None:
+    request = RequestDescribe(url=url, params={"per_page": "100", "include_subgroups": "true"})
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    if streamed:
+        items = sum(1 for _ in iter_data(request))
+    else:
+        items = len(retrieve_data(request))
+    wall_time = time.perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+
+    connection.send((items, wall_time, peak, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+    connection.close()
+
+
+@pytest.mark.benchmark
+@pytest.mark.enable_socket
+@pytest.mark.parametrize("streamed", (False, True), ids=("list", "iterator"))
+def test_paginated_retrieval(streamed: bool) -> None:
+    # Each run in a fresh process, so the peak RSS is its own.
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+
+    with serve_fake_gitlab(groups=1, projects=PROJECTS) as fake_gitlab:
+        url = f"{settings.GITLAB_URL}/api/v4/groups/1/projects"
+        process = context.Process(target=_retrieve, args=(url, streamed, sender))
+        process.start()
+        items, wall_time, peak, peak_rss = receiver.recv()
+        process.join()
+
+    print(
+        f"\n{'iter_data' if streamed else 'retrieve_data'} :: {PROJECTS} projects in"
+        f" {fake_gitlab.total_requests} pages :: {wall_time:.2f} s"
+        f" :: peak allocated {peak / 1024 / 1024:.0f} MiB :: peak RSS {peak_rss / 1024:.0f} MiB"
+    )
+    assert items == PROJECTS
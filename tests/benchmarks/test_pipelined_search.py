@@ -0,0 +1,54 @@
+import time
+from datetime import datetime, timezone
+from typing import Iterator
+
+import pytest
+
+from gl_search.models import RepoResult, SearchParams
+from gl_search.search import _retrieve_inventory, _search_code, _search_code_while_listing
+
+from ..fake_gitlab import serve_fake_gitlab
+
+GROUPS = 50
+PROJECTS = 2_500
+LATENCY = 0.02
+MAX_WORKERS = 8
+
+
+def _search_after_listing(params: SearchParams) -> Iterator[RepoResult]:
+    # Every repository is listed before the first search, as before the pipeline.
+    yield from _search_code(_retrieve_inventory(params), params)
+
+
+@pytest.mark.benchmark
+@pytest.mark.enable_socket
+@pytest.mark.parametrize("pipelined", (False, True), ids=("listing-then-search", "pipelined"))
+def test_search_while_listing(pipelined: bool) -> None:
+    params = SearchParams(
+        groups=None,
+        search_code_input="search",
+        max_workers=MAX_WORKERS,
+        visibility=["internal", "public", "private"],
+        use_cache=False,
+    )
+
+    with serve_fake_gitlab(groups=GROUPS, projects=PROJECTS, latency=LATENCY) as fake_gitlab:
+        started_at = time.perf_counter()
+        if pipelined:
+            results = _search_code_while_listing(params, None, datetime.now(timezone.utc))
+        else:
+            results = _search_after_listing(params)
+        first_result_time = None
+        count = 0
+        for _ in results:
+            first_result_time = first_result_time or time.perf_counter() - started_at
+            count += 1
+        wall_time = time.perf_counter() - started_at
+
+    print(
+        f"\n{'pipelined' if pipelined else 'listing then search'} :: {GROUPS} groups :: {PROJECTS} projects"
+        f" :: {LATENCY * 1000:.0f} ms latency :: {MAX_WORKERS} workers"
+        f" :: first result {first_result_time:.2f} s"
+        f" :: {wall_time:.2f} s :: {fake_gitlab.total_requests} requests"
+    )
+    assert count == PROJECTS
@@ -0,0 +1,67 @@
+import json
+import math
+import time
+
+import pytest
+
+from gl_search.models import Repo
+
+from .factories import VISIBILITIES, build_project
+
+PROJECTS = 2_000
+PER_PAGE = 100
+
+
+@pytest.mark.benchmark
+def test_simple_listing_payload() -> None:
+    full_listing = [build_project(project_id) for project_id in range(PROJECTS)]
+    simple_listings = {
+        visibility: [
+            build_project(project_id, simple=True)
+            for project_id in range(PROJECTS)
+            if VISIBILITIES[project_id % len(VISIBILITIES)] == visibility
+        ]
+        for visibility in VISIBILITIES
+    }
+    full_bytes = len(json.dumps(full_listing))
+    simple_bytes = sum(len(json.dumps(listing)) for listing in simple_listings.values())
+    full_requests = math.ceil(len(full_listing) / PER_PAGE)
+    simple_requests = sum(math.ceil(len(listing) / PER_PAGE) for listing in simple_listings.values())
+
+    started_at = time.perf_counter()
+    full_repos = {Repo(**value) for value in json.loads(json.dumps(full_listing))}
+    full_parse_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    simple_repos = {
+        Repo(**{**value, "visibility": visibility})
+        for visibility, listing in simple_listings.items()
+        for value in json.loads(json.dumps(listing))
+    }
+    simple_parse_time = time.perf_counter() - started_at
+
+    print(
+        f"\n{PROJECTS} projects split per visibility :: full {full_bytes / 1024:.0f} KiB"
+        f" in {full_requests} requests and {full_parse_time * 1000:.1f} ms"
+        f" :: simple {simple_bytes / 1024:.0f} KiB in {simple_requests} requests"
+        f" and {simple_parse_time * 1000:.1f} ms :: {1 - simple_bytes / full_bytes:.0%} bytes saved"
+    )
+    assert simple_repos == full_repos
+    assert simple_bytes < full_bytes / 2
+
+
+@pytest.mark.benchmark
+def test_simple_listing_payload_for_every_visibility() -> None:
+    full_listing = [build_project(project_id) for project_id in range(PROJECTS)]
+    simple_listing = [build_project(project_id, simple=True) for project_id in range(PROJECTS)]
+    full_bytes = len(json.dumps(full_listing))
+    simple_bytes = len(json.dumps(simple_listing))
+    requests = math.ceil(PROJECTS / PER_PAGE)
+
+    print(
+        f"\n{PROJECTS} projects of every visibility :: full {full_bytes / 1024:.0f} KiB"
+        f" in {requests} requests"
+        f" :: simple {simple_bytes / 1024:.0f} KiB in {requests} requests"
+        f" :: {1 - simple_bytes / full_bytes:.0%} bytes saved"
+    )
+    assert simple_bytes < full_bytes / 2
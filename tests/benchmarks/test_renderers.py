@@ -0,0 +1,55 @@
+import io
+import time
+from unittest.mock import patch
+
+import pytest
+from rich.console import Console
+
+from gl_search.display import print_results, print_results_plain
+from gl_search.models import RepoResult, SearchEntryResult
+
+from .factories import build_blob
+
+RESULTS = 10_000
+RESULTS_PER_REPO = 10
+
+
+def _results() -> list[RepoResult]:
+    return [
+        RepoResult.construct(
+            name=f"group/project-{repo}",
+            web_url=f"https://gitlab.example.com/group/project-{repo}",
+            results=[
+                SearchEntryResult.from_api(build_blob(repo, line))
+                for line in range(1, RESULTS_PER_REPO * 10, 10)
+            ],
+        )
+        for repo in range(RESULTS // RESULTS_PER_REPO)
+    ]
+
+
+@pytest.mark.benchmark
+def test_renderers() -> None:
+    results = _results()
+    console = Console(file=io.StringIO(), width=120, force_terminal=True)
+
+    started_at = time.perf_counter()
+    with patch("gl_search.display.get_lexer", lambda extension: extension):
+        print_results(results, "search", console=console)
+    rich_uncached = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    print_results(results, "search", console=console)
+    rich = time.perf_counter() - started_at
+
+    output = io.StringIO()
+    started_at = time.perf_counter()
+    print_results_plain(results, "search", output=output, color=True)
+    plain = time.perf_counter() - started_at
+
+    print(
+        f"\n{RESULTS} results :: rich without lexer cache {rich_uncached:.2f} s :: rich {rich:.2f} s"
+        f" :: plain {plain * 1000:.0f} ms :: {rich / plain:.0f}x"
+    )
+    assert len(output.getvalue().splitlines()) == RESULTS * 3
+    assert plain < rich
@@ -0,0 +1,64 @@
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from gl_search.index import build_index, search_mirror
+from gl_search.mirror import grep_mirror, sync_mirror
+from gl_search.models import Repo, SearchScopeParams
+
+from ..utils import build_git_repository
+
+FILES = 5_000
+LINES_PER_FILE = 60
+SEARCHES = 20
+
+
+def _build_files() -> dict[str, str]:
+    words = [f"identifier_{index}" for index in range(20_000)]
+    rng = random.Random(0)
+    return {
+        f"src/module_{index // 100}/file_{index}.py": "\n".join(
+            " = ".join(rng.sample(words, 3)) for _ in range(LINES_PER_FILE)
+        )
+        for index in range(FILES)
+    }
+
+
+@pytest.mark.benchmark
+def test_index_lookup_against_full_scan(tmp_path: Path) -> None:
+    build_git_repository(tmp_path, _build_files())
+    repo = Repo(
+        id=1,
+        name="repo_1",
+        web_url="url_1",
+        http_url_to_repo=f"file://{tmp_path / 'origin.git'}",
+        default_branch="main",
+    )
+    mirror_path = str(tmp_path / "mirrors" / "1.git")
+    index_path = str(tmp_path / "index" / "1.idx")
+    sync_mirror(repo, mirror_path)
+
+    started_at = time.perf_counter()
+    build_index(mirror_path, index_path)
+    build_time = time.perf_counter() - started_at
+
+    scopes = [SearchScopeParams(search_code_input=f"identifier_{index * 997}") for index in range(SEARCHES)]
+
+    started_at = time.perf_counter()
+    scan_results = [grep_mirror(repo, mirror_path, scope) for scope in scopes]
+    scan_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    index_results = [search_mirror(repo, mirror_path, index_path, scope) for scope in scopes]
+    index_time = time.perf_counter() - started_at
+
+    index_size = Path(index_path).stat().st_size
+    print(
+        f"\n{FILES} files :: index built in {build_time:.1f} s ({index_size / 1024:.0f} KiB)"
+        f" :: {SEARCHES} searches :: full scan {scan_time * 1000 / SEARCHES:.1f} ms"
+        f" :: index {index_time * 1000 / SEARCHES:.1f} ms per search"
+    )
+    assert index_results == scan_results
+    assert index_time < scan_time
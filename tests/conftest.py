@@ -0,0 +1,42 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from gl_search.rate_limit import rate_limiter
+from gl_search.stats import request_stats
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--benchmark", action="store_true", default=False, help="run the benchmarks")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.getoption("--benchmark"):
+        return
+
+    skip_benchmark = pytest.mark.skip(reason="use --benchmark to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir_path(tmp_path: Path) -> Path:
+    cache_dir_path = tmp_path / "cache"
+    with patch("gl_search.cache.CACHE_DIR_PATH", str(cache_dir_path)), patch(
+        "gl_search.journal.CACHE_DIR_PATH", str(cache_dir_path)
+    ):
+        yield cache_dir_path
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter() -> None:
+    yield
+    rate_limiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_request_stats() -> None:
+    yield
+    request_stats.reset()
@@ -0,0 +1,257 @@
+import json
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, Optional
+from unittest.mock import patch
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .benchmarks.factories import build_project
+
+SUBGROUPS_PER_GROUP = 2
+
+
+class FakeGitLab:
+    """In-process stand-in of the GitLab endpoints used by gl_search, served on 127.0.0.1.
+
+    Every root group has SUBGROUPS_PER_GROUP subgroups and the projects are spread over all of them.
+    The projects with an id multiple of matches_every have one blob matching any search.
+    """
+
+    def __init__(
+        self,
+        groups: int = 2,
+        projects: int = 10,
+        matches_every: int = 1,
+        latency: float = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_limit_window: int = 60,
+        too_many_requests_every: int = 0,
+        retry_after: int = 1,
+        totals: bool = True,
+    ) -> None:
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.too_many_requests_every = too_many_requests_every
+        self.retry_after = retry_after
+        self.totals = totals
+        self.matches_every = matches_every
+        self.requests: Counter[str] = Counter()
+        # Accepted connections, with keep-alive each one serves many requests.
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._window_started_at = time.time()
+        self._window_requests = 0
+
+        self.groups: list[dict[str, Any]] = []
+        for group_id in range(1, groups + 1):
+            self.groups.append({"id": group_id, "parent_id": None})
+            for subgroup in range(1, SUBGROUPS_PER_GROUP + 1):
+                self.groups.append({"id": group_id * 1000 + subgroup, "parent_id": group_id})
+
+        updated_at = datetime(2022, 10, 1, tzinfo=timezone.utc)
+        self.projects: list[dict[str, Any]] = []
+        # Project id to the ids of the groups listing it with include_subgroups.
+        self._projects_groups: dict[int, set[int]] = {}
+        for project_id in range(1, projects + 1):
+            group = self.groups[project_id % len(self.groups)]
+            project = build_project(project_id, group["id"])
+            project["last_activity_at"] = (updated_at + timedelta(minutes=project_id)).isoformat()
+            self.projects.append(project)
+            self._projects_groups[project_id] = {group["id"], group["parent_id"] or group["id"]}
+        self._simple_keys = set(build_project(0, simple=True))
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._build_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def __enter__(self) -> "FakeGitLab":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _build_handler(self) -> type[BaseHTTPRequestHandler]:
+        fake_gitlab = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # The headers and the body are sent apart, Nagle would hold the body until the delayed ACK.
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with fake_gitlab._lock:
+                    fake_gitlab.connections += 1
+
+            def do_GET(self) -> None:
+                fake_gitlab._handle(self)
+
+            def log_message(self, *args) -> None:
+                ...
+
+        return Handler
+
+    def _rate_limit_headers(self) -> tuple[bool, dict[str, str]]:
+        with self._lock:
+            now = time.time()
+            if now - self._window_started_at >= self.rate_limit_window:
+                self._window_started_at, self._window_requests = now, 0
+            self._window_requests += 1
+            requests_count = self.total_requests
+
+            if self.too_many_requests_every and requests_count % self.too_many_requests_every == 0:
+                return True, {"Retry-After": str(self.retry_after)}
+
+            if self.rate_limit is None:
+                return False, {}
+
+            remaining = self.rate_limit - self._window_requests
+            headers = {
+                "RateLimit-Limit": str(self.rate_limit),
+                "RateLimit-Remaining": str(max(remaining, 0)),
+                "RateLimit-Reset": str(math.ceil(self._window_started_at + self.rate_limit_window)),
+            }
+            if remaining < 0:
+                headers["Retry-After"] = str(
+                    math.ceil(self._window_started_at + self.rate_limit_window - now)
+                )
+                return True, headers
+
+            return False, headers
+
+    def _route(self, path: str, params: dict[str, str]) -> tuple[str, Optional[list[dict[str, Any]]]]:
+        parts = path.strip("/").split("/")[2:]
+        if parts == ["groups"]:
+            return "/groups", self.groups
+
+        if len(parts) == 3 and parts[0] == "groups" and parts[2] == "projects":
+            group_id = int(parts[1])
+            projects = [
+                project for project in self.projects if group_id in self._projects_groups[project["id"]]
+            ]
+            if params.get("visibility"):
+                projects = [project for project in projects if project["visibility"] == params["visibility"]]
+            if params.get("last_activity_after"):
+                projects = [
+                    project
+                    for project in projects
+                    if project["last_activity_at"] > params["last_activity_after"].replace("Z", "+00:00")
+                ]
+            if params.get("simple") == "true":
+                projects = [
+                    {key: value for key, value in project.items() if key in self._simple_keys}
+                    for project in projects
+                ]
+            return "/groups/:id/projects", projects
+
+        if len(parts) == 3 and parts[2] == "search":
+            if parts[0] == "projects":
+                projects_ids = {int(parts[1])}
+            else:
+                projects_ids = {
+                    project_id
+                    for project_id, groups_ids in self._projects_groups.items()
+                    if int(parts[1]) in groups_ids
+                }
+            return f"/{parts[0]}/:id/search", [
+                self._search_result(project_id, params["search"])
+                for project_id in sorted(projects_ids)
+                if project_id % self.matches_every == 0
+            ]
+
+        return path, None
+
+    def _search_result(self, project_id: int, search: str) -> dict[str, Any]:
+        term = search.split(" ")[0]
+        return {
+            "basename": "main",
+            "data": f"import os\nprint('{term}')\n",
+            "path": "main.py",
+            "filename": "main.py",
+            "id": None,
+            "ref": "main",
+            "startline": 1,
+            "project_id": project_id,
+        }
+
+    def _paginate(
+        self, path: str, params: dict[str, str], items: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], dict[str, str]]:
+        per_page = int(params.get("per_page", 20))
+        headers: dict[str, str] = {}
+
+        if params.get("pagination") == "keyset":
+            id_after = int(params.get("id_after", 0))
+            items = sorted((item for item in items if item["id"] > id_after), key=lambda item: item["id"])
+            page_items = items[:per_page]
+            if len(items) > per_page:
+                next_params = {**params, "id_after": str(page_items[-1]["id"])}
+                headers["Link"] = f'<{self.url}{path}?{urlencode(next_params)}>; rel="next"'
+            return page_items, headers
+
+        page = int(params.get("page", 1))
+        total_pages = max(math.ceil(len(items) / per_page), 1)
+        start, end = (page - 1) * per_page, page * per_page
+        page_items = items[start:end]
+        headers.update({"X-Page": str(page), "X-Per-Page": str(per_page)})
+        if self.totals:
+            headers.update({"X-Total": str(len(items)), "X-Total-Pages": str(total_pages)})
+        if page < total_pages:
+            headers["X-Next-Page"] = str(page + 1)
+            headers["Link"] = f'<{self.url}{path}?{urlencode({**params, "page": str(page + 1)})}>; rel="next"'
+        return page_items, headers
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlsplit(handler.path)
+        params = dict(parse_qsl(url.query))
+        endpoint, items = self._route(url.path, params)
+        with self._lock:
+            self.requests[endpoint] += 1
+
+        rate_limited, headers = self._rate_limit_headers()
+        if rate_limited:
+            self._send(handler, HTTPStatus.TOO_MANY_REQUESTS, {"message": "429 Too Many Requests"}, headers)
+        elif items is None:
+            self._send(handler, HTTPStatus.NOT_FOUND, {"message": "404 Not Found"}, headers)
+        else:
+            page_items, page_headers = self._paginate(url.path, params, items)
+            self._send(handler, HTTPStatus.OK, page_items, {**headers, **page_headers})
+
+    def _send(
+        self, handler: BaseHTTPRequestHandler, status: HTTPStatus, body: Any, headers: dict[str, str]
+    ) -> None:
+        content = json.dumps(body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(content)
+
+
+@contextmanager
+def serve_fake_gitlab(**kwargs) -> Iterator[FakeGitLab]:
+    with FakeGitLab(**kwargs) as fake_gitlab, patch("gl_search.config.settings.GITLAB_URL", fake_gitlab.url):
+        yield fake_gitlab
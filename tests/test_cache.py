@@ -0,0 +1,144 @@
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from gl_search.cache import (
+    load_hits,
+    load_inventory,
+    load_search_results,
+    record_hits,
+    remove_from_inventory,
+    save_inventory,
+    save_search_results,
+)
+from gl_search.models import Inventory, Repo, SearchEntryResult, SearchParams, SearchRepoParams
+
+
+@pytest.fixture
+def search_params() -> SearchParams:
+    return SearchParams(
+        search_code_input="search", max_workers=5, visibility=["private"], max_delay_request=5
+    )
+
+
+class TestInventory:
+    def test_when_inventory_is_not_cached(self, search_params: SearchParams) -> None:
+        assert load_inventory(search_params) is None
+
+    def test_when_inventory_is_cached(self, search_params: SearchParams) -> None:
+        inventory = Inventory(
+            groups_ids=[1, 2],
+            repos=[
+                Repo(
+                    id=1,
+                    name="repo_1",
+                    visibility="private",
+                    web_url="url_1",
+                    last_activity_at=datetime(2022, 10, 1, tzinfo=timezone.utc),
+                )
+            ],
+            updated_at=datetime(2022, 10, 2, tzinfo=timezone.utc),
+        )
+        save_inventory(search_params, inventory)
+
+        assert load_inventory(search_params) == inventory
+
+    def test_it_should_be_cached_by_params(self, search_params: SearchParams) -> None:
+        save_inventory(search_params, Inventory(groups_ids=[1], repos=[], updated_at=datetime.now()))
+        search_params.groups = "1"
+
+        assert load_inventory(search_params) is None
+
+    def test_when_cached_file_is_corrupted(self, search_params: SearchParams, cache_dir_path: Path) -> None:
+        save_inventory(search_params, Inventory(groups_ids=[1], repos=[], updated_at=datetime.now()))
+        for file_path in cache_dir_path.iterdir():
+            file_path.write_text("{")
+
+        assert load_inventory(search_params) is None
+
+
+class TestRemoveFromInventory:
+    def test_it_should_remove_repos(self, search_params: SearchParams) -> None:
+        repo_1 = Repo(id=1, name="repo_1", web_url="url_1")
+        repo_2 = Repo(id=2, name="repo_2", web_url="url_2")
+        save_inventory(
+            search_params, Inventory(groups_ids=[1], repos=[repo_1, repo_2], updated_at=datetime.now())
+        )
+
+        remove_from_inventory(search_params, {2})
+
+        assert load_inventory(search_params).repos == [repo_1]
+
+
+class TestHits:
+    def test_it_should_count_the_runs_with_hits(self) -> None:
+        assert load_hits() == {}
+
+        record_hits({"url_1", "url_2"})
+        record_hits({"url_1"})
+
+        assert load_hits() == {"url_1": 2, "url_2": 1}
+
+    def test_when_hits_file_is_corrupted(self, cache_dir_path: Path) -> None:
+        cache_dir_path.mkdir()
+        (cache_dir_path / "hits.json").write_text("{")
+
+        assert load_hits() == {}
+
+
+class TestSearchResults:
+    repo = Repo(
+        id=1, name="repo_1", web_url="url_1", last_activity_at=datetime(2022, 10, 1, tzinfo=timezone.utc)
+    )
+    search_params = SearchRepoParams(repo_id=1, search_code_input="search")
+    data = [
+        SearchEntryResult(path="a.py", filename="a.py", project_id=1, data="search", startline=3, ref="main")
+    ]
+
+    def test_when_results_are_cached(self) -> None:
+        save_search_results(self.search_params, self.repo, self.data)
+
+        assert load_search_results(self.search_params, self.repo) == self.data
+
+    @pytest.mark.parametrize(
+        "repo, search_params",
+        (
+            (
+                repo.copy(update={"last_activity_at": datetime(2022, 10, 2, tzinfo=timezone.utc)}),
+                search_params,
+            ),
+            (repo, SearchRepoParams(repo_id=1, search_code_input="search", extension="py")),
+        ),
+        ids=("repo-changed", "other-search"),
+    )
+    def test_it_should_be_cached_by_activity_and_search(
+        self, repo: Repo, search_params: SearchRepoParams
+    ) -> None:
+        save_search_results(self.search_params, self.repo, self.data)
+
+        assert load_search_results(search_params, repo) is None
+
+    def test_it_should_not_cache_without_last_activity(self) -> None:
+        repo = self.repo.copy(update={"last_activity_at": None})
+        save_search_results(self.search_params, repo, self.data)
+
+        assert load_search_results(self.search_params, repo) is None
+
+    def test_it_should_evict_least_recently_used(self, cache_dir_path: Path) -> None:
+        repos = [self.repo.copy(update={"id": repo_id}) for repo_id in range(3)]
+        save_search_results(self.search_params, repos[0], self.data)
+        file_size = next((cache_dir_path / "search").iterdir()).stat().st_size
+
+        with patch("gl_search.cache.settings.SEARCH_CACHE_MAX_SIZE", file_size * 2):
+            save_search_results(self.search_params, repos[1], self.data)
+            for file_path in (cache_dir_path / "search").iterdir():
+                os.utime(file_path, (0, 0))
+            assert load_search_results(self.search_params, repos[0]) == self.data
+            save_search_results(self.search_params, repos[2], self.data)
+
+        assert load_search_results(self.search_params, repos[0]) == self.data
+        assert load_search_results(self.search_params, repos[1]) is None
+        assert load_search_results(self.search_params, repos[2]) == self.data
@@ -1,5 +1,9 @@
+import os
+import subprocess  # nosec
+import sys
 from unittest.mock import Mock, patch
 
+import pytest
 from click.testing import CliRunner
 from dynaconf.validator import ValidationError
 
@@ -35,3 +39,48 @@ class TestCustomCommandCollection:
         runner.invoke(cli, ["setup-token", "test"])
         mock_invoke.assert_called_once()
         mock_validate_all.assert_not_called()
+
+    @patch("gl_search.config.settings.validators.validate_all")
+    def test_help_of_command_needs_settings_configured(self, mock_validate_all: Mock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(cli, ["search", "--help"])
+
+        assert result.exit_code == 0
+        assert "Usage:" in result.output
+        mock_validate_all.assert_not_called()
+
+
+class TestStartup:
+    HEAVY_MODULES = ("rich", "pydantic", "requests", "urllib3", "dynaconf")
+
+    def _imported_modules(self, *args: str) -> set[str]:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "GITLAB_PRIVATE_TOKEN": "token"},
+        )  # nosec
+        assert result.returncode == 0, result.stderr
+
+        # "import time: self [us] | cumulative | imported package"
+        return {
+            line.split("|")[-1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and line.count("|") == 2
+        }
+
+    @pytest.mark.parametrize(
+        "args",
+        (
+            ("-c", "import gl_search.cli"),
+            ("-m", "gl_search", "--help"),
+            ("-m", "gl_search", "search", "--help"),
+            ("-m", "gl_search", "setup-token", "--help"),
+        ),
+        ids=("import", "help", "search-help", "settings-help"),
+    )
+    def test_it_should_not_import_the_heavy_modules(self, args: tuple[str, ...]) -> None:
+        modules = self._imported_modules(*args)
+
+        assert "gl_search.cli" in modules
+        assert {module.split(".")[0] for module in modules} & set(self.HEAVY_MODULES) == set()
@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock, Mock, patch
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from gl_search.clis.mirror import build_command, sync_command, update_command
+from gl_search.models import InventoryParams, Repo
+
+
+@patch("gl_search.display.process_user_feedback", MagicMock())
+class TestSync:
+    @patch("gl_search.search.sync_mirrors")
+    def test_params(self, mock_sync_mirrors: Mock) -> None:
+        mock_sync_mirrors.return_value = ([Repo(id=1, name="repo_1", web_url="url_1")], [])
+
+        runner = CliRunner()
+        result = runner.invoke(sync_command, ["-g", "1", "-mw", "2", "-v", "public", "--include-archived"])
+
+        assert result.exit_code == 0
+        assert result.output == "1 repositories synced.\n"
+        mock_sync_mirrors.assert_called_once_with(
+            InventoryParams(groups="1", max_workers=2, visibility=["public"], include_archived=True)
+        )
+
+    @patch("gl_search.search.sync_mirrors")
+    def test_when_sync_fails(self, mock_sync_mirrors: Mock) -> None:
+        mock_sync_mirrors.return_value = ([], [Repo(id=1, name="repo_1", web_url="url_1")])
+
+        runner = CliRunner()
+        result = runner.invoke(sync_command, [])
+
+        assert result.output == "0 repositories synced.\n1 repositories failed to sync.\n"
+
+
+@patch("gl_search.display.process_user_feedback", MagicMock())
+class TestIndex:
+    @pytest.mark.parametrize("command, rebuild", ((build_command, True), (update_command, False)))
+    @patch("gl_search.search.index_mirrors")
+    def test_params(self, mock_index_mirrors: Mock, command: click.Command, rebuild: bool) -> None:
+        mock_index_mirrors.return_value = ([], [Repo(id=1, name="repo_1", web_url="url_1")])
+
+        runner = CliRunner()
+        result = runner.invoke(command, ["-g", "1"])
+
+        assert result.output == "0 repositories indexed.\n1 repositories failed to index.\n"
+        mock_index_mirrors.assert_called_once_with(
+            InventoryParams(groups="1", max_workers=5, visibility=["internal", "public", "private"]),
+            rebuild=rebuild,
+        )
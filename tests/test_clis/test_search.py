@@ -1,15 +1,19 @@
 import logging
-from unittest.mock import Mock, patch
+from pathlib import Path
+from typing import Optional
+from unittest.mock import ANY, Mock, patch
 
+import pytest
 from click.testing import CliRunner
 
 from gl_search.clis.search import search_command
+from gl_search.journal import start_run
 from gl_search.models import SearchParams
 
 
 class TestSearch:
-    @patch("gl_search.clis.search.print_results")
-    @patch("gl_search.clis.search.search")
+    @patch("gl_search.display.print_results")
+    @patch("gl_search.search.search")
     def test_call_methods(self, mock_search: Mock, mock_print_results: Mock) -> None:
         runner = CliRunner()
         result = runner.invoke(search_command, ["test"])
@@ -18,8 +22,8 @@ class TestSearch:
         mock_search.assert_called_once()
         mock_print_results.assert_called_once()
 
-    @patch("gl_search.clis.search.print_results")
-    @patch("gl_search.clis.search.search")
+    @patch("gl_search.display.print_results")
+    @patch("gl_search.search.search")
     def test_params(self, mock_search: Mock, mock_print_results: Mock) -> None:
         group = "1"
         max_workers = "10"
@@ -42,20 +46,20 @@ class TestSearch:
         result = runner.invoke(search_command, params)
         assert result.exit_code == 0
 
-        mock_search.assert_called_once_with(
-            SearchParams(
-                groups=group,
-                max_workers=max_workers,
-                visibility=[visibility_one, visibility_two],
-                search_code_input=search_code,
-                max_random_time_for_sleep=5,
-            )
-        )
+        mock_search.assert_called_once()
+        params = mock_search.call_args.args[0]
+        assert params.dict(exclude={"run_id"}) == SearchParams(
+            groups=group,
+            max_workers=max_workers,
+            visibility=[visibility_one, visibility_two],
+            search_code_input=search_code,
+        ).dict(exclude={"run_id"})
+        assert params.run_id
         mock_print_results.assert_called_once()
 
     @patch("gl_search.clis.search.logging")
-    @patch("gl_search.clis.search.print_results", Mock())
-    @patch("gl_search.clis.search.search", Mock())
+    @patch("gl_search.display.print_results", Mock())
+    @patch("gl_search.search.search", Mock())
     def test_debug_param(self, mock_logging: Mock) -> None:
         mock_get_logger = Mock()
         mock_logging.DEBUG = logging.DEBUG
@@ -69,3 +73,181 @@ class TestSearch:
 
         mock_get_logger.setLevel.assert_called_with(logging.DEBUG)
         mock_logging.getLogger.assert_called_with("gl_search")
+
+    @patch("gl_search.display.print_results", Mock())
+    @patch("gl_search.search.search")
+    def test_no_cache_param(self, mock_search: Mock) -> None:
+        runner = CliRunner()
+        assert runner.invoke(search_command, ["test"]).exit_code == 0
+        assert mock_search.call_args.args[0].use_cache is True
+
+        assert runner.invoke(search_command, ["test", "--no-cache"]).exit_code == 0
+        assert mock_search.call_args.args[0].use_cache is False
+
+    @patch("gl_search.display.print_results_by_query")
+    @patch("gl_search.search.search")
+    def test_many_queries(self, mock_search: Mock, mock_print_results_by_query: Mock, tmp_path: Path) -> None:
+        queries_file = tmp_path / "queries.txt"
+        queries_file.write_text("third\n\nfirst\n")
+
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["first", "second", "-qf", str(queries_file)])
+
+        assert result.exit_code == 0
+        assert mock_search.call_args.args[0].search_code_input == "first"
+        assert mock_search.call_args.args[0].search_code_inputs == ["first", "second", "third"]
+        mock_print_results_by_query.assert_called_once_with(
+            mock_search.return_value, ["first", "second", "third"], console=ANY, regex=False
+        )
+
+    def test_without_query(self) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, [])
+
+        assert result.exit_code == 2
+        assert "Missing argument 'SEARCH_CODE_INPUTS...'" in result.output
+
+    @patch("gl_search.clis.search.request_stats")
+    @patch("gl_search.display.print_results", Mock())
+    @patch("gl_search.search.search", Mock())
+    def test_stats_and_trace_params(self, mock_request_stats: Mock, tmp_path: Path) -> None:
+        mock_request_stats.summary.return_value = [{"phase": "render", "requests": 0, "time": 0.5}]
+        trace_path = str(tmp_path / "trace.json")
+
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["test", "--stats", "--trace", trace_path])
+
+        assert result.exit_code == 0
+        mock_request_stats.enable.assert_called_once()
+        assert "render" in result.output
+        mock_request_stats.write_trace.assert_called_once_with(trace_path)
+
+    @patch("gl_search.clis.search.request_stats")
+    @patch("gl_search.display.print_results", Mock())
+    @patch("gl_search.search.search", Mock())
+    def test_without_stats(self, mock_request_stats: Mock) -> None:
+        runner = CliRunner()
+        assert runner.invoke(search_command, ["test"]).exit_code == 0
+
+        mock_request_stats.enable.assert_not_called()
+        mock_request_stats.write_trace.assert_not_called()
+
+    @patch("gl_search.display.print_results")
+    @patch("gl_search.search.search")
+    def test_regex_param(self, mock_search: Mock, mock_print_results: Mock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, [r"get_\w+", "--regex"])
+
+        assert result.exit_code == 0
+        mock_print_results.assert_called_once_with(
+            mock_search.return_value, r"get_\w+", console=ANY, regex=True
+        )
+
+    @patch("gl_search.search.search")
+    def test_invalid_regex_param(self, mock_search: Mock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["get_(", "--regex"])
+
+        assert result.exit_code == 2
+        assert "'get_(' is not a regular expression" in result.output
+        mock_search.assert_not_called()
+
+    @patch("gl_search.display.process_user_feedback")
+    @patch("gl_search.display.print_results_plain")
+    @patch("gl_search.search.search")
+    def test_plain_output_param(
+        self, mock_search: Mock, mock_print_results_plain: Mock, mock_process_user_feedback: Mock
+    ) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["first", "second", "-o", "plain"])
+
+        assert result.exit_code == 0
+        mock_process_user_feedback.use_stderr.assert_called_once()
+        mock_print_results_plain.assert_called_once_with(
+            mock_search.return_value, "first", color=False, regex=False
+        )
+
+    @patch("gl_search.display.process_user_feedback")
+    @patch("gl_search.display.print_results_jsonl")
+    @patch("gl_search.search.search")
+    def test_jsonl_format_param(
+        self, mock_search: Mock, mock_print_results_jsonl: Mock, mock_process_user_feedback: Mock
+    ) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["test", "--format", "jsonl"])
+
+        assert result.exit_code == 0
+        mock_process_user_feedback.use_stderr.assert_called_once()
+        mock_print_results_jsonl.assert_called_once_with(mock_search.return_value, "test")
+
+    @pytest.mark.parametrize(
+        "params, max_results",
+        ((["test"], None), (["test", "-mr", "50"], 50), (["test", "--first"], 1)),
+        ids=("all", "max-results", "first"),
+    )
+    @patch("gl_search.display.print_results", Mock())
+    @patch("gl_search.search.search")
+    def test_max_results_params(
+        self, mock_search: Mock, params: list[str], max_results: Optional[int]
+    ) -> None:
+        runner = CliRunner()
+        assert runner.invoke(search_command, params).exit_code == 0
+        params = mock_search.call_args.args[0]
+        assert params.max_results == max_results
+        # A run stopped by --max-results is not journaled.
+        assert (params.run_id is None) == (max_results is not None)
+
+    def test_invalid_max_results_param(self) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["test", "--max-results", "0"])
+
+        assert result.exit_code == 2
+
+    @pytest.mark.parametrize("priority", ("activity", "pinned", "hits"))
+    @patch("gl_search.display.print_results", Mock())
+    @patch("gl_search.search.search")
+    def test_priority_param(self, mock_search: Mock, priority: str) -> None:
+        runner = CliRunner()
+        assert runner.invoke(search_command, ["test", "--priority", priority]).exit_code == 0
+        assert mock_search.call_args.args[0].priority == priority
+
+    @patch("gl_search.display.print_results", Mock())
+    @patch("gl_search.search.search")
+    def test_resume_param(self, mock_search: Mock) -> None:
+        start_run(
+            SearchParams(
+                search_code_input="test",
+                max_workers=5,
+                visibility=["public"],
+                extension="py",
+                run_id="20221001-120000-abcd",
+            )
+        )
+
+        runner = CliRunner()
+        result = runner.invoke(
+            search_command, ["--resume", "20221001-120000-abcd", "-mw", "10", "-ext", "js"]
+        )
+
+        assert result.exit_code == 0
+        params = mock_search.call_args.args[0]
+        assert (params.search_code_inputs, params.visibility, params.extension) == (
+            ["test"],
+            ["public"],
+            "py",
+        )
+        assert (params.max_workers, params.run_id) == (10, "20221001-120000-abcd")
+        assert "gl-search search --resume 20221001-120000-abcd" in result.output
+
+    def test_resume_param_without_run(self) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["--resume", "unknown"])
+
+        assert result.exit_code == 2
+        assert "no run 'unknown' to resume" in result.output
+
+    def test_resume_param_with_queries(self) -> None:
+        runner = CliRunner()
+        result = runner.invoke(search_command, ["test", "--resume", "unknown"])
+
+        assert result.exit_code == 2
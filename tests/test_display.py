@@ -1,7 +1,18 @@
-import re
-from unittest.mock import ANY, Mock, patch
+import io
+import json
+from unittest.mock import ANY, Mock, call, patch
 
-from gl_search.display import MatchFinder, print_results
+import pytest
+
+from gl_search.display import (
+    MatchFinder,
+    compile_search,
+    get_lexer,
+    print_results,
+    print_results_by_query,
+    print_results_jsonl,
+    print_results_plain,
+)
 from gl_search.models import RepoResult, SearchEntryResult
 
 
@@ -11,6 +22,39 @@ class TestMatchFinder:
         match_finder = MatchFinder(text, "test")
         assert match_finder.match_position == [((1, 0), (1, 4)), ((3, 0), (3, 4))]
 
+    def test_it_should_find_every_match_of_each_line(self) -> None:
+        text = "\nTest a test\n\nno\nlast test"
+        match_finder = MatchFinder(text, "test")
+        assert match_finder.match_position == [
+            ((2, 0), (2, 4)),
+            ((2, 7), (2, 11)),
+            ((5, 5), (5, 9)),
+        ]
+
+    def test_it_should_search_literals_by_default(self) -> None:
+        assert MatchFinder("print(a.b)\nprint(ab)", "a.b").match_position == [((1, 6), (1, 9))]
+        assert MatchFinder("x = [1]", "[1]").match_position == [((1, 4), (1, 7))]
+
+    def test_it_should_search_regex(self) -> None:
+        match_finder = MatchFinder("print(a.b)\nprint(ab)", compile_search(r"a\.?b", regex=True))
+        assert match_finder.match_position == [((1, 6), (1, 9)), ((2, 6), (2, 8))]
+
+    def test_it_should_map_matches_across_lines(self) -> None:
+        match_finder = MatchFinder("first\nsecond", compile_search(r"t\ns", regex=True))
+        assert match_finder.match_position == [((1, 4), (2, 1))]
+
+    def test_it_should_skip_empty_matches(self) -> None:
+        assert MatchFinder("abc", compile_search("x*", regex=True)).match_position == []
+
+
+class TestGetLexer:
+    def test_it_should_cache_the_lexer_per_extension(self) -> None:
+        assert get_lexer("py") is get_lexer("py")
+        assert get_lexer("py").name == "Python"
+
+    def test_it_should_fall_back_to_text(self) -> None:
+        assert get_lexer("unknown-extension").name == "Text only"
+
 
 class TestPrintResults:
     @patch("gl_search.display.Console")
@@ -30,13 +74,64 @@ class TestPrintResults:
         mock_console.assert_called()
         mock_console.return_value.print.assert_not_called()
 
-    @patch("re.finditer")
+    def test_it_should_print_on_given_console(self) -> None:
+        console = Mock()
+        data = iter(
+            [
+                RepoResult(name="test 1", web_url="url_1"),
+                RepoResult(
+                    name="test 2",
+                    web_url="url_2",
+                    results=[
+                        SearchEntryResult(
+                            path="test.py",
+                            filename="test.py",
+                            project_id=1,
+                            data="test",
+                            startline=1,
+                            ref="main",
+                        )
+                    ],
+                ),
+            ]
+        )
+        print_results(data, "test", console=console)
+        console.print.assert_any_call("Proj : test 2\n")
+
+    def test_it_should_report_failed_repos(self) -> None:
+        console = Mock()
+        data = [
+            RepoResult(name="test 1", web_url="url_1", failed=True),
+            RepoResult(name="test 2", web_url="url_2"),
+            RepoResult(name="test 3", web_url="url_3", failed=True),
+        ]
+        print_results(data, "test", console=console)
+        console.print.assert_called_once_with("2 repositories failed after retries", style="red")
+
+    def test_it_should_print_grouped_by_query(self) -> None:
+        console = Mock()
+        entry = SearchEntryResult(
+            path="test.py", filename="test.py", project_id=1, data="test", startline=1, ref="main"
+        )
+        data = [
+            RepoResult(name="test 1", web_url="url_1", search_code_input="other", results=[entry]),
+            RepoResult(name="test 2", web_url="url_2", search_code_input="test", results=[entry]),
+            RepoResult(name="test 3", web_url="url_3", search_code_input="other", failed=True),
+        ]
+
+        print_results_by_query(data, ["test", "other"], console=console)
+
+        assert [call.args[0] for call in console.mock_calls if call.args and "Proj" in str(call.args[0])] == [
+            "Proj : test 2\n",
+            "Proj : test 1\n",
+        ]
+        console.rule.assert_has_calls([call("Search : test"), call("Search : other")])
+        console.print.assert_any_call("1 repositories failed after retries", style="red")
+
     @patch("gl_search.display.Style")
     @patch("gl_search.display.Syntax")
     @patch("gl_search.display.Console")
-    def test_when_have_content(
-        self, mock_console: Mock, mock_syntax: Mock, mock_style: Mock, mock_re_finditer: Mock
-    ) -> None:
+    def test_when_have_content(self, mock_console: Mock, mock_syntax: Mock, mock_style: Mock) -> None:
         proj_1 = "test 1"
         data_input = "this is content to the test."
         data = [
@@ -60,20 +155,90 @@ class TestPrintResults:
 
         search_code = "test"
 
-        match_re_start = 10
-        match_re_end = 15
-        match_re = Mock()
-        match_re.start.return_value = match_re_start
-        match_re.end.return_value = match_re_end
+        match_re_start = 23
+        match_re_end = 27
 
-        mock_re_finditer.return_value = [match_re]
         print_results(data, search_code)
         mock_console.assert_called()
         mock_console.return_value.print.assert_called()
-        mock_re_finditer.assert_called_once_with(search_code, data_input, flags=re.IGNORECASE)
-        mock_syntax.assert_called_once_with(data_input, "py", start_line=0, line_numbers=True)
+        mock_syntax.assert_called_once_with(data_input, get_lexer("py"), start_line=0, line_numbers=True)
         mock_style.assert_called_once_with(bgcolor="deep_pink4")
 
         mock_syntax.return_value.stylize_range.assert_called_once_with(
             ANY, (1, match_re_start), (1, match_re_end)
         )
+
+
+class TestPrintResultsPlain:
+    def _results(self) -> list[RepoResult]:
+        return [
+            RepoResult(
+                name="group/repo",
+                web_url="url_1",
+                results=[
+                    SearchEntryResult(
+                        path="src/main.py",
+                        filename="src/main.py",
+                        project_id=1,
+                        data="import os\nprint(os.getenv('TEST'), 'test')\n",
+                        startline=10,
+                        ref="main",
+                    )
+                ],
+            ),
+            RepoResult(name="group/failed", web_url="url_2", failed=True),
+        ]
+
+    def test_it_should_write_grep_like_lines(self, capsys: pytest.CaptureFixture) -> None:
+        output = io.StringIO()
+
+        print_results_plain(self._results(), "test", output=output)
+
+        assert output.getvalue() == (
+            "group/repo/src/main.py-10-import os\n"
+            "group/repo/src/main.py:11:print(os.getenv('TEST'), 'test')\n"
+        )
+        assert capsys.readouterr().err == "1 repositories failed after retries\n"
+
+    def test_it_should_highlight_the_matches(self) -> None:
+        output = io.StringIO()
+
+        print_results_plain(self._results(), "test", output=output, color=True)
+
+        assert output.getvalue().splitlines()[1] == (
+            "group/repo/src/main.py:11:print(os.getenv('\033[01;31mTEST\033[0m'), '\033[01;31mtest\033[0m')"
+        )
+
+
+class TestPrintResultsJsonl:
+    def test_it_should_write_one_object_per_result(self, capsys: pytest.CaptureFixture) -> None:
+        entry = SearchEntryResult(
+            path="src/main.py", filename="src/main.py", project_id=1, data="test\n", startline=4, ref="main"
+        )
+        results = iter(
+            [
+                RepoResult(name="repo", web_url="https://gitlab.com/repo", results=[entry, entry]),
+                RepoResult(name="empty", web_url="https://gitlab.com/empty"),
+                RepoResult(name="failed", web_url="https://gitlab.com/failed", failed=True),
+            ]
+        )
+        output = Mock()
+
+        print_results_jsonl(results, "test", output=output)
+
+        output.write.assert_called_once()
+        output.flush.assert_called_once()
+        lines = output.write.call_args.args[0].splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {
+                "search": "test",
+                "project": "repo",
+                "web_url": "https://gitlab.com/repo",
+                "path": "src/main.py",
+                "ref": "main",
+                "start_line": 4,
+                "data": "test\n",
+                "blob_url": "https://gitlab.com/repo/-/blob/main/src/main.py#L4",
+            }
+        ] * 2
+        assert capsys.readouterr().err == "1 repositories failed after retries\n"
@@ -0,0 +1,104 @@
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from gl_search.config import settings
+from gl_search.models import SearchParams
+from gl_search.search import search
+from gl_search.stats import request_stats
+
+from .fake_gitlab import serve_fake_gitlab
+
+pytestmark = pytest.mark.enable_socket
+
+
+def _search_params(**kwargs) -> SearchParams:
+    return SearchParams(
+        **{
+            "groups": None,
+            "search_code_input": "search",
+            "max_workers": 4,
+            "visibility": ["internal", "public", "private"],
+            **kwargs,
+        }
+    )
+
+
+class TestSearchAgainstFakeGitLab:
+    @pytest.mark.parametrize("totals", (True, False), ids=("offset-totals", "offset-links"))
+    def test_project_engine(self, totals: bool) -> None:
+        with serve_fake_gitlab(groups=2, projects=250, matches_every=5, totals=totals) as fake_gitlab:
+            results = list(search(_search_params()))
+
+        assert sorted(result.name for result in results if result.results) == sorted(
+            f"project-{project_id}" for project_id in range(5, 251, 5)
+        )
+        assert fake_gitlab.requests == {"/groups": 1, "/groups/:id/projects": 4, "/projects/:id/search": 250}
+
+    def test_group_engine(self) -> None:
+        with serve_fake_gitlab(groups=3, projects=30, matches_every=3) as fake_gitlab:
+            results = list(search(_search_params(engine="group")))
+
+        assert len([result for result in results if result.results]) == 10
+        assert fake_gitlab.requests == {"/groups": 1, "/groups/:id/projects": 3, "/groups/:id/search": 3}
+
+    def test_keyset_pagination(self) -> None:
+        with serve_fake_gitlab(groups=60, projects=60) as fake_gitlab:
+            results = list(search(_search_params()))
+
+        assert len(results) == 60
+        assert fake_gitlab.requests["/groups"] == 2
+
+    def test_visibility_filter(self) -> None:
+        with serve_fake_gitlab(groups=1, projects=30) as fake_gitlab:
+            results = list(search(_search_params(visibility=["public"])))
+
+        assert len(results) == 10
+        assert fake_gitlab.requests["/groups/:id/projects"] == 1
+
+    def test_rate_limited_requests_are_retried(self) -> None:
+        with serve_fake_gitlab(
+            groups=1, projects=20, too_many_requests_every=4, retry_after=0
+        ) as fake_gitlab:
+            results = list(search(_search_params()))
+
+        assert len([result for result in results if result.results]) == 20
+        assert not [result for result in results if result.failed]
+        assert fake_gitlab.total_requests > 22
+
+    @patch("gl_search.search.settings.RATE_LIMITED_RETRIES", 0)
+    def test_rate_limited_requests_fail_without_retries(self) -> None:
+        with serve_fake_gitlab(groups=1, projects=20, too_many_requests_every=4, retry_after=0):
+            results = list(search(_search_params(max_workers=1)))
+
+        assert [result for result in results if result.failed]
+
+    def test_request_stats(self) -> None:
+        request_stats.enable()
+        with serve_fake_gitlab(
+            groups=1, projects=20, too_many_requests_every=4, retry_after=0
+        ) as fake_gitlab:
+            list(search(_search_params()))
+
+        records = request_stats.records
+        assert len(records) == fake_gitlab.total_requests
+        assert Counter(record.endpoint for record in records) == {
+            f"/api/v4{endpoint}": count for endpoint, count in fake_gitlab.requests.items()
+        }
+        assert {record.status for record in records} == {200, 429}
+        assert all(record.size > 0 and record.duration > 0 for record in records)
+
+    def test_connections_are_reused(self) -> None:
+        with serve_fake_gitlab(groups=1, projects=300, latency=0.05) as fake_gitlab:
+            list(search(_search_params(max_workers=32)))
+
+        # One connection per thread at most: the search workers, the pages workers and the main thread.
+        assert fake_gitlab.connections <= 32 + settings.MAX_PARALLEL_PAGES + 1
+
+    def test_first_result(self) -> None:
+        with serve_fake_gitlab(groups=1, projects=300, matches_every=1, latency=0.01) as fake_gitlab:
+            results = list(search(_search_params(max_results=1)))
+
+        assert [len(result.results) for result in results] == [1]
+        assert fake_gitlab.requests["/projects/:id/search"] < 300
@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import pytest
+
+from gl_search.index import TrigramIndex, build_index, index_is_stale, search_mirror
+from gl_search.mirror import grep_mirror, sync_mirror
+from gl_search.models import Repo, SearchScopeParams
+
+from .utils import build_git_repository, commit_files
+
+FILES = {
+    "main.py": "import os\n\nprint('Search me')\nprint('search')\n\n\n\nsearch = 1\n",
+    "src/app.js": "const search = 'SEARCH';\r\n",
+    "src/utf.py": "# café\nsearch_café = 'CAFÉ'\n",
+    "docs/readme.md": "nothing here\n",
+    "image.png": "search\0binary",
+}
+
+
+@pytest.fixture
+def work_tree(tmp_path: Path) -> Path:
+    return build_git_repository(tmp_path, FILES)
+
+
+@pytest.fixture
+def repo(tmp_path: Path, work_tree: Path) -> Repo:
+    return Repo(
+        id=1,
+        name="repo_1",
+        web_url="url_1",
+        http_url_to_repo=f"file://{tmp_path / 'origin.git'}",
+        default_branch="main",
+    )
+
+
+@pytest.fixture
+def mirror_path(tmp_path: Path, repo: Repo) -> str:
+    mirror_path = str(tmp_path / "mirrors" / "1.git")
+    sync_mirror(repo, mirror_path)
+    return mirror_path
+
+
+@pytest.fixture
+def index_path(tmp_path: Path, mirror_path: str) -> str:
+    index_path = str(tmp_path / "index" / "1.idx")
+    build_index(mirror_path, index_path)
+    return index_path
+
+
+class TestTrigramIndex:
+    @pytest.mark.parametrize(
+        "search, expected_paths",
+        (
+            ("Search", ["main.py", "src/app.js", "src/utf.py"]),
+            ("cafÉ", ["src/utf.py"]),
+            ("nothing", ["docs/readme.md"]),
+            ("missing", []),
+            ("se", ["docs/readme.md", "main.py", "src/app.js", "src/utf.py"]),
+        ),
+    )
+    def test_candidates(self, index_path: str, search: str, expected_paths: list[str]) -> None:
+        with TrigramIndex(index_path) as index:
+            assert sorted(path for _, path in index.candidates(search)) == expected_paths
+
+    def test_when_file_is_not_an_index(self, tmp_path: Path) -> None:
+        (tmp_path / "invalid.idx").write_bytes(b"\0" * 100)
+
+        with pytest.raises(ValueError):
+            TrigramIndex(str(tmp_path / "invalid.idx"))
+
+
+class TestSearchMirror:
+    @pytest.mark.parametrize(
+        "scope_params",
+        (
+            {"search_code_input": "search"},
+            {"search_code_input": "SEARCH ME"},
+            {"search_code_input": "café"},
+            {"search_code_input": "se"},
+            {"search_code_input": "search", "extension": "js"},
+            {"search_code_input": "search", "filename": "main.py"},
+            {"search_code_input": "search", "path": "src"},
+            {"search_code_input": "missing"},
+        ),
+    )
+    def test_it_should_return_the_same_results_as_grep(
+        self, repo: Repo, mirror_path: str, index_path: str, scope_params: dict
+    ) -> None:
+        scope = SearchScopeParams(**scope_params)
+
+        assert search_mirror(repo, mirror_path, index_path, scope) == grep_mirror(repo, mirror_path, scope)
+
+    def test_when_index_is_stale(
+        self, repo: Repo, mirror_path: str, index_path: str, work_tree: Path
+    ) -> None:
+        commit_files(work_tree, {"new.py": "search"})
+        sync_mirror(repo, mirror_path)
+        scope = SearchScopeParams(search_code_input="search")
+
+        assert index_is_stale(mirror_path, index_path) is True
+        assert "new.py" in [entry.path for entry in search_mirror(repo, mirror_path, index_path, scope)]
+
+        build_index(mirror_path, index_path)
+
+        assert index_is_stale(mirror_path, index_path) is False
+        assert search_mirror(repo, mirror_path, index_path, scope) == grep_mirror(repo, mirror_path, scope)
+
+    def test_when_index_is_missing(self, repo: Repo, mirror_path: str, tmp_path: Path) -> None:
+        scope = SearchScopeParams(search_code_input="search")
+
+        assert index_is_stale(mirror_path, str(tmp_path / "missing.idx")) is True
+        assert search_mirror(repo, mirror_path, str(tmp_path / "missing.idx"), scope) == grep_mirror(
+            repo, mirror_path, scope
+        )
+
+    def test_when_repository_is_not_mirrored(self, repo: Repo, tmp_path: Path) -> None:
+        scope = SearchScopeParams(search_code_input="search")
+
+        assert (
+            search_mirror(repo, str(tmp_path / "missing.git"), str(tmp_path / "missing.idx"), scope) is None
+        )
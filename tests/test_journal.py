@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from gl_search.journal import append_run_result, load_run_params, load_run_results, remove_run, start_run
+from gl_search.models import Repo, RepoResult, SearchEntryResult, SearchParams
+
+RUN_ID = "20221001-120000-abcd"
+
+
+def _search_params() -> SearchParams:
+    return SearchParams(
+        search_code_input="search", max_workers=5, visibility=["private"], extension="py", run_id=RUN_ID
+    )
+
+
+class TestJournal:
+    def test_it_should_keep_the_searches_and_filters_of_the_run(self) -> None:
+        assert load_run_params(RUN_ID) is None
+
+        start_run(_search_params())
+
+        assert load_run_params(RUN_ID) == {
+            "groups": None,
+            "search_code_inputs": ["search"],
+            "visibility": ["private"],
+            "extension": "py",
+            "filename": None,
+            "path": None,
+            "engine": "project",
+            "include_archived": False,
+        }
+
+    def test_it_should_load_the_finished_searches(self) -> None:
+        entry = SearchEntryResult(
+            path="path", filename="filename", project_id=1, data="data", startline=1, ref="main"
+        )
+        start_run(_search_params())
+        append_run_result(RUN_ID, "search", Repo(id=1, name="repo_1", web_url="url_1"), [entry])
+        append_run_result(RUN_ID, "search", Repo(id=2, name="repo_2", web_url="url_2"), [])
+        # Started again by the resumed run.
+        start_run(_search_params())
+
+        assert load_run_results(RUN_ID) == {
+            ("search", 1): RepoResult(
+                name="repo_1", web_url="url_1", search_code_input="search", results=[entry]
+            ),
+            ("search", 2): RepoResult(name="repo_2", web_url="url_2", search_code_input="search"),
+        }
+
+    def test_it_should_skip_a_cut_line(self, cache_dir_path: Path) -> None:
+        start_run(_search_params())
+        append_run_result(RUN_ID, "search", Repo(id=1, name="repo_1", web_url="url_1"), [])
+        with open(cache_dir_path / "runs" / f"{RUN_ID}.jsonl", "a") as file:
+            file.write('{"search": "search", "repo_id": 2, "na')
+
+        assert list(load_run_results(RUN_ID)) == [("search", 1)]
+
+    def test_it_should_remove_the_run(self) -> None:
+        start_run(_search_params())
+        remove_run(RUN_ID)
+
+        assert load_run_params(RUN_ID) is None
+        assert load_run_results(RUN_ID) == {}
+        remove_run(RUN_ID)
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+from gl_search.mirror import GitCommandError, grep_mirror, sync_mirror
+from gl_search.models import Repo, SearchEntryResult, SearchScopeParams
+
+from .utils import build_git_repository, commit_files
+
+
+@pytest.fixture
+def work_tree(tmp_path: Path) -> Path:
+    return build_git_repository(
+        tmp_path,
+        {
+            "main.py": "import os\nprint('Search me')\n",
+            "src/app.js": "const search = 'SEARCH';\n",
+            "docs/readme.md": "nothing here\n",
+        },
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path, work_tree: Path) -> Repo:
+    return Repo(
+        id=1,
+        name="repo_1",
+        web_url="url_1",
+        http_url_to_repo=f"file://{tmp_path / 'origin.git'}",
+        default_branch="main",
+    )
+
+
+@pytest.fixture
+def mirror_path(tmp_path: Path) -> str:
+    return str(tmp_path / "mirrors" / "1.git")
+
+
+class TestSyncMirror:
+    def test_it_should_clone_and_update(self, repo: Repo, mirror_path: str, work_tree: Path) -> None:
+        scope = SearchScopeParams(search_code_input="updated")
+
+        assert sync_mirror(repo, mirror_path) is True
+        assert grep_mirror(repo, mirror_path, scope) == []
+
+        commit_files(work_tree, {"main.py": "updated\n"})
+
+        assert sync_mirror(repo, mirror_path) is True
+        assert grep_mirror(repo, mirror_path, scope) == [
+            SearchEntryResult(
+                path="main.py", filename="main.py", project_id=1, data="updated", startline=1, ref="main"
+            )
+        ]
+
+    def test_when_repository_is_empty(self, repo: Repo, mirror_path: str) -> None:
+        assert sync_mirror(repo.copy(update={"default_branch": None}), mirror_path) is False
+        assert not Path(mirror_path).exists()
+
+    def test_when_fetch_fails(self, repo: Repo, mirror_path: str, tmp_path: Path) -> None:
+        with pytest.raises(GitCommandError):
+            sync_mirror(
+                repo.copy(update={"http_url_to_repo": f"file://{tmp_path / 'missing.git'}"}), mirror_path
+            )
+
+        assert not any((tmp_path / "mirrors").iterdir())
+
+
+class TestGrepMirror:
+    def test_when_repository_is_not_mirrored(self, repo: Repo, mirror_path: str) -> None:
+        assert grep_mirror(repo, mirror_path, SearchScopeParams(search_code_input="search")) is None
+
+    @pytest.mark.parametrize(
+        "scope_params, expected_paths",
+        (
+            ({}, ["main.py", "src/app.js"]),
+            ({"extension": "js"}, ["src/app.js"]),
+            ({"filename": "main.py"}, ["main.py"]),
+            ({"filename": "main.py", "extension": "js"}, []),
+            ({"path": "src"}, ["src/app.js"]),
+        ),
+    )
+    def test_it_should_search_default_branch(
+        self, repo: Repo, mirror_path: str, scope_params: dict, expected_paths: list[str]
+    ) -> None:
+        sync_mirror(repo, mirror_path)
+
+        data = grep_mirror(repo, mirror_path, SearchScopeParams(search_code_input="search", **scope_params))
+
+        assert [entry.path for entry in data] == expected_paths
+
+    def test_it_should_return_matching_lines_with_context(self, repo: Repo, mirror_path: str) -> None:
+        sync_mirror(repo, mirror_path)
+
+        assert grep_mirror(repo, mirror_path, SearchScopeParams(search_code_input="search me")) == [
+            SearchEntryResult(
+                path="main.py",
+                filename="main.py",
+                project_id=1,
+                data="import os\nprint('Search me')",
+                startline=1,
+                ref="main",
+            )
+        ]
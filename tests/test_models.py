@@ -1,6 +1,9 @@
+from typing import Optional
+
 import pytest
+from pydantic import ValidationError
 
-from gl_search.models import SearchRepoParams
+from gl_search.models import Repo, SearchEntryResult, SearchParams, SearchRepoParams
 
 
 class TestSearchRepoParams:
@@ -14,7 +17,69 @@ class TestSearchRepoParams:
     )
     def test_search_with_params(self, params: str, expected: str):
 
-        search_params = SearchRepoParams(
-            repo_id=1, search_code_input="test", max_random_time_for_sleep=5, **params
-        )
+        search_params = SearchRepoParams(repo_id=1, search_code_input="test", max_delay_request=5, **params)
         assert search_params.search_with_params == expected
+
+
+class TestSearchParams:
+    @pytest.mark.parametrize(
+        "search_code_inputs, expected",
+        [(None, ["test"]), (["test", "other"], ["test", "other"])],
+    )
+    def test_search_code_inputs(self, search_code_inputs: list[str], expected: list[str]) -> None:
+        params = {"search_code_inputs": search_code_inputs} if search_code_inputs else {}
+
+        search_params = SearchParams(
+            groups=None, search_code_input="test", max_workers=1, visibility=["public"], **params
+        )
+        assert search_params.search_code_inputs == expected
+
+
+class TestSearchEntryResult:
+    def test_from_api(self) -> None:
+        value = {
+            "basename": "main",
+            "data": "print('test')\n",
+            "path": "src/main.py",
+            "filename": "src/main.py",
+            "id": None,
+            "ref": "main",
+            "startline": 3,
+            "project_id": 1,
+        }
+
+        entry = SearchEntryResult.from_api(value)
+
+        assert entry == SearchEntryResult(**value)
+        assert entry.dict(by_alias=True) == SearchEntryResult(**value).dict(by_alias=True)
+
+    def test_from_api_when_a_field_is_missing(self) -> None:
+        with pytest.raises(ValidationError):
+            SearchEntryResult.from_api({"path": "main.py", "data": "", "startline": 1})
+
+
+class TestRepo:
+    @pytest.mark.parametrize(
+        "last_activity_at",
+        ("2022-10-01T12:30:00.123Z", "2022-10-01T12:30:00.123456+02:00", "2022-10-01T12:30:00.1Z", None),
+    )
+    def test_from_api(self, last_activity_at: Optional[str]) -> None:
+        value = {
+            "id": 1,
+            "name": "repo_1",
+            "web_url": "https://gitlab.com/group/repo_1",
+            "http_url_to_repo": "https://gitlab.com/group/repo_1.git",
+            "default_branch": "main",
+            "last_activity_at": last_activity_at,
+            "namespace": {"id": 10},
+        }
+
+        repo = Repo.from_api(value)
+
+        assert repo == Repo(**value)
+        assert hash(repo) == hash(Repo(**value))
+        assert "namespace" not in repo.__dict__
+
+    def test_from_api_when_a_field_is_missing(self) -> None:
+        with pytest.raises(ValidationError):
+            Repo.from_api({"id": 1, "name": "repo_1"})
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from gl_search.cache import record_hits
+from gl_search.models import Repo, SearchParams
+from gl_search.priority import repo_priority
+
+
+@pytest.fixture
+def search_params() -> SearchParams:
+    return SearchParams(search_code_input="search", max_workers=5, visibility=["private"])
+
+
+def _repo(repo_id: int, path: str, last_activity_at: Optional[datetime] = None) -> Repo:
+    return Repo(
+        id=repo_id,
+        name=path.rsplit("/", 1)[-1],
+        web_url=f"https://gitlab.com/{path}",
+        last_activity_at=last_activity_at,
+    )
+
+
+class TestRepoPriority:
+    def test_it_should_search_the_most_recently_active_first(self, search_params: SearchParams) -> None:
+        old = _repo(1, "group/old", datetime(2020, 1, 1, tzinfo=timezone.utc))
+        inactive = _repo(2, "group/inactive")
+        recent = _repo(3, "group/recent", datetime(2022, 1, 1, tzinfo=timezone.utc))
+
+        assert sorted([old, inactive, recent], key=repo_priority(search_params)) == [recent, old, inactive]
+
+    @patch("gl_search.priority.settings.PINNED_GROUPS", ["platform/", "security/tools"])
+    def test_it_should_search_the_pinned_groups_first(self, search_params: SearchParams) -> None:
+        search_params.priority = "pinned"
+        other = _repo(1, "other/project", datetime(2022, 1, 1, tzinfo=timezone.utc))
+        similar_path = _repo(2, "platform-old/project", datetime(2022, 1, 1, tzinfo=timezone.utc))
+        subgroup = _repo(3, "platform/core/project", datetime(2020, 1, 1, tzinfo=timezone.utc))
+        pinned = _repo(4, "security/tools/project", datetime(2021, 1, 1, tzinfo=timezone.utc))
+
+        assert sorted([other, similar_path, subgroup, pinned], key=repo_priority(search_params)) == [
+            pinned,
+            subgroup,
+            other,
+            similar_path,
+        ]
+
+    def test_it_should_search_the_past_hits_first(self, search_params: SearchParams) -> None:
+        search_params.priority = "hits"
+        never = _repo(1, "group/never", datetime(2022, 1, 1, tzinfo=timezone.utc))
+        once = _repo(2, "group/once")
+        twice = _repo(3, "group/twice")
+        record_hits({once.web_url, twice.web_url})
+        record_hits({twice.web_url})
+
+        assert sorted([never, once, twice], key=repo_priority(search_params)) == [twice, once, never]
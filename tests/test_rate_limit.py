@@ -0,0 +1,107 @@
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from gl_search.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def mock_monotonic() -> Mock:
+    with patch("gl_search.rate_limit.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        yield mock_monotonic
+
+
+@pytest.fixture
+def mock_sleep() -> Mock:
+    with patch("gl_search.rate_limit.time.sleep") as mock_sleep:
+        yield mock_sleep
+
+
+class TestRateLimiter:
+    def test_it_should_not_wait_without_rate_limit_headers(
+        self, mock_monotonic: Mock, mock_sleep: Mock
+    ) -> None:
+        rate_limiter = RateLimiter()
+
+        for _ in range(100):
+            assert rate_limiter.acquire() == 0
+
+        mock_sleep.assert_not_called()
+
+    def test_it_should_not_wait_while_there_is_headroom(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"RateLimit-Remaining": "10", "RateLimit-Reset": "60"})
+
+        for _ in range(10):
+            assert rate_limiter.acquire() == 0
+
+        mock_sleep.assert_not_called()
+
+    def test_it_should_spread_requests_until_reset(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"RateLimit-Remaining": "2", "RateLimit-Reset": "10"})
+
+        assert rate_limiter.acquire() == 0
+        assert rate_limiter.acquire() == 0
+        assert rate_limiter.acquire() == pytest.approx(5)
+        mock_sleep.assert_called_once_with(pytest.approx(5))
+
+    def test_it_should_accept_reset_as_epoch(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"RateLimit-Remaining": "0", "RateLimit-Reset": str(int(time.time()) + 30)})
+
+        assert rate_limiter.acquire() == pytest.approx(30, abs=1)
+
+    def test_it_should_wait_retry_after(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"Retry-After": "20"})
+
+        mock_monotonic.return_value = 105.0
+        assert rate_limiter.acquire() == 15
+
+        mock_monotonic.return_value = 121.0
+        assert rate_limiter.acquire() == 0
+
+    def test_it_should_cap_the_wait(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"Retry-After": "20"})
+
+        assert rate_limiter.acquire(max_wait=2) == 2
+        mock_sleep.assert_called_once_with(2)
+
+    def test_it_should_refill_over_time(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"RateLimit-Remaining": "1", "RateLimit-Reset": "10"})
+        rate_limiter.acquire()
+
+        mock_monotonic.return_value = 110.0
+        assert rate_limiter.acquire() == 0
+
+    def test_it_should_not_refill_past_the_limit(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"RateLimit-Remaining": "2", "RateLimit-Reset": "10", "RateLimit-Limit": "2"})
+
+        mock_monotonic.return_value = 1000.0
+        assert rate_limiter.acquire() == 0
+        assert rate_limiter.acquire() == 0
+        assert rate_limiter.acquire() > 0
+
+    def test_it_should_not_refill_from_late_responses(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update({"RateLimit-Remaining": "2", "RateLimit-Reset": "10"})
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+
+        rate_limiter.update({"RateLimit-Remaining": "2", "RateLimit-Reset": "10"})
+
+        assert rate_limiter.acquire() > 0
+
+    def test_it_should_ignore_malformed_headers(self, mock_monotonic: Mock, mock_sleep: Mock) -> None:
+        rate_limiter = RateLimiter()
+        rate_limiter.update(
+            {"RateLimit-Remaining": "many", "RateLimit-Reset": "soon", "Retry-After": "Wed, 21 Oct 2015"}
+        )
+
+        assert rate_limiter.acquire() == 0
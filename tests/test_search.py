@@ -1,34 +1,55 @@
+import concurrent.futures
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Iterator
 from unittest.mock import ANY, Mock, call, patch
 
 import pytest
 from pytest_unordered import unordered
 
+from gl_search.cache import load_hits, load_inventory, mirror_dir_path, save_inventory
+from gl_search.journal import load_run_params, load_run_results
+from gl_search.mirror import sync_mirror
 from gl_search.models import (
+    Inventory,
     Repo,
     RepoResult,
     RequestDescribe,
     SearchEntryResult,
+    SearchGroupParams,
     SearchParams,
     SearchRepoParams,
 )
 from gl_search.search import (
+    _as_completed_with_retries,
+    _limit_results,
+    _retrieve_groups,
     _retrieve_groups_ids,
     _retrieve_information_from_repositories_of_each_group,
+    _retrieve_inventory,
     _retrieve_repositories_by,
+    _Scheduler,
     _search_code,
+    _search_code_by_group,
+    _search_code_while_listing,
+    _search_in_group,
     _search_in_repo,
+    index_mirrors,
     search,
+    sync_mirrors,
 )
+from gl_search.utils import InvalidStatusCodeError, RateLimitedError
 
-from .utils import build_response
+from .utils import build_git_repository, build_response
 
 
 @pytest.fixture
 def search_params() -> SearchParams:
     return SearchParams(
-        search_code_input="search", max_workers=5, visibility=["private"], max_random_time_for_sleep=5
+        search_code_input="search", max_workers=5, visibility=["private"], max_delay_request=5
     )
 
 
@@ -56,28 +77,250 @@ class TestSearchCode:
             Repo(id=2, name=repo_name_2, visibility="public", web_url=web_url_2),
             Repo(id=3, name=repo_name_3, visibility="public", web_url=web_url_3),
         ]
-        response = _search_code(repo_list, search_params)
+        response = list(_search_code(repo_list, search_params))
 
         assert mock_search_in_repo.call_count == len(repo_list)
         assert response == unordered(
             [
-                RepoResult(**{"name": repo_name_1, "results": [result_1], "web_url": web_url_1}),
-                RepoResult(**{"name": repo_name_2, "results": [result_2], "web_url": web_url_2}),
-                RepoResult(**{"name": repo_name_3, "results": [result_3], "web_url": web_url_3}),
+                RepoResult(
+                    **{
+                        "name": repo_name_1,
+                        "search_code_input": "search",
+                        "results": [result_1],
+                        "web_url": web_url_1,
+                    }
+                ),
+                RepoResult(
+                    **{
+                        "name": repo_name_2,
+                        "search_code_input": "search",
+                        "results": [result_2],
+                        "web_url": web_url_2,
+                    }
+                ),
+                RepoResult(
+                    **{
+                        "name": repo_name_3,
+                        "search_code_input": "search",
+                        "results": [result_3],
+                        "web_url": web_url_3,
+                    }
+                ),
             ]
         )
 
+    @patch("gl_search.search.settings.RATE_LIMITED_RETRIES", 0)
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_return_rate_limited_repos_as_failed(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        mock_search_in_repo.side_effect = RateLimitedError(None)
+        repo = Repo(id=1, name="repo_1", visibility="public", web_url="url_1")
+
+        assert list(_search_code([repo], search_params)) == [
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="search", failed=True)
+        ]
+
+    @pytest.mark.parametrize("use_cache, expected_calls", ((True, 1), (False, 2)))
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_reuse_cached_results(
+        self, mock_search_in_repo: Mock, use_cache: bool, expected_calls: int, search_params: SearchParams
+    ) -> None:
+        result = SearchEntryResult(
+            path="path_1", filename="filename_1", project_id=1, data="data_1", startline=1, ref="main"
+        )
+        mock_search_in_repo.return_value = [result]
+        search_params.use_cache = use_cache
+        repo = Repo(id=1, name="repo_1", web_url="url_1", last_activity_at=datetime(2022, 10, 1))
+
+        assert list(_search_code([repo], search_params)) == [
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="search", results=[result])
+        ]
+        assert list(_search_code([repo], search_params)) == [
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="search", results=[result])
+        ]
+        assert mock_search_in_repo.call_count == expected_calls
+
+    @pytest.mark.parametrize("status_code", (HTTPStatus.NOT_FOUND, HTTPStatus.FORBIDDEN))
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_remove_missing_repos_from_inventory(
+        self, mock_search_in_repo: Mock, status_code: HTTPStatus, search_params: SearchParams
+    ) -> None:
+        repo_1 = Repo(id=1, name="repo_1", visibility="public", web_url="url_1")
+        repo_2 = Repo(id=2, name="repo_2", visibility="public", web_url="url_2")
+        save_inventory(
+            search_params,
+            Inventory(groups_ids=[1], repos=[repo_1, repo_2], updated_at=datetime.now(timezone.utc)),
+        )
+
+        def search_in_repo(search_params: SearchRepoParams) -> list[SearchEntryResult]:
+            if search_params.repo_id == 2:
+                raise InvalidStatusCodeError(status_code)
+            return []
+
+        mock_search_in_repo.side_effect = search_in_repo
+
+        assert list(_search_code([repo_1, repo_2], search_params)) == [
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="search")
+        ]
+        assert load_inventory(search_params).repos == [repo_1]
+
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_return_repos_with_invalid_status_code_as_failed(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        mock_search_in_repo.side_effect = InvalidStatusCodeError(HTTPStatus.INTERNAL_SERVER_ERROR)
+        repo = Repo(id=1, name="repo_1", visibility="public", web_url="url_1")
+
+        assert list(_search_code([repo], search_params)) == [
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="search", failed=True)
+        ]
+
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_search_every_query_in_one_executor(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        def search_in_repo(search_params: SearchRepoParams) -> list[SearchEntryResult]:
+            return [
+                SearchEntryResult(
+                    path="path",
+                    filename="filename",
+                    project_id=1,
+                    data=search_params.search,
+                    startline=1,
+                    ref="main",
+                )
+            ]
+
+        mock_search_in_repo.side_effect = search_in_repo
+        search_params.search_code_inputs = ["search", "other"]
+        repos = [Repo(id=1, name="repo_1", web_url="url_1"), Repo(id=2, name="repo_2", web_url="url_2")]
+
+        with patch(
+            "concurrent.futures.ThreadPoolExecutor", wraps=concurrent.futures.ThreadPoolExecutor
+        ) as executor:
+            response = list(_search_code(repos, search_params))
+
+        executor.assert_called_once()
+        assert mock_search_in_repo.call_count == 4
+        assert sorted((entry.search_code_input, entry.name, entry.results[0].data) for entry in response) == [
+            ("other", "repo_1", "other"),
+            ("other", "repo_2", "other"),
+            ("search", "repo_1", "search"),
+            ("search", "repo_2", "search"),
+        ]
+
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_search_by_priority(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        mock_search_in_repo.return_value = []
+        search_params.max_workers = 1
+        repos = [
+            Repo(
+                id=repo_id, name=f"repo_{repo_id}", web_url="url", last_activity_at=datetime(2022, 1, repo_id)
+            )
+            for repo_id in (2, 3, 1)
+        ]
+
+        list(_search_code(repos, search_params))
+
+        assert [call.args[0].repo_id for call in mock_search_in_repo.call_args_list] == [3, 2, 1]
+
     @pytest.mark.parametrize("max_workers", (5, 50))
-    @patch("concurrent.futures.as_completed", Mock(return_value=[]))
+    @patch("gl_search.search._as_completed_with_retries", Mock(return_value=[]))
     @patch("concurrent.futures.ThreadPoolExecutor")
     def test_mx_workers(
         self, mock_thread_pool_executor: Mock, max_workers: int, search_params: SearchParams
     ) -> None:
         search_params.max_workers = max_workers
-        _search_code([], search_params)
+        list(_search_code([], search_params))
         mock_thread_pool_executor.assert_called_with(max_workers=max_workers)
 
 
+class TestAsCompletedWithRetries:
+    @pytest.fixture
+    def mock_time(self) -> Mock:
+        clock = [0.0]
+
+        def sleep(seconds: float) -> None:
+            clock[0] += seconds
+
+        with patch("gl_search.search.time") as mock_time:
+            mock_time.monotonic.side_effect = lambda: clock[0]
+            mock_time.sleep.side_effect = sleep
+            yield mock_time
+
+    def test_it_should_retry_rate_limited_tasks(self, mock_time: Mock) -> None:
+        function = Mock(side_effect=[RateLimitedError(None), "result"])
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            results = list(_as_completed_with_retries(executor, function, {"key": ("argument",)}))
+
+        assert results == [("key", "result", False)]
+        assert function.call_args_list == [call("argument"), call("argument")]
+
+    @patch("gl_search.search.settings.RATE_LIMITED_RETRIES", 2)
+    def test_it_should_fail_when_retries_are_exhausted(self, mock_time: Mock) -> None:
+        function = Mock(side_effect=RateLimitedError(None))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            results = list(_as_completed_with_retries(executor, function, {"key": ("argument",)}))
+
+        assert results == [("key", None, True)]
+        assert function.call_count == 3
+
+    @patch("gl_search.search.settings.RATE_LIMITED_RETRIES", 2)
+    def test_it_should_wait_retry_after_or_backoff(self, mock_time: Mock) -> None:
+        function = Mock(side_effect=[RateLimitedError(7), RateLimitedError(None), "result"])
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            list(_as_completed_with_retries(executor, function, {"key": ()}))
+
+        assert mock_time.sleep.call_args_list == [call(7), call(2)]
+
+    def test_it_should_retry_at_once_when_retry_after_is_zero(self, mock_time: Mock) -> None:
+        function = Mock(side_effect=[RateLimitedError(0), "result"])
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            results = list(_as_completed_with_retries(executor, function, {"key": ()}))
+
+        assert results == [("key", "result", False)]
+        assert mock_time.monotonic() == 0
+
+
+class TestScheduler:
+    def test_it_should_read_the_items_put_by_the_tasks(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            scheduler: _Scheduler[str] = _Scheduler(executor)
+
+            def function() -> str:
+                scheduler.put("item_1")
+                scheduler.put("item_2")
+                return "result"
+
+            scheduler.submit("key", function)
+
+            assert list(scheduler) == [
+                (None, "item_1", False),
+                (None, "item_2", False),
+                ("key", "result", False),
+            ]
+
+    def test_it_should_read_the_tasks_submitted_while_reading(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            scheduler: _Scheduler[int] = _Scheduler(executor)
+            scheduler.submit(1, lambda: 1)
+
+            results = []
+            for key, result, failed in scheduler:
+                results.append(result)
+                if key < 3:
+                    scheduler.submit(key + 1, lambda value=key + 1: value)
+
+        assert results == [1, 2, 3]
+
+
 class TestSearchInRepo:
     @patch("gl_search.search.retrieve_data")
     def test_check_url(self, mock_retrieve_data: Mock, search_params: SearchParams) -> None:
@@ -90,7 +333,7 @@ class TestSearchInRepo:
             params={"scope": "blobs", "search": search_params.search_code_input, "per_page": "100"},
         )
         mock_retrieve_data.assert_called_with(
-            request_describe, ANY, max_random_time_for_sleep=search_params.max_random_time_for_sleep
+            request_describe, ANY, max_delay_request=search_params.max_delay_request
         )
 
     @patch("gl_search.utils.request_session.get")
@@ -119,6 +362,161 @@ class TestSearchInRepo:
         ]
 
 
+class TestSearchInGroup:
+    @patch("gl_search.search.iter_data", return_value=[])
+    def test_check_url(self, mock_iter_data: Mock, search_params: SearchParams) -> None:
+        group_id = 1
+
+        _search_in_group(SearchGroupParams(group_id=group_id, **search_params.dict()))
+
+        request_describe = RequestDescribe(
+            url=f"https://gitlab.com/api/v4/groups/{group_id}/search",
+            params={"scope": "blobs", "search": search_params.search_code_input, "per_page": "100"},
+        )
+        mock_iter_data.assert_called_with(
+            request_describe, ANY, max_delay_request=search_params.max_delay_request
+        )
+
+    @patch("gl_search.search.iter_data", return_value=[])
+    def test_it_should_return_none_when_group_search_is_unavailable(
+        self, mock_iter_data: Mock, search_params: SearchParams
+    ) -> None:
+        mock_iter_data.side_effect = InvalidStatusCodeError(HTTPStatus.BAD_REQUEST)
+
+        assert _search_in_group(SearchGroupParams(group_id=1, **search_params.dict())) is None
+
+    @patch("gl_search.search.GROUP_SEARCH_RESULT_WINDOW", 2)
+    @patch("gl_search.search.iter_data", return_value=[])
+    def test_it_should_return_none_when_group_search_is_truncated(
+        self, mock_iter_data: Mock, search_params: SearchParams
+    ) -> None:
+        mock_iter_data.return_value = [Mock(), Mock()]
+
+        assert _search_in_group(SearchGroupParams(group_id=1, **search_params.dict())) is None
+
+    @patch("gl_search.search.GROUP_SEARCH_RESULT_WINDOW", 2)
+    @patch("gl_search.search.iter_data")
+    def test_it_should_stop_reading_once_truncated(
+        self, mock_iter_data: Mock, search_params: SearchParams
+    ) -> None:
+        data = iter([Mock(), Mock(), Mock()])
+        mock_iter_data.return_value = data
+
+        assert _search_in_group(SearchGroupParams(group_id=1, **search_params.dict())) is None
+        assert len(list(data)) == 1
+
+
+class TestSearchCodeByGroup:
+    @patch("gl_search.search._search_in_repo")
+    @patch("gl_search.search._search_in_group")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_group_results_by_repo(
+        self,
+        mock_retrieve_repositories_by: Mock,
+        mock_search_in_group: Mock,
+        mock_search_in_repo: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        repo_1 = Repo(id=1, name="repo_1", visibility="private", web_url="url_1")
+        repo_2 = Repo(id=2, name="repo_2", visibility="private", web_url="url_2")
+        result_1 = SearchEntryResult(
+            path="path_1", filename="filename_1", project_id=1, data="data_1", startline=1, ref="main"
+        )
+        result_2 = SearchEntryResult(
+            path="path_2", filename="filename_2", project_id=1, data="data_2", startline=1, ref="main"
+        )
+        result_internal = SearchEntryResult(
+            path="path_3", filename="filename_3", project_id=3, data="data_3", startline=1, ref="main"
+        )
+        mock_retrieve_repositories_by.return_value = {repo_1, repo_2}
+        mock_search_in_group.return_value = [result_1, result_internal, result_2]
+
+        response = list(_search_code_by_group([10], search_params))
+
+        mock_search_in_group.assert_called_once_with(SearchGroupParams(group_id=10, **search_params.dict()))
+        mock_search_in_repo.assert_not_called()
+        assert response == unordered(
+            [
+                RepoResult(
+                    name="repo_1", web_url="url_1", search_code_input="search", results=[result_1, result_2]
+                ),
+                RepoResult(name="repo_2", web_url="url_2", search_code_input="search", results=[]),
+            ]
+        )
+
+    @patch("gl_search.search._search_in_repo")
+    @patch("gl_search.search._search_in_group")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_fall_back_to_search_each_repo(
+        self,
+        mock_retrieve_repositories_by: Mock,
+        mock_search_in_group: Mock,
+        mock_search_in_repo: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        repo_1 = Repo(id=1, name="repo_1", visibility="private", web_url="url_1")
+        repo_2 = Repo(id=2, name="repo_2", visibility="private", web_url="url_2")
+        mock_retrieve_repositories_by.side_effect = [{repo_1}, {repo_1, repo_2}]
+        mock_search_in_group.side_effect = [[], None]
+        mock_search_in_repo.return_value = []
+
+        response = list(_search_code_by_group([10, 20], search_params))
+
+        assert len(response) == 2
+        mock_search_in_repo.assert_called_once_with(SearchRepoParams(repo_id=2, **search_params.dict()))
+
+    @patch("gl_search.search._search_in_repo")
+    @patch("gl_search.search._search_in_group")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_list_repos_once_for_every_query(
+        self,
+        mock_retrieve_repositories_by: Mock,
+        mock_search_in_group: Mock,
+        mock_search_in_repo: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        repo = Repo(id=1, name="repo_1", visibility="private", web_url="url_1")
+        result = SearchEntryResult(
+            path="path_1", filename="filename_1", project_id=1, data="data_1", startline=1, ref="main"
+        )
+        mock_retrieve_repositories_by.return_value = {repo}
+        mock_search_in_group.side_effect = [[result], None]
+        mock_search_in_repo.return_value = []
+        search_params.search_code_inputs = ["search", "other"]
+
+        response = list(_search_code_by_group([10], search_params))
+
+        mock_retrieve_repositories_by.assert_called_once()
+        mock_search_in_repo.assert_called_once_with(
+            SearchRepoParams(repo_id=1, **{**search_params.dict(), "search_code_input": "other"})
+        )
+        assert response == [
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="search", results=[result]),
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="other"),
+        ]
+
+    @patch("gl_search.search._search_code_in_repos")
+    @patch("gl_search.search._search_in_group")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_show_fall_back_progress_apart(
+        self,
+        mock_retrieve_repositories_by: Mock,
+        mock_search_in_group: Mock,
+        mock_search_code_in_repos: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        repo = Repo(id=1, name="repo_1", visibility="private", web_url="url_1")
+        mock_retrieve_repositories_by.return_value = {repo}
+        mock_search_in_group.return_value = None
+        mock_search_code_in_repos.return_value = iter([])
+
+        list(_search_code_by_group([10], search_params))
+
+        mock_search_code_in_repos.assert_called_once_with(
+            [("search", repo)], search_params, "Searching code by repo"
+        )
+
+
 class TestRetrieveInformationFromRepositoriesOfEachGroup:
     @patch("gl_search.search._retrieve_repositories_by")
     def test_it_should_search_each_repo_on_the_list(
@@ -127,9 +525,9 @@ class TestRetrieveInformationFromRepositoriesOfEachGroup:
         search_params.visibility = []
         _retrieve_information_from_repositories_of_each_group([1, 2, 3], search_params)
         assert mock_retrieve_repositories_by.call_args_list == [
-            call(1, search_params),
-            call(2, search_params),
-            call(3, search_params),
+            call(1, search_params, None),
+            call(2, search_params, None),
+            call(3, search_params, None),
         ]
 
     @patch("gl_search.search._retrieve_repositories_by")
@@ -137,7 +535,7 @@ class TestRetrieveInformationFromRepositoriesOfEachGroup:
         search_params.visibility = ["public"]
         _retrieve_information_from_repositories_of_each_group([1], search_params)
         assert mock_set_repos_by_group.call_args_list == [
-            call(1, search_params),
+            call(1, search_params, None),
         ]
 
     @patch("gl_search.search._retrieve_repositories_by")
@@ -145,16 +543,70 @@ class TestRetrieveInformationFromRepositoriesOfEachGroup:
         self, mock_retrieve_repositories_by: Mock, search_params: SearchParams
     ) -> None:
         mock_retrieve_repositories_by.side_effect = [{1, 2, 3}, {3, 4, 5}, {4, 5, 6}]
-        repo_set = _retrieve_information_from_repositories_of_each_group([1, 2, 3], search_params)
+        repo_set, failed_groups_ids = _retrieve_information_from_repositories_of_each_group(
+            [1, 2, 3], search_params
+        )
         assert mock_retrieve_repositories_by.call_args_list == [
-            call(1, search_params),
-            call(2, search_params),
-            call(3, search_params),
+            call(1, search_params, None),
+            call(2, search_params, None),
+            call(3, search_params, None),
         ]
         assert repo_set == {1, 2, 3, 4, 5, 6}
+        assert failed_groups_ids == set()
+
+    @patch("gl_search.search.settings.RATE_LIMITED_RETRIES", 0)
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_return_rate_limited_groups(
+        self, mock_retrieve_repositories_by: Mock, search_params: SearchParams
+    ) -> None:
+        def retrieve_repositories_by(group_id: int, *args) -> set[int]:
+            if group_id == 2:
+                raise RateLimitedError(None)
+            return {group_id}
+
+        mock_retrieve_repositories_by.side_effect = retrieve_repositories_by
+        repo_set, failed_groups_ids = _retrieve_information_from_repositories_of_each_group(
+            [1, 2, 3], search_params
+        )
+        assert repo_set == {1, 3}
+        assert failed_groups_ids == {2}
+
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_search_every_query_in_one_executor(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        def search_in_repo(search_params: SearchRepoParams) -> list[SearchEntryResult]:
+            return [
+                SearchEntryResult(
+                    path="path",
+                    filename="filename",
+                    project_id=1,
+                    data=search_params.search,
+                    startline=1,
+                    ref="main",
+                )
+            ]
+
+        mock_search_in_repo.side_effect = search_in_repo
+        search_params.search_code_inputs = ["search", "other"]
+        repos = [Repo(id=1, name="repo_1", web_url="url_1"), Repo(id=2, name="repo_2", web_url="url_2")]
+
+        with patch(
+            "concurrent.futures.ThreadPoolExecutor", wraps=concurrent.futures.ThreadPoolExecutor
+        ) as executor:
+            response = list(_search_code(repos, search_params))
+
+        executor.assert_called_once()
+        assert mock_search_in_repo.call_count == 4
+        assert sorted((entry.search_code_input, entry.name, entry.results[0].data) for entry in response) == [
+            ("other", "repo_1", "other"),
+            ("other", "repo_2", "other"),
+            ("search", "repo_1", "search"),
+            ("search", "repo_2", "search"),
+        ]
 
     @pytest.mark.parametrize("max_workers", (5, 50))
-    @patch("concurrent.futures.as_completed", Mock(return_value=[]))
+    @patch("gl_search.search._as_completed_with_retries", Mock(return_value=[]))
     @patch("concurrent.futures.ThreadPoolExecutor")
     def test_mx_workers(
         self, mock_thread_pool_executor: Mock, max_workers: int, search_params: SearchParams
@@ -166,27 +618,75 @@ class TestRetrieveInformationFromRepositoriesOfEachGroup:
 
 class TestRetrieveRepositoriesBy:
     @pytest.mark.parametrize(
-        "group_id, visibilities",
-        ((1, ["internal", "public", "private"]), (2, ["private"])),
+        "group_id, visibilities, expected",
+        (
+            (1, ["internal", "public", "private"], [{}]),
+            (2, ["private"], [{"visibility": "private"}]),
+            (3, ["internal", "private"], [{"visibility": "internal"}, {"visibility": "private"}]),
+        ),
     )
-    @patch("gl_search.search.retrieve_data")
+    @patch("gl_search.search.iter_data", return_value=[])
     def test_it_should_retrieve_group_and_each_visibility(
-        self, mock_retrieve_data: Mock, group_id: int, visibilities: list[str], search_params: SearchParams
+        self,
+        mock_iter_data: Mock,
+        group_id: int,
+        visibilities: list[str],
+        expected: list[dict[str, str]],
+        search_params: SearchParams,
     ) -> None:
 
         search_params.visibility = visibilities
 
         _retrieve_repositories_by(group_id, search_params)
-        mock_retrieve_data.assert_called_once_with(
+        assert mock_iter_data.call_args_list == [
+            call(
+                RequestDescribe(
+                    url=f"https://gitlab.com/api/v4/groups/{group_id}/projects",
+                    params={
+                        "include_subgroups": "true",
+                        "per_page": "100",
+                        "simple": "true",
+                        "archived": "false",
+                        **visibility_params,
+                    },
+                ),
+                ANY,
+                max_delay_request=search_params.max_delay_request,
+            )
+            for visibility_params in expected
+        ]
+
+    @patch("gl_search.search.iter_data", return_value=[])
+    def test_it_should_retrieve_archived_repositories(
+        self, mock_iter_data: Mock, search_params: SearchParams
+    ) -> None:
+        search_params.include_archived = True
+
+        _retrieve_repositories_by(1, search_params)
+        assert "archived" not in mock_iter_data.call_args.args[0].params
+
+    @patch("gl_search.search.iter_data", return_value=[])
+    def test_it_should_retrieve_only_repositories_with_activity_after(
+        self, mock_iter_data: Mock, search_params: SearchParams
+    ) -> None:
+        last_activity_after = datetime(2022, 10, 1, 12, 30, tzinfo=timezone.utc)
+
+        _retrieve_repositories_by(1, search_params, last_activity_after)
+        mock_iter_data.assert_called_once_with(
             RequestDescribe(
-                url=f"https://gitlab.com/api/v4/groups/{group_id}/projects",
+                url="https://gitlab.com/api/v4/groups/1/projects",
                 params={
                     "include_subgroups": "true",
                     "per_page": "100",
+                    "simple": "true",
+                    "visibility": "private",
+                    "archived": "false",
+                    "last_activity_after": "2022-10-01T12:30:00Z",
+                    "order_by": "last_activity_at",
                 },
             ),
             ANY,
-            max_random_time_for_sleep=search_params.max_random_time_for_sleep,
+            max_delay_request=search_params.max_delay_request,
         )
 
     @patch("gl_search.utils.request_session.get")
@@ -194,8 +694,8 @@ class TestRetrieveRepositoriesBy:
         mock_requests_get.return_value = build_response(
             HTTPStatus.OK,
             [
-                {"id": 1, "name": "test 1", "visibility": "private", "web_url": "url_1"},
-                {"id": 2, "name": "test 2", "visibility": "private", "web_url": "url_2"},
+                {"id": 1, "name": "test 1", "web_url": "url_1"},
+                {"id": 2, "name": "test 2", "web_url": "url_2"},
             ],
         )
         search_params.visibility = ["private"]
@@ -207,6 +707,202 @@ class TestRetrieveRepositoriesBy:
         }
 
 
+class TestSearchCodeWhileListing:
+    repo_1 = Repo(id=1, name="repo_1", web_url="url_1")
+    repo_2 = Repo(id=2, name="repo_2", web_url="url_2")
+
+    @staticmethod
+    def _retrieve_repositories_by(repos_by_group: dict[int, list[Repo]]) -> Callable:
+        def retrieve_repositories_by(group_id: int, params, last_activity_after, on_repo) -> set[Repo]:
+            for repo in repos_by_group[group_id]:
+                on_repo(repo)
+            return set(repos_by_group[group_id])
+
+        return retrieve_repositories_by
+
+    @patch("gl_search.search._search_in_repo")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_search_repos_while_listing(
+        self, mock_retrieve_repositories_by: Mock, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        searched = threading.Event()
+
+        def retrieve_repositories_by(group_id: int, params, last_activity_after, on_repo) -> set[Repo]:
+            on_repo(self.repo_1)
+            # The listing goes on only once the listed repository was searched.
+            assert searched.wait(timeout=5)
+            return {self.repo_1}
+
+        mock_retrieve_repositories_by.side_effect = retrieve_repositories_by
+        mock_search_in_repo.side_effect = lambda search_params: searched.set() or []
+        search_params.groups = "1"
+        search_params.max_workers = 2
+
+        assert list(_search_code_while_listing(search_params, None, datetime.now(timezone.utc))) == [
+            RepoResult(name="repo_1", web_url="url_1", search_code_input="search")
+        ]
+
+    @patch("gl_search.search._search_in_repo")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_search_each_repo_once(
+        self, mock_retrieve_repositories_by: Mock, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        mock_retrieve_repositories_by.side_effect = self._retrieve_repositories_by(
+            {1: [self.repo_1, self.repo_2], 2: [self.repo_2]}
+        )
+        mock_search_in_repo.return_value = []
+        search_params.groups = "1,2"
+        search_params.search_code_inputs = ["search", "other"]
+
+        results = list(_search_code_while_listing(search_params, None, datetime.now(timezone.utc)))
+
+        assert sorted((result.search_code_input, result.name) for result in results) == [
+            ("other", "repo_1"),
+            ("other", "repo_2"),
+            ("search", "repo_1"),
+            ("search", "repo_2"),
+        ]
+        assert mock_search_in_repo.call_count == 4
+        assert load_inventory(search_params).repos == unordered([self.repo_1, self.repo_2])
+
+    @patch("gl_search.search.settings.RATE_LIMITED_RETRIES", 0)
+    @patch("gl_search.search._search_in_repo")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_not_save_the_inventory_when_a_group_failed(
+        self, mock_retrieve_repositories_by: Mock, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        retrieve_repositories_by = self._retrieve_repositories_by({1: [self.repo_1]})
+
+        def retrieve_repositories_by_or_fail(group_id: int, *args) -> set[Repo]:
+            if group_id == 2:
+                raise RateLimitedError(None)
+            return retrieve_repositories_by(group_id, *args)
+
+        mock_retrieve_repositories_by.side_effect = retrieve_repositories_by_or_fail
+        mock_search_in_repo.return_value = []
+        search_params.groups = "1,2"
+
+        results = list(_search_code_while_listing(search_params, None, datetime.now(timezone.utc)))
+
+        assert [result.name for result in results] == ["repo_1"]
+        assert load_inventory(search_params) is None
+
+    @patch("gl_search.search._search_in_repo")
+    @patch("gl_search.search._retrieve_repositories_by")
+    def test_it_should_search_the_inactive_repos_of_an_expired_inventory(
+        self, mock_retrieve_repositories_by: Mock, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        updated_at = datetime.now(timezone.utc) - timedelta(days=1)
+        repo_1_updated = Repo(id=1, name="repo_1_renamed", web_url="url_1")
+        mock_retrieve_repositories_by.side_effect = self._retrieve_repositories_by({1: [repo_1_updated]})
+        mock_search_in_repo.return_value = []
+        search_params.groups = "1"
+        inventory = Inventory(groups_ids=[1], repos=[self.repo_1, self.repo_2], updated_at=updated_at)
+
+        results = list(_search_code_while_listing(search_params, inventory, datetime.now(timezone.utc)))
+
+        assert mock_retrieve_repositories_by.call_args_list == [call(1, search_params, updated_at, ANY)]
+        assert sorted(result.name for result in results) == ["repo_1_renamed", "repo_2"]
+        assert load_inventory(search_params).repos == unordered([repo_1_updated, self.repo_2])
+
+
+class TestRetrieveInventory:
+    repo_1 = Repo(id=1, name="repo_1", visibility="private", web_url="url_1")
+    repo_2 = Repo(id=2, name="repo_2", visibility="private", web_url="url_2")
+
+    @patch("gl_search.search._retrieve_information_from_repositories_of_each_group")
+    @patch("gl_search.search._retrieve_groups_ids")
+    def test_it_should_not_save_when_a_group_failed(
+        self,
+        mock_retrieve_groups_ids: Mock,
+        mock_retrieve_information_from_repositories_of_each_group: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        mock_retrieve_groups_ids.return_value = [1, 2]
+        mock_retrieve_information_from_repositories_of_each_group.return_value = ({self.repo_1}, {2})
+
+        assert _retrieve_inventory(search_params) == {self.repo_1}
+        assert load_inventory(search_params) is None
+
+    @patch("gl_search.search._retrieve_information_from_repositories_of_each_group")
+    @patch("gl_search.search._retrieve_groups_ids")
+    def test_when_inventory_is_not_cached(
+        self,
+        mock_retrieve_groups_ids: Mock,
+        mock_retrieve_information_from_repositories_of_each_group: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        mock_retrieve_groups_ids.return_value = [1]
+        mock_retrieve_information_from_repositories_of_each_group.return_value = ({self.repo_1}, set())
+
+        assert _retrieve_inventory(search_params) == {self.repo_1}
+        mock_retrieve_information_from_repositories_of_each_group.assert_called_once_with([1], search_params)
+        assert load_inventory(search_params).repos == [self.repo_1]
+
+    @patch("gl_search.search._retrieve_information_from_repositories_of_each_group")
+    @patch("gl_search.search._retrieve_groups_ids")
+    def test_when_inventory_is_fresh(
+        self,
+        mock_retrieve_groups_ids: Mock,
+        mock_retrieve_information_from_repositories_of_each_group: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        save_inventory(
+            search_params,
+            Inventory(groups_ids=[1], repos=[self.repo_1], updated_at=datetime.now(timezone.utc)),
+        )
+
+        assert _retrieve_inventory(search_params) == {self.repo_1}
+        mock_retrieve_groups_ids.assert_not_called()
+        mock_retrieve_information_from_repositories_of_each_group.assert_not_called()
+
+    @patch("gl_search.search._retrieve_information_from_repositories_of_each_group")
+    @patch("gl_search.search._retrieve_groups_ids")
+    def test_when_inventory_is_expired(
+        self,
+        mock_retrieve_groups_ids: Mock,
+        mock_retrieve_information_from_repositories_of_each_group: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        updated_at = datetime.now(timezone.utc) - timedelta(days=1)
+        repo_1_updated = Repo(id=1, name="repo_1_renamed", visibility="private", web_url="url_1")
+        save_inventory(
+            search_params,
+            Inventory(groups_ids=[1], repos=[self.repo_1], updated_at=updated_at),
+        )
+        mock_retrieve_groups_ids.return_value = [1, 2]
+        mock_retrieve_information_from_repositories_of_each_group.side_effect = [
+            ({repo_1_updated}, set()),
+            ({self.repo_2}, set()),
+        ]
+
+        assert _retrieve_inventory(search_params) == {repo_1_updated, self.repo_2}
+        assert mock_retrieve_information_from_repositories_of_each_group.call_args_list == [
+            call([1], search_params, last_activity_after=updated_at),
+            call([2], search_params),
+        ]
+        assert load_inventory(search_params).groups_ids == [1, 2]
+
+    @patch("gl_search.search._retrieve_information_from_repositories_of_each_group")
+    @patch("gl_search.search._retrieve_groups_ids")
+    def test_when_refresh_inventory_is_forced(
+        self,
+        mock_retrieve_groups_ids: Mock,
+        mock_retrieve_information_from_repositories_of_each_group: Mock,
+        search_params: SearchParams,
+    ) -> None:
+        save_inventory(
+            search_params,
+            Inventory(groups_ids=[1], repos=[self.repo_1], updated_at=datetime.now(timezone.utc)),
+        )
+        search_params.refresh_inventory = True
+        mock_retrieve_groups_ids.return_value = [1]
+        mock_retrieve_information_from_repositories_of_each_group.return_value = ({self.repo_2}, set())
+
+        assert _retrieve_inventory(search_params) == {self.repo_2}
+        mock_retrieve_information_from_repositories_of_each_group.assert_called_once_with([1], search_params)
+
+
 class TestRetrieveGroupsIds:
     @patch("gl_search.search.retrieve_data")
     def test_it_should_retrieve_from_gl(self, mock_retrieve_data: Mock, search_params: SearchParams) -> None:
@@ -223,7 +919,7 @@ class TestRetrieveGroupsIds:
                 },
             ),
             ANY,
-            max_random_time_for_sleep=search_params.max_random_time_for_sleep,
+            max_delay_request=search_params.max_delay_request,
         )
 
     @patch("gl_search.utils.request_session.get")
@@ -233,51 +929,329 @@ class TestRetrieveGroupsIds:
 
         assert response == [1, 2]
 
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_return_only_root_groups(
+        self, mock_requests_get: Mock, search_params: SearchParams
+    ) -> None:
+        mock_requests_get.return_value = build_response(
+            HTTPStatus.OK,
+            [
+                {"id": 1, "parent_id": None},
+                {"id": 2, "parent_id": 1},
+                {"id": 3, "parent_id": 2},
+                {"id": 4, "parent_id": 10},
+                {"id": 5, "parent_id": None},
+            ],
+        )
+        response: list[int] = _retrieve_groups_ids(search_params)
+
+        assert response == [1, 4, 5]
+
+
+class TestRetrieveGroups:
+    def test_it_should_not_repeat_groups(self, search_params: SearchParams) -> None:
+        search_params.groups = "3,1,3"
+
+        assert _retrieve_groups(search_params) == [3, 1]
+
+
+class TestSyncMirrors:
+    @patch("gl_search.search._retrieve_inventory")
+    def test_it_should_sync_every_repository(
+        self, mock_retrieve_inventory: Mock, search_params: SearchParams, tmp_path: Path
+    ) -> None:
+        build_git_repository(tmp_path, {"main.py": "search"})
+        repo = Repo(
+            id=1,
+            name="repo_1",
+            web_url="url_1",
+            http_url_to_repo=f"file://{tmp_path / 'origin.git'}",
+            default_branch="main",
+        )
+        empty_repo = Repo(id=2, name="repo_2", web_url="url_2")
+        failed_repo = repo.copy(update={"id": 3, "http_url_to_repo": f"file://{tmp_path / 'missing.git'}"})
+        mock_retrieve_inventory.return_value = {repo, empty_repo, failed_repo}
+
+        assert sync_mirrors(search_params) == ([repo], [failed_repo])
+
+
+class TestIndexMirrors:
+    @pytest.mark.parametrize("rebuild, expected_indexed", ((False, []), (True, [1])))
+    def test_it_should_index_stale_mirrors(
+        self, rebuild: bool, expected_indexed: list[int], search_params: SearchParams, tmp_path: Path
+    ) -> None:
+        build_git_repository(tmp_path, {"main.py": "search"})
+        repo = Repo(
+            id=1,
+            name="repo_1",
+            web_url="url_1",
+            http_url_to_repo=f"file://{tmp_path / 'origin.git'}",
+            default_branch="main",
+        )
+        not_mirrored_repo = Repo(id=2, name="repo_2", web_url="url_2", default_branch="main")
+        save_inventory(
+            search_params,
+            Inventory(groups_ids=[1], repos=[repo, not_mirrored_repo], updated_at=datetime(2022, 1, 1)),
+        )
+        sync_mirror(repo, mirror_dir_path(repo))
+
+        assert index_mirrors(search_params) == ([repo], [])
+        assert index_mirrors(search_params, rebuild=rebuild) == ([repo] * len(expected_indexed), [])
+
+
+class TestLimitResults:
+    @staticmethod
+    def _repo_result(name: str, hits: int) -> RepoResult:
+        entry = SearchEntryResult(
+            path="path", filename="filename", project_id=1, data="data", startline=1, ref="main"
+        )
+        return RepoResult(name=name, web_url="url", search_code_input="search", results=[entry] * hits)
+
+    def test_it_should_stop_at_max_results(self) -> None:
+        closed: list[bool] = []
+
+        def results() -> Iterator[RepoResult]:
+            try:
+                yield self._repo_result("repo_1", 0)
+                yield self._repo_result("repo_2", 2)
+                yield self._repo_result("repo_3", 2)
+                yield self._repo_result("repo_4", 2)
+            finally:
+                closed.append(True)
+
+        limited = list(_limit_results(results(), 3))
+
+        assert [(result.name, len(result.results)) for result in limited] == [
+            ("repo_1", 0),
+            ("repo_2", 2),
+            ("repo_3", 1),
+        ]
+        assert closed == [True]
+
+    @patch("gl_search.search.resume_requests")
+    @patch("gl_search.search.cancel_requests")
+    def test_it_should_cancel_the_requests_while_closing(
+        self, mock_cancel_requests: Mock, mock_resume_requests: Mock
+    ) -> None:
+        def results() -> Iterator[RepoResult]:
+            try:
+                yield self._repo_result("repo_1", 1)
+            finally:
+                mock_cancel_requests.assert_called_once()
+                mock_resume_requests.assert_not_called()
+
+        list(_limit_results(results(), 1))
+
+        mock_resume_requests.assert_called_once()
+
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_not_search_the_pending_repos(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        entry = SearchEntryResult(
+            path="path", filename="filename", project_id=1, data="data", startline=1, ref="main"
+        )
+
+        def search_in_repo(search_params: SearchRepoParams) -> list[SearchEntryResult]:
+            # The next searches are slower than reading the first result.
+            if mock_search_in_repo.call_count > 1:
+                time.sleep(0.05)
+            return [entry]
+
+        mock_search_in_repo.side_effect = search_in_repo
+        search_params.max_workers = 1
+        repos = [Repo(id=repo_id, name=f"repo_{repo_id}", web_url="url") for repo_id in range(100)]
+
+        assert len(list(_limit_results(_search_code(repos, search_params), 1))) == 1
+        assert mock_search_in_repo.call_count < 5
+
+
+class TestResumeRun:
+    run_id = "20221001-120000-abcd"
+    repos = [Repo(id=repo_id, name=f"repo_{repo_id}", web_url=f"url_{repo_id}") for repo_id in (1, 2, 3)]
+
+    @pytest.fixture(autouse=True)
+    def inventory(self, search_params: SearchParams) -> None:
+        save_inventory(
+            search_params, Inventory(groups_ids=[1], repos=self.repos, updated_at=datetime.now(timezone.utc))
+        )
+        search_params.run_id = self.run_id
+        search_params.use_cache = False
+
+    @patch("gl_search.search._search_in_repo", return_value=[])
+    def test_it_should_only_search_the_repos_left(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        search_params.max_workers = 1
+        results = search(search_params)
+        assert next(results).name == "repo_1"
+        # Interrupted after the first result.
+        results.close()
+        assert load_run_params(self.run_id) is not None
+
+        mock_search_in_repo.reset_mock()
+        assert [result.name for result in search(search_params)] == unordered(["repo_1", "repo_2", "repo_3"])
+
+        assert [search_call.args[0].repo_id for search_call in mock_search_in_repo.call_args_list] == [2, 3]
+        assert load_run_params(self.run_id) is None
+
+    @patch("gl_search.search._search_in_repo")
+    def test_it_should_keep_the_journal_when_a_search_failed(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        def search_in_repo(search_params: SearchRepoParams) -> list[SearchEntryResult]:
+            if search_params.repo_id == 2:
+                raise InvalidStatusCodeError(HTTPStatus.INTERNAL_SERVER_ERROR)
+            return []
+
+        mock_search_in_repo.side_effect = search_in_repo
+        assert [result.failed for result in search(search_params) if result.name == "repo_2"] == [True]
+
+        assert load_run_params(self.run_id) is not None
+        assert list(load_run_results(self.run_id)) == unordered([("search", 1), ("search", 3)])
+
+    @patch("gl_search.search._search_in_repo", return_value=[])
+    def test_it_should_not_journal_without_run_id(
+        self, mock_search_in_repo: Mock, search_params: SearchParams
+    ) -> None:
+        search_params.run_id = None
+        results = search(search_params)
+        next(results)
+        results.close()
+
+        assert not load_run_results(self.run_id)
+
 
 class TestSearch:
-    @pytest.mark.parametrize(
-        "groups, expected",
-        ((None, "assert_called_once_with"), ("1,2", "assert_not_called")),
-    )
+    def test_local_engine(self, search_params: SearchParams, tmp_path: Path) -> None:
+        build_git_repository(tmp_path, {"main.py": "search"})
+        repo = Repo(
+            id=1,
+            name="repo_1",
+            web_url="url_1",
+            http_url_to_repo=f"file://{tmp_path / 'origin.git'}",
+            default_branch="main",
+        )
+        not_mirrored_repo = Repo(id=2, name="repo_2", web_url="url_2", default_branch="main")
+        save_inventory(
+            search_params,
+            Inventory(groups_ids=[1], repos=[repo, not_mirrored_repo], updated_at=datetime(2022, 1, 1)),
+        )
+        sync_mirror(repo, mirror_dir_path(repo))
+        search_params.engine = "local"
+
+        with patch("gl_search.search._retrieve_inventory") as mock_retrieve_inventory:
+            assert list(search(search_params)) == [
+                RepoResult(
+                    name="repo_1",
+                    web_url="url_1",
+                    search_code_input="search",
+                    results=[
+                        SearchEntryResult(
+                            path="main.py",
+                            filename="main.py",
+                            project_id=1,
+                            data="search",
+                            startline=1,
+                            ref="main",
+                        )
+                    ],
+                )
+            ]
+
+        mock_retrieve_inventory.assert_not_called()
+
+    @patch("gl_search.search._search_code_by_group")
     @patch("gl_search.search._search_code")
     @patch("gl_search.search._retrieve_information_from_repositories_of_each_group")
     @patch("gl_search.search._retrieve_groups_ids")
-    def test_call_methods(
+    def test_group_engine(
         self,
         mock_retrieve_groups_ids: Mock,
         mock_retrieve_information_from_repositories_of_each_group: Mock,
         mock_search_code: Mock,
-        groups: Optional[str],
-        expected: str,
+        mock_search_code_by_group: Mock,
+        search_params: SearchParams,
     ) -> None:
-        repo_test_1 = Repo(id=3, name="repo_1", visibility="public", web_url="url")
-        repo_test_2 = Repo(id=4, name="repo_2", visibility="public", web_url="url")
         mock_retrieve_groups_ids.return_value = [1, 2]
-        mock_retrieve_information_from_repositories_of_each_group.return_value = {
-            repo_test_1,
-            Repo(id=4, name="repo_2", visibility="public", web_url="url"),
-        }
-        mock_search_code.return_value = [{"name": "repo_1", "content": "content"}]
-
-        params = SearchParams(
-            groups=groups,
-            search_code_input="test",
-            max_workers=1,
-            visibility=["public"],
-            max_random_time_for_sleep=5,
-        )
-        result = search(params)
-        if not groups:
-            getattr(mock_retrieve_groups_ids, expected)(params)
+        mock_search_code_by_group.return_value = iter([])
+        search_params.engine = "group"
+
+        list(search(search_params))
+
+        mock_retrieve_groups_ids.assert_called_once_with(search_params)
+        mock_search_code_by_group.assert_called_once_with([1, 2], search_params)
+        mock_retrieve_information_from_repositories_of_each_group.assert_not_called()
+        mock_search_code.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "updated_at, refresh_inventory, fresh",
+        (
+            (datetime.now(timezone.utc), False, True),
+            (datetime.now(timezone.utc) - timedelta(days=1), False, False),
+            (datetime.now(timezone.utc), True, False),
+        ),
+        ids=("fresh", "expired", "refreshed"),
+    )
+    @patch("gl_search.search._search_code_while_listing")
+    @patch("gl_search.search._search_code")
+    def test_call_methods(
+        self,
+        mock_search_code: Mock,
+        mock_search_code_while_listing: Mock,
+        updated_at: datetime,
+        refresh_inventory: bool,
+        fresh: bool,
+        search_params: SearchParams,
+    ) -> None:
+        inventory = Inventory(
+            groups_ids=[1], repos=[Repo(id=3, name="repo_1", web_url="url")], updated_at=updated_at
+        )
+        save_inventory(search_params, inventory)
+        search_params.refresh_inventory = refresh_inventory
+        mock_search_code.return_value = iter([])
+        mock_search_code_while_listing.return_value = iter([])
+
+        list(search(search_params))
+
+        if fresh:
+            mock_search_code.assert_called_once_with(inventory.repos, search_params)
+            mock_search_code_while_listing.assert_not_called()
         else:
-            getattr(mock_retrieve_groups_ids, expected)()
+            mock_search_code.assert_not_called()
+            mock_search_code_while_listing.assert_called_once_with(
+                search_params, None if refresh_inventory else inventory, ANY
+            )
 
-        mock_retrieve_information_from_repositories_of_each_group.assert_called_once_with([1, 2], params)
-        mock_search_code.assert_called_once_with(
-            {
-                repo_test_2,
-                repo_test_1,
-            },
-            params,
+    @patch("gl_search.search._search_code_while_listing")
+    def test_it_should_record_the_repos_with_hits(
+        self, mock_search_code_while_listing: Mock, search_params: SearchParams
+    ) -> None:
+        entry = SearchEntryResult(
+            path="path", filename="filename", project_id=1, data="data", startline=1, ref="main"
         )
-        assert [entry.keys() for entry in result] == [{"name", "content"}]
+        mock_search_code_while_listing.return_value = iter(
+            [
+                RepoResult(name="repo_1", web_url="url_1", search_code_input="search", results=[entry]),
+                RepoResult(name="repo_2", web_url="url_2", search_code_input="search"),
+            ]
+        )
+
+        list(search(search_params))
+
+        assert load_hits() == {"url_1": 1}
+
+    @patch("gl_search.search._search_code_while_listing")
+    def test_it_should_stream_results(
+        self, mock_search_code_while_listing: Mock, search_params: SearchParams
+    ) -> None:
+        repo_result_1 = RepoResult(name="repo_1", web_url="url_1", search_code_input="search")
+        repo_result_2 = RepoResult(name="repo_2", web_url="url_2", search_code_input="search")
+        mock_search_code_while_listing.return_value = iter([repo_result_1, repo_result_2])
+
+        results = search(search_params)
+
+        mock_search_code_while_listing.assert_not_called()
+        assert next(results) == repo_result_1
+        mock_search_code_while_listing.assert_called_once()
+        assert next(results) == repo_result_2
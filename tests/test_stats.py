@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from gl_search.stats import RequestStats, endpoint_template, format_summary
+
+
+class TestEndpointTemplate:
+    def test_it_should_replace_the_ids(self) -> None:
+        assert endpoint_template("https://gitlab.com/api/v4/projects/42/search?scope=blobs") == (
+            "/api/v4/projects/:id/search"
+        )
+        assert endpoint_template("https://gitlab.com/api/v4/groups/7") == "/api/v4/groups/:id"
+        assert endpoint_template("https://gitlab.com/api/v4/groups") == "/api/v4/groups"
+
+
+class TestRequestStats:
+    def _stats(self) -> RequestStats:
+        stats = RequestStats()
+        stats.enable()
+        for duration in range(1, 101):
+            stats.record(
+                "https://gitlab.com/api/v4/projects/1/search", 200, 1024, 0, 0.0, 1.0, duration / 1000
+            )
+        stats.record("https://gitlab.com/api/v4/groups", 429, 10, 2, 0.5, 1.0, 0.2)
+        stats.add_phase_time("render", 0.3)
+        return stats
+
+    def test_it_should_summarize_per_phase(self) -> None:
+        search, groups, render = self._stats().summary()
+
+        assert search["phase"] == "search"
+        assert search["requests"] == 100
+        assert search["errors"] == 0
+        assert search["bytes"] == 100 * 1024
+        assert (search["p50"], search["p95"], search["p99"]) == (0.05, 0.095, 0.099)
+
+        assert groups["phase"] == "groups"
+        assert (groups["errors"], groups["retries"], groups["sleep"]) == (1, 2, 0.5)
+
+        assert render == {"phase": "render", "requests": 0, "time": 0.3}
+
+    def test_it_should_format_the_summary(self) -> None:
+        summary = format_summary(self._stats().summary())
+
+        assert summary.splitlines()[0].split()[:3] == ["phase", "requests", "errors"]
+        assert summary.splitlines()[1].split()[:5] == ["search", "100", "0", "0", "100"]
+        assert format_summary([]) is None
+
+    def test_it_should_forget_the_records_on_reset(self) -> None:
+        stats = self._stats()
+        stats.reset()
+
+        assert not stats.enabled
+        assert stats.summary() == []
+
+    def test_it_should_write_a_chrome_trace(self, tmp_path: Path) -> None:
+        trace_path = tmp_path / "trace.json"
+        self._stats().write_trace(str(trace_path))
+
+        events = json.loads(trace_path.read_text())["traceEvents"]
+        assert len(events) == 102
+        assert {event["ph"] for event in events} == {"X"}
+        sleep, request = events[-2:]
+        assert sleep["cat"] == "sleep"
+        assert sleep["dur"] == 500_000
+        assert request["name"] == "/api/v4/groups"
+        assert request["args"] == {"status": 429, "bytes": 10, "retries": 2}
+        assert sleep["ts"] + sleep["dur"] == pytest.approx(request["ts"])
@@ -1,49 +1,123 @@
 import contextlib
 from copy import deepcopy
 from http import HTTPStatus
-from random import uniform
+from typing import Optional
 from unittest.mock import Mock, call, patch
 
 import pytest
 from pytest_unordered import unordered
 
 from gl_search.models import RequestDescribe
-from gl_search.utils import retrieve_data
+from gl_search.utils import (
+    RateLimitedError,
+    RequestsCancelledError,
+    cancel_requests,
+    configure_session,
+    iter_data,
+    request_session,
+    resume_requests,
+    retries,
+    retrieve_data,
+)
 
 from .utils import build_response
 
 
 class TestRetrieveData:
-    @patch("gl_search.utils.uniform")
-    @patch("time.sleep")
+    @patch("gl_search.utils.rate_limiter")
     @patch("gl_search.utils.request_session.get")
-    def test_it_should_call_url(
-        self, mock_request_get: Mock, mock_time_sleep: Mock, mock_uniform: Mock
-    ) -> None:
+    def test_it_should_call_url(self, mock_request_get: Mock, mock_rate_limiter: Mock) -> None:
         url = "https://example.com/"
         url_2 = f"{url}page=2"
 
-        max_random_time_for_sleep = 10
-        uniform_response = uniform(0, max_random_time_for_sleep)
+        max_delay_request = 10
 
-        response = build_response(HTTPStatus.OK, {})
+        response = build_response(HTTPStatus.OK, {}, {"RateLimit-Remaining": "10"})
         response._count_links = 0
         response.links = {"next": {"url": url_2}}
 
         response_2 = build_response(HTTPStatus.OK, {})
         mock_request_get.side_effect = [response, response_2]
-        mock_uniform.return_value = uniform_response
         request_describe = RequestDescribe(url=url)
 
-        retrieve_data(deepcopy(request_describe), lambda: None, max_random_time_for_sleep)
+        retrieve_data(deepcopy(request_describe), lambda: None, max_delay_request)
 
         assert list(mock_request_get.call_args_list) == unordered(
             [
-                call(request_describe.url, params={}, timeout=max_random_time_for_sleep),
-                call(url_2, params={}, timeout=max_random_time_for_sleep),
+                call(request_describe.url, params={}, timeout=10),
+                call(url_2, params={}, timeout=10),
             ]
         )
-        mock_time_sleep.assert_called_once_with(uniform_response)
+        assert mock_rate_limiter.acquire.call_args_list == [
+            call(max_wait=max_delay_request),
+            call(max_wait=max_delay_request),
+        ]
+        assert mock_rate_limiter.update.call_args_list == [call(response.headers), call(response_2.headers)]
+
+    @pytest.mark.parametrize(
+        "headers", ({"X-Total-Pages": "3"}, {"X-Total": "250"}), ids=("total-pages", "total")
+    )
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_fetch_remaining_pages_concurrently(
+        self, mock_request_get: Mock, headers: dict[str, str]
+    ) -> None:
+        url = "https://example.com/"
+        responses = {
+            None: build_response(HTTPStatus.OK, [1], headers),
+            "2": build_response(HTTPStatus.OK, [2]),
+            "3": build_response(HTTPStatus.OK, [3]),
+        }
+        mock_request_get.side_effect = lambda url, params, timeout: responses[params.get("page")]
+
+        data = retrieve_data(RequestDescribe(url=url, params={"per_page": "100"}))
+
+        assert data == [1, 2, 3]
+        assert list(mock_request_get.call_args_list) == unordered(
+            [
+                call(url, params={"per_page": "100"}, timeout=10),
+                call(url, params={"per_page": "100", "page": "2"}, timeout=10),
+                call(url, params={"per_page": "100", "page": "3"}, timeout=10),
+            ]
+        )
+
+    @patch("gl_search.utils.settings.MAX_DEEP_SEARCH", 2)
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_not_fetch_more_pages_than_max_deep_search(self, mock_request_get: Mock) -> None:
+        mock_request_get.side_effect = [
+            build_response(HTTPStatus.OK, [1], {"X-Total-Pages": "5"}),
+            build_response(HTTPStatus.OK, [2]),
+        ]
+
+        assert retrieve_data(RequestDescribe(url="https://example.com/")) == [1, 2]
+        assert mock_request_get.call_count == 2
+
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_fail_when_a_remaining_page_fails(self, mock_request_get: Mock) -> None:
+        responses = {
+            None: build_response(HTTPStatus.OK, [1], {"X-Total-Pages": "3"}),
+            "2": build_response(HTTPStatus.TOO_MANY_REQUESTS, {}),
+            "3": build_response(HTTPStatus.OK, [3]),
+        }
+        mock_request_get.side_effect = lambda url, params, timeout: responses[params.get("page")]
+
+        with pytest.raises(RateLimitedError):
+            retrieve_data(RequestDescribe(url="https://example.com/"))
+
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_follow_links_when_pagination_is_keyset(self, mock_request_get: Mock) -> None:
+        url = "https://example.com/"
+        url_2 = f"{url}?cursor=2"
+        response = build_response(HTTPStatus.OK, [1], {"X-Total-Pages": "2"})
+        response.links = {"next": {"url": url_2}}
+        mock_request_get.side_effect = [response, build_response(HTTPStatus.OK, [2])]
+
+        data = retrieve_data(RequestDescribe(url=url, params={"pagination": "keyset"}))
+
+        assert data == [1, 2]
+        assert mock_request_get.call_args_list == [
+            call(url, params={"pagination": "keyset"}, timeout=10),
+            call(url_2, params={}, timeout=10),
+        ]
 
     @patch("gl_search.utils.request_session.get")
     def test_it_should_raise_exception_when_get_invalid_status_code(self, mock_requests_get: Mock) -> None:
@@ -52,17 +126,18 @@ class TestRetrieveData:
         with pytest.raises(Exception, match=r"invalid status code"):
             retrieve_data(RequestDescribe(url="https://example.com/"), lambda: None, 10)
 
-    @patch("gl_search.utils.process_user_feedback")
+    @pytest.mark.parametrize("retry_after, expected", (("30", 30), (None, None), ("date", None)))
     @patch("gl_search.utils.request_session.get")
     def test_it_should_raise_exception_when_get_too_many_requests_error(
-        self, mock_requests_get: Mock, mock_process_user_feedback: Mock
+        self, mock_requests_get: Mock, retry_after: Optional[str], expected: Optional[float]
     ) -> None:
-        mock_requests_get.return_value = build_response(HTTPStatus.TOO_MANY_REQUESTS, {})
-        url = "https://example.com/"
-        retrieve_data(RequestDescribe(url=url), lambda: None, 10)
-        mock_process_user_feedback.progress.print.assert_called_with(
-            "URL: {} PARAMS: {} HttpStatus Code 429 SKIP this search".format(url, dict())
-        )
+        headers = {"Retry-After": retry_after} if retry_after else {}
+        mock_requests_get.return_value = build_response(HTTPStatus.TOO_MANY_REQUESTS, {}, headers)
+
+        with pytest.raises(RateLimitedError) as error:
+            retrieve_data(RequestDescribe(url="https://example.com/"), lambda: None, 10)
+
+        assert error.value.retry_after == expected
 
     @patch("gl_search.utils.process_user_feedback")
     @patch("gl_search.utils.logger")
@@ -79,3 +154,108 @@ class TestRetrieveData:
             retrieve_data(RequestDescribe(url=url), lambda: None, 10)
 
         mock_process_user_feedback.progress.log.assert_called_with("URL: {} PARAMS: {}".format(url, dict()))
+
+
+class TestIterData:
+    @patch("gl_search.utils.settings.MAX_PARALLEL_PAGES", 2)
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_only_request_the_pages_in_flight(self, mock_request_get: Mock) -> None:
+        requested_pages: list[Optional[str]] = []
+
+        def get(url: str, params: dict[str, str], timeout: int) -> Mock:
+            requested_pages.append(params.get("page"))
+            headers = {} if params.get("page") else {"X-Total-Pages": "10"}
+            return build_response(HTTPStatus.OK, [int(params.get("page", 1))], headers)
+
+        mock_request_get.side_effect = get
+
+        data = iter_data(RequestDescribe(url="https://example.com/"))
+        assert mock_request_get.call_count == 0
+        assert [next(data), next(data)] == [1, 2]
+        assert set(requested_pages) <= {None, "2", "3", "4"}
+
+        data.close()
+        assert len(requested_pages) <= 4
+
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_yield_each_page_before_requesting_the_next(self, mock_request_get: Mock) -> None:
+        response = build_response(HTTPStatus.OK, [1, 2])
+        response.links = {"next": {"url": "https://example.com/?page=2"}}
+        mock_request_get.side_effect = [response, build_response(HTTPStatus.OK, [3])]
+
+        data = iter_data(RequestDescribe(url="https://example.com/"))
+
+        assert [next(data), next(data)] == [1, 2]
+        assert mock_request_get.call_count == 1
+        assert list(data) == [3]
+
+    @patch("gl_search.utils.settings.MAX_DEEP_SEARCH", 2)
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_not_follow_more_links_than_max_deep_search(self, mock_request_get: Mock) -> None:
+        response = build_response(HTTPStatus.OK, [1])
+        response.links = {"next": {"url": "https://example.com/?page=2"}}
+        mock_request_get.return_value = response
+
+        assert list(iter_data(RequestDescribe(url="https://example.com/"))) == [1, 1]
+
+
+class TestCancelRequests:
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_stop_requesting_once_cancelled(self, mock_request_get: Mock) -> None:
+        response = build_response(HTTPStatus.OK, [1])
+        response.links = {"next": {"url": "https://example.com/?page=2"}}
+        mock_request_get.return_value = response
+        data = iter_data(RequestDescribe(url="https://example.com/"))
+
+        assert next(data) == 1
+        cancel_requests()
+        try:
+            with pytest.raises(RequestsCancelledError):
+                next(data)
+        finally:
+            resume_requests()
+
+        assert mock_request_get.call_count == 1
+        mock_request_get.return_value = build_response(HTTPStatus.OK, [1])
+        assert retrieve_data(RequestDescribe(url="https://example.com/")) == [1]
+
+
+class TestRetries:
+    @pytest.mark.parametrize(
+        "status_code, expected",
+        (
+            (HTTPStatus.TOO_MANY_REQUESTS, False),
+            (HTTPStatus.BAD_GATEWAY, True),
+            (HTTPStatus.SERVICE_UNAVAILABLE, True),
+        ),
+    )
+    def test_it_should_leave_rate_limited_requests_to_the_search(
+        self, status_code: HTTPStatus, expected: bool
+    ) -> None:
+        assert retries.is_retry("GET", status_code, has_retry_after=True) is expected
+
+
+class TestConfigureSession:
+    @patch("gl_search.utils.settings.MAX_PARALLEL_PAGES", 4)
+    def test_it_should_size_the_pools_to_the_threads(self) -> None:
+        configure_session(28)
+        adapter = request_session.get_adapter("https://gitlab.com")
+
+        assert adapter._pool_maxsize == 32
+        assert adapter.max_retries is retries
+
+        configure_session(28)
+        assert request_session.get_adapter("https://gitlab.com") is adapter
+        assert request_session.get_adapter("http://localhost")._pool_maxsize == 32
+
+    @patch("gl_search.utils.settings.REQUEST_TIMEOUT", 2.5)
+    @patch("gl_search.utils.request_session.get")
+    def test_it_should_use_the_request_timeout_setting(self, mock_request_get: Mock) -> None:
+        mock_request_get.return_value = build_response(HTTPStatus.OK, [])
+
+        retrieve_data(RequestDescribe(url="https://example.com/"))
+
+        mock_request_get.assert_called_once_with("https://example.com/", params={}, timeout=2.5)
+
+    def test_it_should_ask_for_gzip(self) -> None:
+        assert request_session.headers["Accept-Encoding"] == "gzip"
@@ -1,13 +1,47 @@
+import subprocess  # nosec
 from http import HTTPStatus
-from typing import Any
+from pathlib import Path
+from typing import Any, Optional
 from unittest.mock import Mock
 
 from requests import Response
+from requests.structures import CaseInsensitiveDict
 
 
-def build_response(status_code: HTTPStatus, json_return: Any) -> None:
+def build_response(
+    status_code: HTTPStatus, json_return: Any, headers: Optional[dict[str, str]] = None
+) -> None:
     response = Mock(spec=Response)
     response.status_code = status_code
     response.json.return_value = json_return
     response.links = {}
+    response.headers = CaseInsensitiveDict(headers or {})
     return response
+
+
+def run_git(cwd: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )  # nosec
+
+
+def commit_files(work_tree: Path, files: dict[str, str]) -> None:
+    for file_path, content in files.items():
+        (work_tree / file_path).parent.mkdir(parents=True, exist_ok=True)
+        (work_tree / file_path).write_text(content)
+    run_git(work_tree, "add", "-A")
+    run_git(work_tree, "commit", "-q", "-m", "commit")
+    run_git(work_tree, "push", "-q", "origin", "main")
+
+
+def build_git_repository(dir_path: Path, files: dict[str, str]) -> Path:
+    dir_path.mkdir(parents=True, exist_ok=True)
+    run_git(dir_path, "init", "-q", "--bare", "-b", "main", "origin.git")
+    run_git(dir_path, "clone", "-q", "origin.git", "work_tree")
+    work_tree = dir_path / "work_tree"
+    run_git(work_tree, "checkout", "-q", "-b", "main")
+    commit_files(work_tree, files)
+    return work_tree